@@ -0,0 +1,4 @@
+# Copyright (c) 2020-2021 Stefan Holdermans.
+# Licensed under the MIT License.
+
+"""Performance benchmarks."""
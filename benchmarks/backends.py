@@ -0,0 +1,40 @@
+# Copyright (c) 2020-2021 Stefan Holdermans.
+# Licensed under the MIT License.
+
+"""Benchmark comparing the available numeric backends on matrix arithmetic
+and on rendering the silhouette scene.
+
+Run with `python -m benchmarks.backends`.
+"""
+
+import time
+
+import pyray
+
+from .common import best_of, render_silhouette
+
+
+def main():
+    """Run the benchmark for every available backend and report the results.
+    """
+    print(f"{'backend':<8} {'mul':>10} {'transform':>10} {'inversed':>10}"
+          f" {'silhouette':>11}")
+    for name in pyray.available_backends():
+        pyray.set_backend(name)
+        m = pyray.rotation_x(0.5) * pyray.scaling(1.0, 2.0, 3.0)
+        p = pyray.point(1.0, 2.0, 3.0)
+
+        mul_us = best_of(lambda m=m: m * m) * 1e6
+        transform_us = best_of(lambda m=m, p=p: m * p) * 1e6
+        inversed_us = best_of(m.inversed) * 1e6
+
+        start = time.perf_counter()
+        render_silhouette(100)
+        silhouette_s = time.perf_counter() - start
+
+        print(f"{name:<8} {mul_us:>8.1f}us {transform_us:>8.1f}us"
+              f" {inversed_us:>8.1f}us {silhouette_s:>10.2f}s")
+
+
+if __name__ == "__main__":
+    main()
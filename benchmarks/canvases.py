@@ -0,0 +1,59 @@
+# Copyright (c) 2020-2021 Stefan Holdermans.
+# Licensed under the MIT License.
+
+"""Benchmark comparing the memory use and construction time of array-backed
+canvases with the dictionary of colors they replaced.
+
+Run with `python -m benchmarks.canvases`. Pass `--legacy-4k` to also measure
+the dictionary at 4K, which takes several gigabytes.
+"""
+
+import sys
+import time
+import tracemalloc
+
+import pyray
+
+RESOLUTIONS = [("1080p", 1920, 1080), ("4K", 3840, 2160)]
+
+
+def dict_canvas(width: int, height: int) -> dict:
+    """Build the dictionary of colors that canvases used to store."""
+    return {(x, y): pyray.BLACK for x in range(width) for y in range(height)}
+
+
+def measure(factory):
+    """Return the peak memory, in megabytes, and the time, in seconds, taken
+    to construct an object.
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    obj = factory()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del obj
+    return peak / 2 ** 20, elapsed
+
+
+def main():
+    """Run the benchmark and report the results."""
+    legacy_4k = "--legacy-4k" in sys.argv[1:]
+    print(f"{'':<8} {'storage':<8} {'memory':>10} {'time':>9}")
+    for name, width, height in RESOLUTIONS:
+        cases = [
+            ("float", lambda w=width, h=height: pyray.Canvas(w, h)),
+            ("compact",
+             lambda w=width, h=height: pyray.Canvas(w, h, compact=True)),
+        ]
+        if width * height <= 1920 * 1080 or legacy_4k:
+            cases.append(
+                ("dict", lambda w=width, h=height: dict_canvas(w, h)))
+
+        for storage, factory in cases:
+            memory, elapsed = measure(factory)
+            print(f"{name:<8} {storage:<8} {memory:>8.1f}MB {elapsed:>8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+# Copyright (c) 2020-2021 Stefan Holdermans.
+# Licensed under the MIT License.
+
+"""Helpers shared by the benchmarks."""
+
+import timeit
+from typing import Callable
+
+import pyray
+
+
+def best_of(stmt: Callable[[], object], number: int = 2000,
+            repeat: int = 5) -> float:
+    """Return the best time, in seconds, of a single execution of a
+    statement.
+    """
+    return min(timeit.repeat(stmt, number=number, repeat=repeat)) / number
+
+
+def render_silhouette(canvas_pixels: int) -> pyray.Canvas:
+    """Cast rays at a sphere, squashed along its y axis, and draw its
+    silhouette to a canvas, like the silhouette acceptance test.
+    """
+    origin = pyray.point(0.0, 0.0, -5.0)
+    pixel_size = 7.0 / canvas_pixels
+    half = 3.5
+
+    canvas = pyray.Canvas(canvas_pixels, canvas_pixels)
+    shape = pyray.Sphere()
+    shape.scale(1.0, 0.5, 1.0)
+
+    for x, y in canvas:
+        target = pyray.point(pixel_size * x - half, half - pixel_size * y,
+                             10.0)
+        ray = pyray.Ray(origin, (target - origin).normalized())
+        if pyray.hit(shape.intersections(ray)):
+            canvas[x, y] = pyray.RED
+
+    return canvas
@@ -0,0 +1,53 @@
+# Copyright (c) 2020-2021 Stefan Holdermans.
+# Licensed under the MIT License.
+
+"""Benchmark comparing uniform grids with bounding volume hierarchies on
+dense clouds of similarly sized spheres.
+
+Run with `python -m benchmarks.grids`.
+"""
+
+import random
+import time
+from typing import List
+
+import pyray
+
+from .hierarchies import RAYS, per_ray, random_rays
+
+SIZES = [1000, 10000, 100000]
+
+
+def particles(n: int, rng: random.Random) -> List[pyray.Sphere]:
+    """Scatter equally sized spheres through a cube whose volume grows with
+    `n`.
+    """
+    half = (n ** (1 / 3)) * 2.0
+    spheres = []
+    for _ in range(n):
+        sphere = pyray.Sphere()
+        sphere.scale(0.3, 0.3, 0.3)
+        sphere.translate(rng.uniform(-half, half), rng.uniform(-half, half),
+                         rng.uniform(-half, half))
+        spheres.append(sphere)
+    return spheres
+
+
+def main():
+    """Run the benchmark and report the results."""
+    rng = random.Random(42)
+    print(f"{'spheres':>8} {'structure':<10} {'build':>9} {'per ray':>10}")
+    for n in SIZES:
+        spheres = particles(n, rng)
+        rays = random_rays(n, rng)
+        for name, build in [("grid", pyray.UniformGrid),
+                            ("bvh", pyray.BoundingVolumeHierarchy)]:
+            start = time.perf_counter()
+            structure = build(spheres)
+            elapsed = time.perf_counter() - start
+            us = per_ray(structure.nearest, rays[:RAYS])
+            print(f"{n:>8} {name:<10} {elapsed:>8.2f}s {us:>8.1f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# Copyright (c) 2020-2021 Stefan Holdermans.
+# Licensed under the MIT License.
+
+"""Benchmark measuring the time to build bounding volume hierarchies over
+increasing numbers of spheres and to trace rays through them, compared to
+intersecting the rays with every sphere.
+
+Run with `python -m benchmarks.hierarchies`. Pass `--max N` to change the
+largest number of spheres, by default 100000; building over 1000000 spheres
+takes several minutes.
+"""
+
+import random
+import sys
+import time
+from typing import List, Tuple as Pair
+
+import pyray
+
+SIZES = [10, 100, 1000, 10000, 100000, 1000000]
+RAYS = 1000
+BRUTE_FORCE_LIMIT = 10000
+
+
+def random_spheres(n: int, rng: random.Random) -> List[pyray.Sphere]:
+    """Scatter ellipsoids through a cube whose volume grows with `n`."""
+    half = (n ** (1 / 3)) * 2.0
+    spheres = []
+    for _ in range(n):
+        sphere = pyray.Sphere()
+        radius = rng.uniform(0.1, 0.5)
+        sphere.scale(radius, radius * rng.uniform(0.5, 2.0), radius)
+        sphere.rotate_y(rng.uniform(0.0, 3.14))
+        sphere.translate(rng.uniform(-half, half), rng.uniform(-half, half),
+                         rng.uniform(-half, half))
+        spheres.append(sphere)
+    return spheres
+
+
+def random_rays(n: int, rng: random.Random
+                ) -> List[Pair[pyray.Tuple, pyray.Tuple]]:
+    """Cast rays from outside the cube of `random_spheres` toward points
+    inside it.
+    """
+    half = (n ** (1 / 3)) * 2.0
+    rays = []
+    for _ in range(RAYS):
+        origin = pyray.point(rng.uniform(-half, half),
+                             rng.uniform(-half, half), -3.0 * half)
+        target = pyray.point(rng.uniform(-half, half),
+                             rng.uniform(-half, half), half)
+        rays.append((origin, (target - origin).normalized()))
+    return rays
+
+
+def per_ray(nearest, rays) -> float:
+    """Return the time, in microseconds, to trace a single ray."""
+    start = time.perf_counter()
+    for origin, direction in rays:
+        nearest(origin, direction)
+    return (time.perf_counter() - start) / len(rays) * 1e6
+
+
+def main():
+    """Run the benchmark and report the results."""
+    largest = 100000
+    if "--max" in sys.argv[1:]:
+        largest = int(sys.argv[sys.argv.index("--max") + 1])
+
+    rng = random.Random(42)
+    print(f"{'spheres':>8} {'build':>10} {'nodes':>8} {'bvh':>12}"
+          f" {'brute force':>12}")
+    for n in (size for size in SIZES if size <= largest):
+        spheres = random_spheres(n, rng)
+        rays = random_rays(n, rng)
+
+        start = time.perf_counter()
+        hierarchy = pyray.BoundingVolumeHierarchy(spheres)
+        build = time.perf_counter() - start
+        bvh_us = per_ray(hierarchy.nearest, rays)
+
+        brute_force = "-"
+        if n <= BRUTE_FORCE_LIMIT:
+            table = pyray.SphereTable(spheres)
+            brute_force = f"{per_ray(table.nearest, rays[:100]):>10.1f}us"
+
+        print(f"{n:>8} {build:>9.2f}s {hierarchy.node_count:>8}"
+              f" {bvh_us:>10.1f}us {brute_force:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# Copyright (c) 2020-2021 Stefan Holdermans.
+# Licensed under the MIT License.
+
+"""Micro-benchmark comparing cofactor expansion, LU decomposition, and the
+unrolled `Matrix4` specialisation for 4x4 determinants and inverses, and the
+generic and unrolled multiplication of 4x4 matrices.
+
+Run with `python -m benchmarks.matrices`.
+"""
+
+import pyray
+
+from .common import best_of
+
+
+def cofactor_determinant(m: pyray.Matrix) -> float:
+    """Compute the determinant of a matrix by recursive cofactor expansion."""
+    if m.is_first_order():
+        return m[0, 0]
+
+    acc = 0.0
+    for col in range(m.order):
+        acc += m[0, col] * cofactor(m, 0, col)
+    return acc
+
+
+def cofactor(m: pyray.Matrix, row: int, col: int) -> float:
+    """Compute a cofactor of a matrix by recursive cofactor expansion."""
+    minor = cofactor_determinant(m.submatrix(row, col))
+    return minor if (row + col) % 2 == 0 else -minor
+
+
+def cofactor_inversed(m: pyray.Matrix) -> pyray.Matrix:
+    """Invert a matrix by dividing its adjugate by its determinant."""
+    if cofactor_determinant(m) == 0.0:
+        raise pyray.NotInvertibleError()
+
+    det = cofactor_determinant(m)
+    inverse = pyray.Matrix(m.order)
+    for row, col in inverse:
+        inverse[col, row] = cofactor(m, row, col) / det
+    return inverse
+
+
+MATRIX = pyray.matrix4x4([-5.0, 2.0, 6.0, -8.0,
+                          1.0, -5.0, 1.0, 8.0,
+                          7.0, 7.0, -6.0, -7.0,
+                          1.0, -3.0, 7.0, 4.0])
+
+
+def generic_multiply(a: pyray.Matrix, b: pyray.Matrix) -> pyray.Matrix:
+    """Multiply two matrices by the generic row-by-column loop."""
+    m = pyray.Matrix(a.order)
+    for row, col in m:
+        m[row, col] = sum(a[row, i] * b[i, col] for i in range(a.order))
+    return m
+
+
+def main():
+    """Run the benchmark and report the results."""
+    pyray.set_backend("python")
+    cases = [
+        ("determinant", lambda: cofactor_determinant(MATRIX),
+         lambda: MATRIX.lu().determinant(), MATRIX.determinant),
+        ("inversed", lambda: cofactor_inversed(MATRIX),
+         lambda: MATRIX.lu().inversed(), MATRIX.inversed),
+        ("mul", lambda: generic_multiply(MATRIX, MATRIX), None,
+         lambda: MATRIX * MATRIX),
+    ]
+    print(f"{'4x4':<12} {'baseline':>12} {'lu':>12} {'unrolled':>12}"
+          f" {'speedup':>8}")
+    for name, before, lu, after in cases:
+        before_us = best_of(before) * 1e6
+        lu_column = f"{best_of(lu) * 1e6:>10.1f}us" if lu else f"{'-':>12}"
+        after_us = best_of(after) * 1e6
+        print(f"{name:<12} {before_us:>10.1f}us {lu_column} {after_us:>10.1f}us"
+              f" {before_us / after_us:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+# Copyright (c) 2020-2021 Stefan Holdermans.
+# Licensed under the MIT License.
+
+"""Benchmark suite timing the hot paths of the renderer: micro-benchmarks of
+matrix, tuple, and color arithmetic, ray-sphere intersection, lighting, and
+PPM encoding, and macro-benchmarks rendering the silhouette scene at several
+resolutions.
+
+Run with `python -m benchmarks.suite`. Every benchmark runs on fixed inputs
+with the default backend, as selected by `PYRAY_BACKEND`, unless
+`--backend NAME` is passed, and reports the best of several repeats,
+interleaved with those of the other benchmarks.
+Pass `--json PATH` to write the results to a JSON file, and `--compare PATH` to
+compare them with a baseline written earlier: benchmarks that got slower by
+more than `--tolerance`, by default 0.15 (15%), are flagged as regressions, and
+the suite then exits with status 1. Pass `--filter TEXT` to only run the
+benchmarks whose names contain `TEXT`, and `--quick` to skip the largest
+render.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Tuple as Pair
+
+import pyray
+
+from .common import best_of, render_silhouette
+
+SILHOUETTE_SIZES = [50, 100, 200]
+QUICK_SILHOUETTE_SIZES = [50, 100]
+
+# The number of executions per repeat of every micro-benchmark, chosen so that
+# a repeat takes in the order of 10 to 100 milliseconds, and the number of
+# repeats of which the best is taken.
+NUMBER = 2000
+REPEAT = 9
+MACRO_REPEAT = 5
+
+# The default relative slowdown flagged as a regression.
+TOLERANCE = 0.15
+
+Benchmark = Pair[str, Callable[[], object], int]
+
+
+def micro_benchmarks() -> Iterator[Benchmark]:
+    """Yield the name, statement, and number of executions per repeat of
+    every micro-benchmark.
+    """
+    # pylint: disable=too-many-locals
+    m = pyray.matrix4x4([-5.0, 2.0, 6.0, -8.0,
+                         1.0, -5.0, 1.0, 8.0,
+                         7.0, 7.0, -6.0, -7.0,
+                         1.0, -3.0, 7.0, 4.0])
+    p = pyray.point(1.0, 2.0, 3.0)
+    u = pyray.vector(1.0, 2.0, 3.0)
+    v = pyray.vector(4.0, 5.0, 6.0)
+    c1 = pyray.Color(0.9, 0.6, 0.75)
+    c2 = pyray.Color(0.7, 0.1, 0.25)
+
+    sphere = pyray.Sphere()
+    sphere.scale(2.0, 1.0, 1.0)
+    sphere.translate(0.5, 0.0, 0.0)
+    ray = pyray.Ray(pyray.point(0.0, 0.0, -5.0), pyray.vector(0.0, 0.0, 1.0))
+    surface = pyray.point(0.5, 0.0, -1.0)
+    xs = pyray.intersections(pyray.Intersection(5.0, sphere),
+                             pyray.Intersection(7.0, sphere),
+                             pyray.Intersection(-3.0, sphere),
+                             pyray.Intersection(2.0, sphere))
+
+    material = pyray.Material()
+    light = pyray.PointLight(pyray.point(0.0, 10.0, -10.0), pyray.WHITE)
+    origin = pyray.point(0.0, 0.0, 0.0)
+    eyev = pyray.vector(0.0, 0.0, -1.0)
+    normalv = pyray.vector(0.0, 0.0, -1.0)
+
+    canvas = pyray.Canvas(64, 64)
+    for x, y in canvas:
+        canvas[x, y] = pyray.Color(x / 63.0, y / 63.0, (x + y) / 126.0)
+
+    yield "matrix.mul", lambda: m * m, NUMBER
+    yield "matrix.transform", lambda: m * p, NUMBER
+    yield "matrix.inversed", m.inversed, NUMBER
+    yield "tuple.add", lambda: u + v, 50 * NUMBER
+    yield "tuple.mul", lambda: u * 2.0, 50 * NUMBER
+    yield "tuple.dot", lambda: u.dot(v), 50 * NUMBER
+    yield "tuple.normalized", u.normalized, 50 * NUMBER
+    yield "color.add", lambda: c1 + c2, 50 * NUMBER
+    yield "color.mul", lambda: c1 * c2, 50 * NUMBER
+    yield "sphere.intersections", lambda: sphere.intersections(ray), NUMBER
+    yield "sphere.normal_at", lambda: sphere.normal_at(surface), NUMBER
+    yield "hit", lambda: pyray.hit(xs), 10 * NUMBER
+    yield ("material.lighting",
+           lambda: material.lighting(light, origin, eyev, normalv), NUMBER)
+    yield "canvas.ppm", canvas.ppm, 10
+
+
+def macro_benchmarks(sizes: List[int]) -> Iterator[Benchmark]:
+    """Yield the name, statement, and number of executions per repeat of
+    every macro-benchmark.
+    """
+    for size in sizes:
+        yield (f"render.silhouette.{size}",
+               lambda size=size: render_silhouette(size), 1)
+
+
+def run(benchmarks: List[Pair[Benchmark, int]]) -> Dict[str, float]:
+    """Run benchmarks, each with its number of repeats, and return the best
+    time of every benchmark by name.
+
+    The repeats of all benchmarks are interleaved, round by round, so that a
+    spell in which the machine is slow, such as one in which it is busy with
+    other work or has yet to clock up, is spread over all benchmarks rather
+    than spoiling every repeat of a few. The times are reported after the
+    last round.
+    """
+    times: Dict[str, float] = {}
+    for round_ in range(max((repeat for _, repeat in benchmarks), default=0)):
+        for (name, stmt, number), repeat in benchmarks:
+            if round_ < repeat:
+                seconds = best_of(stmt, number, 1)
+                times[name] = min(times.get(name, seconds), seconds)
+
+    results = {}
+    for (name, _, _), _ in benchmarks:
+        results[name] = times[name]
+        print(f"{name:<28} {format_time(results[name]):>12}")
+    return results
+
+
+def format_time(seconds: float) -> str:
+    """Format a time with a unit that suits its magnitude."""
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f}{unit}"
+    return f"{seconds / 1e-9:.0f}ns"
+
+
+def environment(backend: str) -> Dict[str, str]:
+    """Describe the environment in which the benchmarks ran."""
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "backend": backend,
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float],
+            tolerance: float) -> List[str]:
+    """Report how the results compare with a baseline and return the names of
+    the benchmarks that regressed by more than the tolerance.
+    """
+    regressions = []
+    print()
+    print(f"{'benchmark':<28} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, seconds in results.items():
+        if name not in baseline:
+            print(f"{name:<28} {'-':>12} {format_time(seconds):>12}"
+                  f" {'new':>8}")
+            continue
+
+        change = seconds / baseline[name] - 1.0
+        flag = ""
+        if change > tolerance:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif change < -tolerance:
+            flag = "  improved"
+        print(f"{name:<28} {format_time(baseline[name]):>12}"
+              f" {format_time(seconds):>12} {change:>+7.1%}{flag}")
+    return regressions
+
+
+def parse_arguments(argv: List[str]) -> argparse.Namespace:
+    """Parse the command-line arguments."""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite")
+    parser.add_argument("--json", metavar="PATH",
+                        help="write the results to a JSON file")
+    parser.add_argument("--compare", metavar="PATH",
+                        help="compare the results with a baseline JSON file")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help="relative slowdown flagged as a regression")
+    parser.add_argument("--backend", default=pyray.get_backend(),
+                        choices=pyray.available_backends(),
+                        help="the numeric backend, by default the one"
+                        " selected by PYRAY_BACKEND, or else python")
+    parser.add_argument("--filter", metavar="TEXT", default="",
+                        help="only run benchmarks whose names contain TEXT")
+    parser.add_argument("--quick", action="store_true",
+                        help="skip the largest render")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the suite and report the results; return the exit status."""
+    args = parse_arguments(sys.argv[1:] if argv is None else argv)
+    pyray.set_backend(args.backend)
+
+    # Load the baseline before running anything, so that the baseline is not
+    # overwritten if it is also the file to write the results to.
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fp:
+            baseline = json.load(fp)
+
+    sizes = QUICK_SILHOUETTE_SIZES if args.quick else SILHOUETTE_SIZES
+    benchmarks = ([(benchmark, REPEAT) for benchmark in micro_benchmarks()]
+                  + [(benchmark, MACRO_REPEAT)
+                     for benchmark in macro_benchmarks(sizes)])
+    benchmarks = [(benchmark, repeat) for benchmark, repeat in benchmarks
+                  if args.filter in benchmark[0]]
+    results = run(benchmarks)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fp:
+            json.dump({"environment": environment(args.backend),
+                       "results": results}, fp, indent=2, sort_keys=True)
+            fp.write("\n")
+
+    if baseline is not None:
+        if baseline["environment"].get("backend") != args.backend:
+            print(f"warning: the baseline was run with the"
+                  f" {baseline['environment'].get('backend')} backend")
+        regressions = compare(results, baseline["results"], args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): "
+                  + ", ".join(regressions))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+# Copyright (c) 2020-2021 Stefan Holdermans.
+# Licensed under the MIT License.
+
+"""Benchmark comparing the allocation cost and throughput of the tuple-based
+`Tuple` and `Color` with the dataclasses they replaced.
+
+Run with `python -m benchmarks.tuples`.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import math
+import numbers
+import tracemalloc
+
+import pyray
+
+from .common import best_of
+
+
+@dataclass
+class DataclassTuple:
+    """The dataclass-based tuple, reduced to the benchmarked operations."""
+
+    x: float
+    y: float
+    z: float
+    w: float
+
+    def normalized(self) -> DataclassTuple:
+        """Normalize the tuple."""
+        magnitude = math.sqrt(self.x * self.x + self.y * self.y
+                              + self.z * self.z + self.w * self.w)
+        return DataclassTuple(self.x / magnitude, self.y / magnitude,
+                              self.z / magnitude, self.w / magnitude)
+
+    def dot(self, other: DataclassTuple) -> float:
+        """Compute the dot product of the tuple with another tuple."""
+        return (self.x * other.x + self.y * other.y
+                + self.z * other.z + self.w * other.w)
+
+    def __add__(self, other):
+        if isinstance(other, DataclassTuple):
+            return DataclassTuple(self.x + other.x, self.y + other.y,
+                                  self.z + other.z, self.w + other.w)
+        return NotImplemented
+
+    def __mul__(self, scalar):
+        if isinstance(scalar, numbers.Number):
+            return DataclassTuple(self.x * scalar, self.y * scalar,
+                                  self.z * scalar, self.w * scalar)
+        return NotImplemented
+
+
+@dataclass
+class DataclassColor:
+    """The dataclass-based color, reduced to the benchmarked operations."""
+
+    red: float
+    green: float
+    blue: float
+
+    def __add__(self, other):
+        if isinstance(other, DataclassColor):
+            return DataclassColor(self.red + other.red,
+                                  self.green + other.green,
+                                  self.blue + other.blue)
+        return NotImplemented
+
+    def __mul__(self, other):
+        if isinstance(other, DataclassColor):
+            return DataclassColor(self.red * other.red,
+                                  self.green * other.green,
+                                  self.blue * other.blue)
+        if isinstance(other, numbers.Number):
+            return DataclassColor(self.red * other, self.green * other,
+                                  self.blue * other)
+        return NotImplemented
+
+
+def allocated_bytes(factory, count: int = 100_000) -> float:
+    """Return the number of bytes allocated per object when keeping `count`
+    objects alive.
+    """
+    tracemalloc.start()
+    objects = [factory(i) for i in range(count)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return size / count
+
+
+def main():
+    """Run the benchmark and report the results."""
+    t1, t2 = DataclassTuple(1.0, 2.0, 3.0, 0.0), DataclassTuple(4.0, 5.0, 6.0,
+                                                                0.0)
+    u1, u2 = pyray.vector(1.0, 2.0, 3.0), pyray.vector(4.0, 5.0, 6.0)
+    c1, c2 = DataclassColor(0.9, 0.6, 0.75), DataclassColor(0.7, 0.1, 0.25)
+    d1, d2 = pyray.Color(0.9, 0.6, 0.75), pyray.Color(0.7, 0.1, 0.25)
+
+    print(f"{'':<24} {'before':>10} {'after':>10}")
+    before = allocated_bytes(lambda i: DataclassTuple(i, 0.0, 0.0, 1.0))
+    after = allocated_bytes(lambda i: pyray.point(i, 0.0, 0.0))
+    print(f"{'Tuple bytes/object':<24} {before:>10.0f} {after:>10.0f}")
+    before = allocated_bytes(lambda i: DataclassColor(i, 0.0, 0.0))
+    after = allocated_bytes(lambda i: pyray.Color(i, 0.0, 0.0))
+    print(f"{'Color bytes/object':<24} {before:>10.0f} {after:>10.0f}")
+
+    cases = [
+        ("Tuple.__add__", lambda: t1 + t2, lambda: u1 + u2),
+        ("Tuple.__mul__", lambda: t1 * 2.0, lambda: u1 * 2.0),
+        ("Tuple.dot", lambda: t1.dot(t2), lambda: u1.dot(u2)),
+        ("Tuple.normalized", t1.normalized, u1.normalized),
+        ("Color.__add__", lambda: c1 + c2, lambda: d1 + d2),
+        ("Color.__mul__", lambda: c1 * 0.5, lambda: d1 * 0.5),
+    ]
+    for name, before_stmt, after_stmt in cases:
+        before = best_of(before_stmt, 100_000) * 1e9
+        after = best_of(after_stmt, 100_000) * 1e9
+        print(f"{name + ' ns/op':<24} {before:>10.0f} {after:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
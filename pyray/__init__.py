@@ -3,17 +3,28 @@
 
 """A photorealistic 3D renderer."""
 
-from .canvases import Canvas
+from .backends import available_backends, get_backend, set_backend
+from .buffers import AccumulationBuffer
+from .caches import CacheStatistics
+from .cameras import Camera
+from .canvases import Canvas, SparseCanvas, SharedCanvas
 from .colors import Color, RED, GREEN, BLUE, BLACK, WHITE
+from .grids import UniformGrid
+from .hierarchies import BoundingVolumeHierarchy
 from .intersections import Intersection, intersections, hit
-from .lights import PointLight
+from .intersections import IntersectionCollector
+from .lights import PointLight, LightIndex, CullingStatistics
 from .materials import Material
 from .matrices import Matrix, OrderError, NotInvertibleError
+from .matrices import LUDecomposition, Matrix2, Matrix3, Matrix4
 from .matrices import matrix2x2, matrix3x3, matrix4x4
 from .rays import Ray
-from .spheres import Sphere
+from .scenes import Scene, render, render_progressive
+from .scenes import RenderedTile, render_async
+from .shadows import ShadowTester
+from .spheres import Sphere, SphereTable
 from .transformations import translation, scaling
 from .transformations import rotation_x, rotation_y, rotation_z
-from .transformations import shearing
+from .transformations import shearing, view_transform
 from .transformations import Transformation
-from .tuples import Tuple, TupleTypeMismatchError, point, vector
+from .tuples import Tuple, TupleTypeMismatchError, point, vector, ORIGIN
@@ -0,0 +1,290 @@
+# Copyright (c) 2020-2021 Stefan Holdermans.
+# Licensed under the MIT License.
+
+"""Numeric backends.
+
+A backend determines how matrix cells are stored and may provide native
+kernels for matrix arithmetic. Two backends are available: `"python"`, which
+stores cells in lists and relies on the generic pure-Python code in
+`pyray.matrices`, and `"numpy"`, which stores cells in NumPy arrays and is
+only available if NumPy is installed.
+
+The initial backend is taken from the `PYRAY_BACKEND` environment variable;
+if it is not set, the pure-Python backend is used, even if NumPy is
+installed: for 4x4 matrices the per-call overhead of NumPy outweighs the
+arithmetic, so NumPy only pays off for batches and is selected explicitly.
+"""
+
+import os
+from typing import Any, Dict, List, Sequence
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+Cells = Sequence[float]
+
+
+class Backend:
+    """A numeric backend.
+
+    Kernels return `NotImplemented` if the backend has no native
+    implementation of an operation, in which case callers fall back on their
+    generic code.
+    """
+
+    name: str = ""
+
+    def cells(self, values: Cells) -> Cells:
+        """Return the storage for the given cell values."""
+        return values
+
+    def multiply(self, order: int, a: Cells, b: Cells) -> Any:
+        """Multiply two square matrices given by their cells."""
+        # pylint: disable=no-self-use,unused-argument
+        return NotImplemented
+
+    def transform(self, cells: Cells,
+                  x: float, y: float, z: float, w: float) -> Any:
+        """Multiply a 4x4 matrix given by its cells with a tuple."""
+        # pylint: disable=no-self-use,unused-argument,too-many-arguments
+        return NotImplemented
+
+    def transpose(self, order: int, cells: Cells) -> Any:
+        """Transpose a square matrix given by its cells."""
+        # pylint: disable=no-self-use,unused-argument
+        return NotImplemented
+
+    def determinant(self, order: int, cells: Cells) -> Any:
+        """Compute the determinant of a square matrix given by its cells."""
+        # pylint: disable=no-self-use,unused-argument
+        return NotImplemented
+
+    def inverse(self, order: int, cells: Cells) -> Any:
+        """Invert a square matrix given by its cells.
+
+        Singular matrices are left to the caller by returning `NotImplemented`.
+        """
+        # pylint: disable=no-self-use,unused-argument
+        return NotImplemented
+
+    def intersect_unit_sphere(self, cells: Cells, origins: Any,
+                              directions: Any) -> Any:
+        """Intersect a batch of rays with the unit sphere after transforming
+        them by a 4x4 matrix given by its cells.
+
+        Returns the distances to the hits, i.e., the lowest nonnegative
+        intersections, and a mask that tells which rays hit the sphere.
+        """
+        # pylint: disable=no-self-use,unused-argument
+        return NotImplemented
+
+    def nearest_unit_sphere_hits(self, cells: Cells, origins: Any,
+                                 directions: Any) -> Any:
+        """Intersect a batch of rays with a table of unit spheres, each
+        transformed by its own 4x4 matrix, given by consecutive runs of 16
+        cells in a contiguous buffer.
+
+        Returns, for every ray, the index of the sphere with the nearest hit,
+        or -1 if the ray hits none, and the distance to that hit.
+        """
+        # pylint: disable=no-self-use,unused-argument
+        return NotImplemented
+
+    def lighting(self, material: Sequence[float], light: Sequence[float],
+                 points: Any, eyevs: Any, normalvs: Any,
+                 in_shadow: Any) -> Any:
+        """Illuminate a material, given by its red, green, and blue color
+        components, ambient, diffuse, and specular reflection, and shininess,
+        at a batch of points for a light, given by the x, y, and z coordinates
+        of its position, its red, green, and blue intensities, and its radius
+        of influence, or infinity, with an eye and a normal vector for every
+        point and optionally a flag for every point that tells whether it is
+        in shadow.
+
+        Returns the red, green, and blue intensities of the illuminated
+        points, one point after another.
+        """
+        # pylint: disable=no-self-use,unused-argument,too-many-arguments
+        return NotImplemented
+
+
+class PythonBackend(Backend):
+    """A backend that stores cells in lists and leaves all arithmetic to the
+    generic pure-Python code.
+    """
+
+    name = "python"
+
+
+class NumPyBackend(Backend):
+    """A backend that stores cells in NumPy arrays and delegates arithmetic to
+    NumPy.
+    """
+
+    name = "numpy"
+
+    def cells(self, values: Cells) -> Cells:
+        return numpy.asarray(values, dtype=float)
+
+    def multiply(self, order: int, a: Cells, b: Cells) -> Any:
+        a = numpy.reshape(a, (order, order))
+        b = numpy.reshape(b, (order, order))
+        return (a @ b).ravel()
+
+    def transform(self, cells: Cells,
+                  x: float, y: float, z: float, w: float) -> Any:
+        # pylint: disable=too-many-arguments
+        m = numpy.reshape(cells, (4, 4))
+        x, y, z, w = (m @ numpy.array((x, y, z, w))).tolist()
+        return x, y, z, w
+
+    def transpose(self, order: int, cells: Cells) -> Any:
+        return numpy.reshape(cells, (order, order)).T.ravel()
+
+    def determinant(self, order: int, cells: Cells) -> Any:
+        return float(numpy.linalg.det(numpy.reshape(cells, (order, order))))
+
+    def inverse(self, order: int, cells: Cells) -> Any:
+        try:
+            m = numpy.linalg.inv(numpy.reshape(cells, (order, order)))
+        except numpy.linalg.LinAlgError:
+            return NotImplemented
+        return m.ravel()
+
+    def intersect_unit_sphere(self, cells: Cells, origins: Any,
+                              directions: Any) -> Any:
+        m = numpy.reshape(cells, (4, 4)).T
+        sphere_to_ray = _tuple_array(origins) @ m
+        direction = _tuple_array(directions) @ m
+        ts = _unit_sphere_hits(sphere_to_ray, direction)
+        return ts, numpy.isfinite(ts)
+
+    def nearest_unit_sphere_hits(self, cells: Cells, origins: Any,
+                                 directions: Any) -> Any:
+        m = numpy.frombuffer(cells, dtype=float).reshape(-1, 4, 4)
+        origins = _tuple_array(origins)
+        directions = _tuple_array(directions)
+        if len(m) == 0:
+            return (numpy.full(len(origins), -1),
+                    numpy.full(len(origins), numpy.inf))
+
+        sphere_to_ray = numpy.einsum("nij,rj->rni", m, origins)
+        direction = numpy.einsum("nij,rj->rni", m, directions)
+        ts = _unit_sphere_hits(sphere_to_ray, direction)
+        indices = numpy.argmin(ts, axis=1)
+        ts = numpy.take_along_axis(ts, indices[:, None], axis=1)[:, 0]
+        indices[numpy.isinf(ts)] = -1
+        return indices, ts
+
+    def lighting(self, material: Sequence[float], light: Sequence[float],
+                 points: Any, eyevs: Any, normalvs: Any,
+                 in_shadow: Any) -> Any:
+        # pylint: disable=too-many-arguments,too-many-locals
+        red, green, blue, ambient, diffuse, specular, shininess = material
+        color = numpy.array((red, green, blue))
+        position = numpy.array(light[:3])
+        intensity = numpy.array(light[3:6])
+        radius = light[6]
+        points = _tuple_array(points)[:, :3]
+        eyevs = _tuple_array(eyevs)[:, :3]
+        normalvs = _tuple_array(normalvs)[:, :3]
+
+        effective_color = color * intensity
+        lightvs = position - points
+        distances = numpy.sqrt(numpy.einsum("ij,ij->i", lightvs, lightvs))
+        lightvs /= distances[:, None]
+        light_dot_normal = numpy.einsum("ij,ij->i", lightvs, normalvs)
+        lit = light_dot_normal >= 0.0
+        if in_shadow is not None:
+            lit &= ~numpy.fromiter(in_shadow, dtype=bool, count=len(lit))
+
+        reflectvs = normalvs * (2.0 * light_dot_normal)[:, None] - lightvs
+        reflect_dot_eye = numpy.einsum("ij,ij->i", reflectvs, eyevs)
+        shiny = lit & (reflect_dot_eye > 0.0)
+        factor = numpy.zeros(len(points))
+        factor[shiny] = reflect_dot_eye[shiny] ** shininess
+
+        colors = numpy.tile(effective_color * ambient, (len(points), 1))
+        colors += numpy.where(lit, light_dot_normal, 0.0)[:, None] * (
+            effective_color * diffuse)
+        colors += factor[:, None] * (intensity * specular)
+        if radius < numpy.inf:
+            falloff = numpy.maximum(1.0 - (distances / radius) ** 2, 0.0)
+            colors *= (falloff * falloff)[:, None]
+        return colors.ravel()
+
+
+def _tuple_array(values: Any) -> Any:
+    """Return a batch of tuples, given as an array or as any iterable of
+    tuples, as an array of floats of shape (n, 4).
+    """
+    if not isinstance(values, numpy.ndarray):
+        values = list(values)
+    return numpy.reshape(values, (-1, 4)).astype(float)
+
+
+def _unit_sphere_hits(sphere_to_ray: Any, direction: Any) -> Any:
+    """Return, for arrays of rays in object space whose last axis holds the
+    components of their origins and directions, the distances to their hits
+    with the unit sphere, or infinity for rays that miss it.
+    """
+    sphere_to_ray[..., 3] -= 1.0
+
+    a = numpy.einsum("...i,...i->...", direction, direction)
+    b = 2.0 * numpy.einsum("...i,...i->...", direction, sphere_to_ray)
+    c = numpy.einsum("...i,...i->...", sphere_to_ray, sphere_to_ray) - 1.0
+
+    discriminant = b * b - 4 * a * c
+    root = numpy.sqrt(numpy.maximum(discriminant, 0.0))
+    t1 = (-b - root) / (2.0 * a)
+    t2 = (-b + root) / (2.0 * a)
+
+    t1[t1 < 0.0] = numpy.inf
+    t2[t2 < 0.0] = numpy.inf
+    ts = numpy.minimum(t1, t2)
+    ts[discriminant < 0.0] = numpy.inf
+    return ts
+
+
+_BACKENDS: Dict[str, Backend] = {"python": PythonBackend()}
+if numpy is not None:
+    _BACKENDS["numpy"] = NumPyBackend()
+
+
+def available_backends() -> List[str]:
+    """Return the names of the backends that can be selected."""
+    return list(_BACKENDS)
+
+
+def set_backend(name: str):
+    """Select the backend used for matrices created from now on.
+
+    Raises `ValueError` if there is no backend with the given name, and
+    `ImportError` if the NumPy backend is requested while NumPy is not
+    installed.
+    """
+    global _current  # pylint: disable=global-statement,invalid-name
+
+    if name == "numpy" and numpy is None:
+        raise ImportError("the numpy backend requires NumPy")
+
+    if name not in _BACKENDS:
+        raise ValueError(f"unknown backend: {name}")
+
+    _current = _BACKENDS[name]
+
+
+def get_backend() -> str:
+    """Return the name of the selected backend."""
+    return _current.name
+
+
+def current() -> Backend:
+    """Return the selected backend."""
+    return _current
+
+
+_current: Backend = _BACKENDS["python"]
+set_backend(os.environ.get("PYRAY_BACKEND", _current.name))
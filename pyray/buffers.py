@@ -0,0 +1,148 @@
+# Copyright (c) 2020-2021 Stefan Holdermans.
+# Licensed under the MIT License.
+
+# Prevent pylint from mistakenly reporting that `Optional` is unsubscriptable:
+#   pylint: disable=unsubscriptable-object
+# See https://github.com/PyCQA/pylint/issues/3882.
+
+"""High-dynamic-range accumulation buffers."""
+
+from __future__ import annotations
+
+from array import array
+import functools
+from typing import Iterator, Optional, Sequence
+
+from .canvases import Canvas
+
+# The number of steps into which tone curves divide the intensities from 0 to
+# 1. It is a multiple of 2 * 255, so that, without gamma correction, no step
+# straddles the boundary between two color values.
+_TONE_STEPS = 2 * Canvas.MAX_COLOR_VALUE * 128
+
+
+class AccumulationBuffer(Canvas):
+    """A canvas of high-dynamic-range pixels, into which color contributions,
+    such as those of several lights or of several samples per pixel, are
+    accumulated.
+
+    Intensities are summed in place in the buffer of double-precision floats
+    of the canvas and are never clamped. They are only quantised to 8-bit
+    color values when the buffer is tone-mapped: intensities are scaled by an
+    exposure, clamped, and optionally gamma-corrected by looking them up in a
+    precomputed table, one row of pixels at a time.
+    """
+
+    def __init__(self, width: int, height: int):
+        super().__init__(width, height)
+
+    def add(self, x: int, y: int, color: Sequence[float],
+            weight: float = 1.0):
+        """Add a weighted color contribution to the pixel at a given position.
+
+        Raises `IndexError` if the position is outside the buffer.
+        """
+        if (x, y) not in self:
+            raise IndexError
+
+        i = 3 * (y * self.width + x)
+        pixels = self._pixels
+        pixels[i] += color[0] * weight
+        pixels[i + 1] += color[1] * weight
+        pixels[i + 2] += color[2] * weight
+
+    def add_block(self, x: int, y: int, width: int,
+                  intensities: Sequence[float], weight: float = 1.0):
+        """Add a weighted block of pixels of a given width, with its red,
+        green, and blue intensities given row by row, as by `paste`, to the
+        pixels of the buffer, with its top-left pixel at a given position.
+
+        Raises `IndexError` if the block does not fit in the buffer.
+        """
+        stride = 3 * width
+        height = self._block_height(x, y, width, intensities)
+        pixels = self._pixels
+        for row in range(height):
+            i = 3 * ((y + row) * self.width + x)
+            offset = row * stride - i
+            for j in range(i, i + stride):
+                pixels[j] += intensities[j + offset] * weight
+
+    def scale(self, factor: float):
+        """Scale the intensities of all pixels by a given factor."""
+        pixels = self._pixels
+        for i, intensity in enumerate(pixels):
+            pixels[i] = intensity * factor
+
+    def clear(self):
+        """Reset the intensities of all pixels to zero."""
+        pixels = self._pixels
+        if not pixels:
+            return
+
+        # Zero the first intensity, then keep doubling the zeroed prefix.
+        pixels[0] = 0.0
+        with memoryview(pixels) as view:
+            size = 1
+            while size < len(view):
+                count = min(size, len(view) - size)
+                view[size:size + count] = view[:count]
+                size += count
+
+    def tone_mapped_rows(self, exposure: float = 1.0,
+                         gamma: Optional[float] = None) -> Iterator[bytes]:
+        """Yield, for every row of pixels, the 8-bit color values of its red,
+        green, and blue intensities, after scaling them by `exposure`,
+        clamping them to the range from 0 to 1, and, if a gamma is given,
+        raising them to the power of its reciprocal. NaN is mapped to 0.
+
+        Without gamma correction, the color values are those of `Canvas`,
+        except, possibly, for intensities within a rounding error of halfway
+        between two color values.
+
+        Raises `ValueError` if `gamma` is not positive.
+        """
+        curve = _tone_curve(gamma)
+        scale = float(exposure * _TONE_STEPS)
+        steps = float(_TONE_STEPS)
+        maximum = curve[-1]
+        pixels = self._pixels
+        stride = 3 * self.width
+        for y in range(self.height):
+            row = pixels[y * stride:(y + 1) * stride]
+            yield bytes([curve[int(t)] if 0.0 <= t <= steps
+                         else maximum if t > steps else 0
+                         for t in map(scale.__mul__, row)])
+
+    def canvas(self, exposure: float = 1.0,
+               gamma: Optional[float] = None) -> Canvas:
+        """Tone-map the buffer, as by `tone_mapped_rows`, onto a new compact
+        canvas.
+
+        Raises `ValueError` if `gamma` is not positive.
+        """
+        values = array("B")
+        for row in self.tone_mapped_rows(exposure, gamma):
+            values.frombytes(row)
+        return Canvas._from_pixels(self.width, self.height, values)
+
+
+@functools.lru_cache(maxsize=None)
+def _tone_curve(gamma: Optional[float]) -> bytes:
+    """Return the color values of the midpoints of the steps into which the
+    intensities from 0 to 1 are divided, followed by the color value of 1.
+
+    The first step takes the color value of 0 instead, so that black stays
+    black however steep the curve is near 0.
+    """
+    if gamma is not None and not gamma > 0.0:
+        raise ValueError("gamma must be positive")
+
+    # pylint: disable=protected-access
+    exponent = 1.0 if gamma is None else 1.0 / gamma
+    values = [0]
+    for step in range(1, _TONE_STEPS):
+        intensity = (step + 0.5) / _TONE_STEPS
+        values.append(Canvas._color_value(intensity ** exponent))
+    values.append(Canvas.MAX_COLOR_VALUE)
+    return bytes(values)
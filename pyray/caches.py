@@ -0,0 +1,21 @@
+# Copyright (c) 2020-2021 Stefan Holdermans.
+# Licensed under the MIT License.
+
+"""Cache bookkeeping."""
+
+from dataclasses import dataclass
+
+
+@dataclass
+class CacheStatistics:
+    """Counters that record how often a cached value was reused and how often
+    it had to be recomputed.
+    """
+
+    hits: int = 0
+    recomputations: int = 0
+
+    def reset(self):
+        """Reset all counters to zero."""
+        self.hits = 0
+        self.recomputations = 0
@@ -0,0 +1,137 @@
+# Copyright (c) 2020-2021 Stefan Holdermans.
+# Licensed under the MIT License.
+
+# Prevent pylint from mistakenly reporting that `Optional` is unsubscriptable:
+#   pylint: disable=unsubscriptable-object
+# See https://github.com/PyCQA/pylint/issues/3882.
+
+"""Cameras."""
+
+from array import array
+import math
+from typing import Dict, Iterator, Optional, Tuple as Pair
+
+from .caches import CacheStatistics
+from .matrices import Matrix
+from .rays import Ray
+from .tuples import Tuple, ORIGIN, point
+
+# A rectangle of pixels, given by the position of its top-left pixel, its
+# width, and its height.
+Tile = Pair[int, int, int, int]
+
+
+class Camera:
+    # pylint: disable=too-many-instance-attributes
+    """A camera that maps a canvas of `hsize` by `vsize` pixels onto a plane
+    one unit in front of it, viewing the scene through the given field of
+    view.
+
+    The directions of the rays through the pixels are computed once per tile
+    and cached, so repeated renders from the same viewpoint skip generating
+    rays; the cache is cleared when the camera's transformation is changed.
+    """
+
+    def __init__(self, hsize: int, vsize: int, field_of_view: float,
+                 transform: Optional[Matrix] = None):
+        self._hsize = hsize
+        self._vsize = vsize
+        self._field_of_view = field_of_view
+
+        half_view = math.tan(field_of_view / 2)
+        aspect = hsize / vsize
+        if aspect >= 1.0:
+            self._half_width = half_view
+            self._half_height = half_view / aspect
+        else:
+            self._half_width = half_view * aspect
+            self._half_height = half_view
+        self._pixel_size = self._half_width * 2 / hsize
+
+        self._directions: Dict[Tile, array] = {}
+        self.cache_statistics = CacheStatistics()
+        self.transform = transform if transform is not None \
+            else Matrix.identity(4)
+
+    @property
+    def hsize(self) -> int:
+        """The horizontal size of the canvas, in pixels."""
+        return self._hsize
+
+    @property
+    def vsize(self) -> int:
+        """The vertical size of the canvas, in pixels."""
+        return self._vsize
+
+    @property
+    def field_of_view(self) -> float:
+        """The angle, in radians, that describes how much the camera sees."""
+        return self._field_of_view
+
+    @property
+    def pixel_size(self) -> float:
+        """The size of a pixel on the plane in front of the camera."""
+        return self._pixel_size
+
+    @property
+    def transform(self) -> Matrix:
+        """The view transformation, which orients the world relative to the
+        camera.
+        """
+        return self._transform
+
+    @transform.setter
+    def transform(self, transform: Matrix):
+        self._transform = transform
+        self._inverse_transform = transform.inversed()
+        self._origin = self._inverse_transform * ORIGIN
+        self._directions.clear()
+
+    @property
+    def origin(self) -> Tuple:
+        """The position of the camera, from which all rays start."""
+        return self._origin
+
+    def ray_for_pixel(self, px: int, py: int) -> Ray:
+        """Return the ray from the camera through the center of a pixel."""
+        return Ray(self._origin, self._direction(px, py))
+
+    def directions(self, tile: Optional[Tile] = None) -> array:
+        """Return the directions of the rays through the pixels of a tile, or
+        of the whole canvas, row by row, as the x, y, z, and w components of
+        normalized vectors.
+
+        The directions are cached per tile.
+        """
+        if tile is None:
+            tile = (0, 0, self._hsize, self._vsize)
+
+        directions = self._directions.get(tile)
+        if directions is not None:
+            self.cache_statistics.hits += 1
+            return directions
+
+        self.cache_statistics.recomputations += 1
+        left, top, width, height = tile
+        directions = array("d")
+        for py in range(top, top + height):
+            for px in range(left, left + width):
+                directions.extend(self._direction(px, py))
+        self._directions[tile] = directions
+        return directions
+
+    def rays(self, tile: Optional[Tile] = None) -> Iterator[Ray]:
+        """Yield the rays through the pixels of a tile, or of the whole
+        canvas, row by row, from the cached directions.
+        """
+        # pylint: disable=protected-access
+        origin = self._origin
+        directions = self.directions(tile)
+        for i in range(0, len(directions), 4):
+            yield Ray._of(origin, tuple.__new__(Tuple, directions[i:i + 4]))
+
+    def _direction(self, px: int, py: int) -> Tuple:
+        world_x = self._half_width - (px + 0.5) * self._pixel_size
+        world_y = self._half_height - (py + 0.5) * self._pixel_size
+        pixel = self._inverse_transform * point(world_x, world_y, -1.0)
+        return (pixel - self._origin).normalized()
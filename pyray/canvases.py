@@ -5,68 +5,844 @@
 
 from __future__ import annotations
 
-import textwrap
-from typing import Iterator, List, Tuple as Pair
+from array import array
+from bisect import bisect_left
+import functools
+import io
+import mmap
+import re
+import struct
+import sys
+from typing import (BinaryIO, Dict, Iterator, List, Optional, Sequence,
+                    TextIO, Tuple as Pair)
+import zlib
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    shared_memory = None
 
 from .colors import Color, BLACK
 
 
-class Canvas:
-    """A rectangular grid of pixels."""
+class _BaseCanvas:
+    """What all canvases share, whatever the storage of their pixels: their
+    dimensions, the positions of their pixels, and their PPM and PNG
+    representations, written from the color values and lines of PPM pixel
+    data that every kind of canvas produces for itself, row by row.
+    """
 
     def __init__(self, width: int, height: int):
         self.width = width
         self.height = height
 
-        self._pixels = {(x, y): BLACK
-                        for x in range(width)
-                        for y in range(height)}
-
     def __iter__(self) -> Iterator[Pair[int, int]]:
-        yield from self._pixels
+        for x in range(self.width):
+            for y in range(self.height):
+                yield x, y
 
-    def __getitem__(self, pos: Pair[int, int]) -> Color:
-        if pos not in self:
-            raise IndexError
+    def __contains__(self, pos: Pair[int, int]) -> bool:
+        x, y = pos
+        return 0 <= x < self.width and 0 <= y < self.height
 
-        return self._pixels[pos]
+    @classmethod
+    def from_ppm(cls, path: str, **options) -> _BaseCanvas:
+        """Read a canvas of this class from a plain (P3) or binary (P6) PPM
+        file, passing any keyword options, such as `compact`, on to its
+        constructor.
 
-    def __setitem__(self, pos: Pair[int, int], color: Color):
-        if pos not in self:
-            raise IndexError
+        The file is memory-mapped and its samples are converted in bulk into
+        the storage of the canvas; color values are scaled by the maximum
+        color value of the file.
 
-        self._pixels[pos] = color
+        Raises `ValueError` if the file is not a well-formed PPM file.
+        """
+        with open(path, "rb") as file, \
+                mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            magic_number, width, height, max_color_value, pos = \
+                _read_ppm_header(data)
+            size = 3 * width * height
+            if magic_number == b"P3":
+                values = _read_p3_samples(data, pos, size, max_color_value)
+            elif magic_number == b"P6":
+                values = _read_p6_samples(data, pos, size, max_color_value)
+            else:
+                raise ValueError(f"unsupported PPM format: {magic_number!r}")
 
-    def __contains__(self, pos: Pair[int, int]) -> bool:
-        return pos in self._pixels
+        if len(values) != size:
+            raise ValueError(f"expected {size} samples, got {len(values)}")
+        if values and max(values) > max_color_value:
+            raise ValueError("sample exceeds the maximum color value")
+
+        canvas = cls(width, height, **options)
+        canvas._load_color_values(values, max_color_value)
+        return canvas
 
     def ppm(self) -> str:
         """Return a PPM-formatted string representation of the canvas."""
-        buffer: List[str] = []
-        self._construct_ppm_header(buffer)
-        self._construct_ppm_pixel_data(buffer)
-        return "\n".join(buffer) + "\n"
+        buffer = io.StringIO()
+        self.write_ppm(buffer)
+        return buffer.getvalue()
+
+    def write_ppm(self, fp: TextIO):
+        """Write the PPM-formatted representation of the canvas to a text
+        file, one row of pixels at a time.
+        """
+        fp.write(f"{self.MAGIC_NUMBER}\n{self.width} {self.height}\n"
+                 f"{self.MAX_COLOR_VALUE}\n")
+        for lines in self._ppm_rows():
+            if lines:
+                fp.write("\n".join(lines))
+                fp.write("\n")
+
+    def p6(self) -> bytes:
+        """Return a binary PPM (P6) representation of the canvas."""
+        buffer = io.BytesIO()
+        self.write_p6(buffer)
+        return buffer.getvalue()
+
+    def write_p6(self, fp: BinaryIO):
+        """Write the binary PPM (P6) representation of the canvas to a binary
+        file, one row of pixels at a time.
+        """
+        fp.write(f"{self.BINARY_MAGIC_NUMBER}\n{self.width} {self.height}\n"
+                 f"{self.MAX_COLOR_VALUE}\n".encode("ascii"))
+        for row in self._color_rows():
+            fp.write(row)
+
+    def png(self, filter_type: str = "adaptive",
+            compression_level: int = 6) -> bytes:
+        """Return a PNG representation of the canvas.
+
+        See `write_png` for the filter types and compression levels.
+        """
+        buffer = io.BytesIO()
+        self.write_png(buffer, filter_type, compression_level)
+        return buffer.getvalue()
+
+    def write_png(self, fp: BinaryIO, filter_type: str = "adaptive",
+                  compression_level: int = 6):
+        """Write the PNG representation of the canvas to a binary file, one
+        row of pixels at a time.
+
+        Rows are filtered before compression with one of the PNG filter types
+        `"none"`, `"sub"`, `"up"`, `"average"`, or `"paeth"`, or, for
+        `"adaptive"`, with whichever of the first four yields the smallest sum
+        of absolute differences for that row. These four filter whole rows at
+        once; the Paeth filter works byte by byte and is considerably slower.
+        The compression level ranges from 0 (none) to 9 (best).
+
+        Raises `ValueError` for an unknown filter type or a canvas without
+        pixels, which PNG cannot represent.
+        """
+        if filter_type not in _PNG_FILTER_TYPES and filter_type != "adaptive":
+            raise ValueError(f"unknown filter type: {filter_type}")
+        if self.width == 0 or self.height == 0:
+            raise ValueError("PNG images must have at least one pixel")
+
+        fp.write(_PNG_SIGNATURE)
+        _write_png_chunk(fp, b"IHDR", struct.pack(">IIBBBBB", self.width,
+                                                  self.height, 8, 2, 0, 0, 0))
+
+        compressor = zlib.compressobj(compression_level)
+        data = bytearray()
+        previous = bytes(3 * self.width)
+        for row in self._color_rows():
+            data += compressor.compress(_filter_png_row(filter_type, row,
+                                                        previous))
+            previous = row
+            if len(data) >= _PNG_CHUNK_SIZE:
+                _write_png_chunk(fp, b"IDAT", data)
+                data = bytearray()
+        data += compressor.flush()
+        _write_png_chunk(fp, b"IDAT", data)
+
+        _write_png_chunk(fp, b"IEND", b"")
 
     MAGIC_NUMBER: str = "P3"
+    BINARY_MAGIC_NUMBER: str = "P6"
     MAX_COLOR_VALUE: int = 255
 
-    def _construct_ppm_header(self, buffer: List[str]):
-        buffer.append(self.MAGIC_NUMBER)
-        buffer.append(f"{self.width} {self.height}")
-        buffer.append(f"{self.MAX_COLOR_VALUE}")
+    def _color_rows(self) -> Iterator[bytes]:
+        """Yield, for every row of pixels, the color values of its red,
+        green, and blue intensities.
+        """
+        raise NotImplementedError
 
-    def _construct_ppm_pixel_data(self, buffer: List[str]):
-        for y in range(self.height):
-            samples = []
-            for x in range(self.width):
-                color = self[x, y]
-                for beam in "red", "green", "blue":
-                    intensity = getattr(color, beam)
-                    samples.append(f"{self._color_value(intensity)}")
-            for row in textwrap.wrap(" ".join(samples)):
-                buffer.append(row)
+    def _ppm_rows(self) -> Iterator[List[str]]:
+        """Yield, for every row of pixels, the lines of its PPM pixel data."""
+        raise NotImplementedError
+
+    def _load_color_values(self, values: array, max_color_value: int):
+        """Set all pixels, row by row, from the color values of their red,
+        green, and blue intensities.
+        """
+        raise NotImplementedError
+
+    def _block_height(self, x: int, y: int, width: int,
+                      intensities: Sequence[float]) -> int:
+        """Return the height of a block of pixels of a given width, with its
+        intensities given row by row, to be pasted into the canvas with its
+        top-left pixel at a given position.
+
+        Raises `IndexError` if the block does not fit in the canvas.
+        """
+        stride = 3 * width
+        height = len(intensities) // stride if stride else 0
+        if (x < 0 or y < 0 or x + width > self.width
+                or y + height > self.height):
+            raise IndexError
+        return height
 
     @classmethod
     def _color_value(cls, intensity: float) -> int:
         intensity = min(max(0.0, intensity), 1.0)
         return round(cls.MAX_COLOR_VALUE * intensity)
+
+
+class Canvas(_BaseCanvas):
+    """A rectangular grid of pixels.
+
+    Pixels are stored row by row in one contiguous buffer that holds the red,
+    green, and blue intensities of each pixel as double-precision floats. A
+    compact canvas instead stores each intensity as an 8-bit value, clamped
+    and rounded as in its PPM representation, which suits low-dynamic-range
+    output.
+    """
+
+    def __init__(self, width: int, height: int, compact: bool = False):
+        super().__init__(width, height)
+        self.compact = compact
+
+        size = width * height * 3
+        if compact:
+            self._pixels = array("B", [0]) * size
+        else:
+            self._pixels = array("d", [0.0]) * size
+
+    @property
+    def buffer(self) -> Sequence[float]:
+        """The pixel buffer: the red, green, and blue intensities of all
+        pixels, row by row, as floats or, for compact canvases, as 8-bit color
+        values.
+        """
+        return self._pixels
+
+    def __getitem__(self, pos: Pair[int, int]) -> Color:
+        if pos not in self:
+            raise IndexError
+
+        x, y = pos
+        i = 3 * (y * self.width + x)
+        pixels = self._pixels
+        if self.compact:
+            scale = self.MAX_COLOR_VALUE
+            return Color(pixels[i] / scale, pixels[i + 1] / scale,
+                         pixels[i + 2] / scale)
+
+        return Color(pixels[i], pixels[i + 1], pixels[i + 2])
+
+    def __setitem__(self, pos: Pair[int, int], color: Color):
+        if pos not in self:
+            raise IndexError
+
+        x, y = pos
+        i = 3 * (y * self.width + x)
+        pixels = self._pixels
+        if self.compact:
+            bounds = _SAMPLE_BOUNDS
+            pixels[i] = bisect_left(bounds, color[0])
+            pixels[i + 1] = bisect_left(bounds, color[1])
+            pixels[i + 2] = bisect_left(bounds, color[2])
+        else:
+            pixels[i] = color.red
+            pixels[i + 1] = color.green
+            pixels[i + 2] = color.blue
+
+    def paste(self, x: int, y: int, width: int, intensities: Sequence[float]):
+        """Copy a block of pixels of a given width, with its red, green, and
+        blue intensities given row by row, into the canvas, with its top-left
+        pixel at a given position.
+
+        Raises `IndexError` if the block does not fit in the canvas.
+        """
+        stride = 3 * width
+        height = self._block_height(x, y, width, intensities)
+        if self.compact:
+            bounds = _SAMPLE_BOUNDS
+            intensities = array("B", [bisect_left(bounds, intensity)
+                                      for intensity in intensities])
+        elif not (isinstance(intensities, array)
+                  and intensities.typecode == "d"):
+            intensities = array("d", intensities)
+
+        pixels = self._pixels
+        for row in range(height):
+            i = 3 * ((y + row) * self.width + x)
+            pixels[i:i + stride] = intensities[row * stride:(row + 1) * stride]
+
+    @classmethod
+    def _from_pixels(cls, width: int, height: int, pixels: array) -> Canvas:
+        """Return a canvas of a given size that takes over a pixel buffer,
+        compact if its intensities are 8-bit values.
+        """
+        canvas = cls(0, 0, pixels.typecode == "B")
+        canvas.width = width
+        canvas.height = height
+        canvas._pixels = pixels
+        return canvas
+
+    def _color_rows(self) -> Iterator[bytes]:
+        pixels = self._pixels
+        stride = 3 * self.width
+        bounds = _SAMPLE_BOUNDS
+        for y in range(self.height):
+            row = pixels[y * stride:(y + 1) * stride]
+            if self.compact:
+                yield row.tobytes()
+            else:
+                yield bytes([bisect_left(bounds, intensity)
+                             for intensity in row])
+
+    def _ppm_rows(self) -> Iterator[List[str]]:
+        for row in self._color_rows():
+            yield _wrap([_SAMPLES[value] for value in row])
+
+    def _load_color_values(self, values: array, max_color_value: int):
+        if self.compact and max_color_value == self.MAX_COLOR_VALUE:
+            self._pixels = array("B", values)
+            return
+
+        table = _intensities(max_color_value)
+        if self.compact:
+            table = [self._color_value(intensity) for intensity in table]
+        self._pixels = array(self._pixels.typecode,
+                             map(table.__getitem__, values))
+
+
+class SparseCanvas(_BaseCanvas):
+    """A rectangular grid of pixels that only stores the pixels that have been
+    written to; all other pixels have the background color.
+
+    Sparse canvases suit large plots in which few pixels are drawn: they are
+    constructed in constant time, and their PPM representation is produced
+    from precomputed runs of background pixels. Unlike other canvases, they
+    have no dense pixel buffer.
+    """
+
+    def __init__(self, width: int, height: int, background: Color = BLACK):
+        super().__init__(width, height)
+        self.background = background
+
+        self._rows: Dict[int, Dict[int, Color]] = {}
+
+    @property
+    def buffer(self) -> Sequence[float]:
+        """Sparse canvases have no pixel buffer: rather than materialising
+        one for all pixels, accessing it raises `AttributeError`.
+        """
+        raise AttributeError("sparse canvases have no pixel buffer")
+
+    def __getitem__(self, pos: Pair[int, int]) -> Color:
+        if pos not in self:
+            raise IndexError
+
+        x, y = pos
+        row = self._rows.get(y)
+        return row.get(x, self.background) if row else self.background
+
+    def __setitem__(self, pos: Pair[int, int], color: Color):
+        if pos not in self:
+            raise IndexError
+
+        x, y = pos
+        self._rows.setdefault(y, {})[x] = color
+
+    def paste(self, x: int, y: int, width: int, intensities: Sequence[float]):
+        """Copy a block of pixels of a given width, with its red, green, and
+        blue intensities given row by row, into the canvas, with its top-left
+        pixel at a given position.
+
+        Raises `IndexError` if the block does not fit in the canvas.
+        """
+        height = self._block_height(x, y, width, intensities)
+        i = 0
+        for row in range(y, y + height):
+            pixels = self._rows.setdefault(row, {})
+            for column in range(x, x + width):
+                pixels[column] = Color(intensities[i], intensities[i + 1],
+                                       intensities[i + 2])
+                i += 3
+
+    def _ppm_rows(self) -> Iterator[List[str]]:
+        background = self._ppm_samples(self.background)
+        background_lines: List[str] = []
+
+        for y in range(self.height):
+            row = self._rows.get(y)
+            if not row:
+                if not background_lines:
+                    packer = _LinePacker(background)
+                    packer.add_background(self.width)
+                    background_lines = packer.lines()
+                yield background_lines
+                continue
+
+            packer = _LinePacker(background)
+            end = 0
+            for x in sorted(row):
+                packer.add_background(x - end)
+                for sample in self._ppm_samples(row[x]):
+                    packer.add(sample)
+                end = x + 1
+            packer.add_background(self.width - end)
+            yield packer.lines()
+
+    def _color_rows(self) -> Iterator[bytes]:
+        background = bytes(self._color_value(intensity)
+                           for intensity in self.background) * self.width
+        for y in range(self.height):
+            row = self._rows.get(y)
+            if not row:
+                yield background
+                continue
+
+            values = bytearray(background)
+            for x, color in row.items():
+                values[3 * x:3 * x + 3] = bytes(
+                    self._color_value(intensity) for intensity in color)
+            yield bytes(values)
+
+    def _load_color_values(self, values: array, max_color_value: int):
+        table = _intensities(max_color_value)
+        background = self.background
+        for i in range(0, len(values), 3):
+            color = Color(table[values[i]], table[values[i + 1]],
+                          table[values[i + 2]])
+            if color != background:
+                y, x = divmod(i // 3, self.width)
+                self._rows.setdefault(y, {})[x] = color
+
+    @classmethod
+    def _ppm_samples(cls, color: Color) -> List[str]:
+        return [_SAMPLES[cls._color_value(intensity)] for intensity in color]
+
+
+class SharedCanvas(Canvas):
+    """A canvas whose pixel buffer lives in a named block of shared memory,
+    so that several processes can write pixels to it without copying.
+
+    One process creates the canvas with `create`; others attach to it by
+    name with `attach`. Every process must `close` its canvas when done, and
+    the creating process must also `unlink` the block of shared memory to
+    free it. Used as a context manager, a canvas is closed on exit and, in
+    the process that created it, unlinked, even if rendering was aborted.
+
+    Shared canvases require Python 3.8 or later.
+    """
+
+    def __init__(self, width: int, height: int, compact: bool = False,
+                 name: Optional[str] = None):
+        # pylint: disable=super-init-not-called
+        if shared_memory is None:
+            raise ImportError("shared canvases require Python 3.8 or later")
+
+        self.width = width
+        self.height = height
+        self.compact = compact
+
+        size = width * height * 3 * (1 if compact else 8)
+        if name is None:
+            self._memory = shared_memory.SharedMemory(create=True,
+                                                      size=max(size, 1))
+            self._owner = True
+        else:
+            self._memory = _attach_shared_memory(name)
+            self._owner = False
+            if self._memory.size < size:
+                self._memory.close()
+                raise ValueError(f"shared memory {name} is too small")
+
+        self._pixels = self._memory.buf[:size].cast("B" if compact else "d")
+
+    @classmethod
+    def create(cls, width: int, height: int,
+               compact: bool = False) -> SharedCanvas:
+        """Create a shared canvas in a new block of shared memory."""
+        return cls(width, height, compact)
+
+    @classmethod
+    def attach(cls, name: str, width: int, height: int,
+               compact: bool = False) -> SharedCanvas:
+        """Attach to the shared canvas with the given name, width, height,
+        and storage.
+
+        Raises `FileNotFoundError` if there is no such block of shared memory.
+        """
+        return cls(width, height, compact, name)
+
+    @property
+    def name(self) -> str:
+        """The name of the block of shared memory holding the pixels."""
+        return self._memory.name
+
+    @property
+    def buffer(self) -> Sequence[float]:
+        """The pixel buffer, as a view on the shared memory.
+
+        Views obtained from the buffer must be released before the canvas is
+        closed.
+        """
+        return self._pixels
+
+    def copy(self) -> Canvas:
+        """Return an ordinary canvas with a copy of the pixels."""
+        pixels = array("B" if self.compact else "d")
+        with self._pixels.cast("B") as data:
+            pixels.frombytes(data)
+        return Canvas._from_pixels(self.width, self.height, pixels)
+
+    def close(self):
+        """Detach from the shared memory in this process."""
+        self._pixels.release()
+        self._memory.close()
+
+    def unlink(self):
+        """Free the block of shared memory once all processes have closed
+        their canvases.
+        """
+        self._memory.unlink()
+
+    def __enter__(self) -> SharedCanvas:
+        return self
+
+    def __exit__(self, *exc_info):
+        try:
+            self.close()
+        finally:
+            if self._owner:
+                self.unlink()
+
+
+def _attach_shared_memory(name: str):
+    """Attach to a block of shared memory without having the resource
+    tracker of this process unlink it when the process exits, where
+    supported.
+    """
+    try:
+        # pylint: disable=unexpected-keyword-arg
+        return shared_memory.SharedMemory(name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name)
+
+
+def _sample_bounds(max_color_value: int) -> List[float]:
+    """Return, for every color value but 0, the greatest intensity that
+    `Canvas._color_value` maps to less than that value, so that the color
+    value of an intensity is the number of bounds below it.
+
+    As NaN compares greater than no bound, it gets the color value 0, as it
+    does with `Canvas._color_value`.
+    """
+    # pylint: disable=protected-access
+    bounds = []
+    for value in range(1, max_color_value + 1):
+        lower, upper = 0.0, 1.0
+        while True:
+            middle = (lower + upper) / 2
+            if middle in (lower, upper):
+                break
+            if Canvas._color_value(middle) >= value:
+                upper = middle
+            else:
+                lower = middle
+        bounds.append(lower)
+    return bounds
+
+
+def _read_ppm_header(data: mmap.mmap) -> Pair[bytes, int, int, int, int]:
+    """Read the header of a PPM file and return its magic number, width,
+    height, and maximum color value, and the position just past it.
+    """
+    tokens: List[bytes] = []
+    pos = 0
+    while len(tokens) < 4:
+        match = _PPM_TOKEN.match(data, pos)
+        if match is None:
+            raise ValueError("malformed PPM header")
+        tokens.append(match.group(1))
+        pos = match.end()
+
+    try:
+        width, height, max_color_value = map(int, tokens[1:])
+    except ValueError:
+        raise ValueError("malformed PPM header") from None
+    if not 0 < max_color_value < 1 << 16:
+        raise ValueError(
+            f"unsupported maximum color value: {max_color_value}")
+    return tokens[0], width, height, max_color_value, pos
+
+
+def _read_p3_samples(data: mmap.mmap, pos: int, size: int,
+                     max_color_value: int) -> array:
+    """Read the samples from the pixel data of a plain PPM file, which starts
+    at `pos`, a chunk of bytes at a time, stopping once there are more than
+    `size`.
+    """
+    values = array("H" if max_color_value > 255 else "B")
+    end = len(data)
+    partial = b""
+    while pos < end and len(values) <= size:
+        chunk = partial + data[pos:pos + _P3_CHUNK_SIZE]
+        pos += _P3_CHUNK_SIZE
+        tokens = chunk.split()
+        partial = b""
+        if pos < end and tokens and not chunk[-1:].isspace():
+            partial = tokens.pop()
+        values.extend(_decode_p3_samples(values.typecode, tokens,
+                                         max_color_value))
+    return values
+
+
+def _decode_p3_samples(typecode: str, tokens: List[bytes],
+                       max_color_value: int) -> array:
+    """Decode the samples of a plain PPM file.
+
+    Samples up to 255 are looked up in a table of sample strings; others are
+    parsed and must not exceed the maximum color value.
+    """
+    try:
+        return array(typecode, map(_SAMPLE_VALUES.__getitem__, tokens))
+    except KeyError:
+        samples = [int(token) for token in tokens]
+    if min(samples) < 0 or max(samples) > max_color_value:
+        raise ValueError("sample exceeds the maximum color value")
+    return array(typecode, samples)
+
+
+def _read_p6_samples(data: mmap.mmap, pos: int, size: int,
+                     max_color_value: int) -> array:
+    """Read `size` samples from the pixel data of a binary PPM file, which
+    starts after the single whitespace character at `pos`.
+    """
+    values = array("H" if max_color_value > 255 else "B")
+    values.frombytes(data[pos + 1:pos + 1 + size * values.itemsize])
+    if values.itemsize > 1 and sys.byteorder == "little":
+        values.byteswap()
+    return values
+
+
+def _intensities(max_color_value: int) -> List[float]:
+    """Return the intensities of all color values up to a maximum color
+    value.
+    """
+    return [value / max_color_value for value in range(max_color_value + 1)]
+
+
+_SAMPLE_VALUES: Dict[bytes, int] = {f"{value}".encode("ascii"): value
+                                    for value in range(256)}
+_PPM_TOKEN = re.compile(rb"(?:\s|#[^\r\n]*)*([^\s#]+)")
+_P3_CHUNK_SIZE: int = 1 << 20
+
+_SAMPLES: List[str] = [f"{value}" for value in range(Canvas.MAX_COLOR_VALUE
+                                                     + 1)]
+_SAMPLE_BOUNDS: List[float] = _sample_bounds(Canvas.MAX_COLOR_VALUE)
+
+
+def _wrap(samples: List[str], width: int = 70) -> List[str]:
+    """Join samples by spaces into lines of at most `width` characters, as
+    `textwrap.wrap` would.
+    """
+    text = " ".join(samples)
+    lines = []
+    start = 0
+    while len(text) - start > width:
+        end = text.rfind(" ", start, start + width + 1)
+        lines.append(text[start:end])
+        start = end + 1
+    if start < len(text):
+        lines.append(text[start:])
+    return lines
+
+
+class _LinePacker:
+    """Packs PPM samples into lines of at most 70 characters, as `_wrap`
+    would, skipping ahead whole lines at a time through runs of
+    background pixels.
+    """
+
+    WIDTH: int = 70
+
+    def __init__(self, background: List[str]):
+        self._background = background
+        self._full_lines, self._cycles = _background_lines(tuple(background),
+                                                           self.WIDTH)
+        self._lines: List[str] = []
+        self._line: List[str] = []
+        self._length = -1
+
+    def add(self, sample: str):
+        """Add a sample."""
+        if self._line and self._length + 1 + len(sample) > self.WIDTH:
+            self._flush()
+        self._line.append(sample)
+        self._length += 1 + len(sample)
+
+    def add_background(self, count: int):
+        """Add the samples of a run of background pixels."""
+        background = self._background
+        period = len(background)
+        n = count * period
+        i = 0
+        while i < n:
+            sample = background[i % period]
+            if self._line and self._length + 1 + len(sample) > self.WIDTH:
+                self._flush()
+            if not self._line:
+                cycle = self._cycles[i % period]
+                if cycle is not None and n - i > cycle[1]:
+                    lines, length = cycle
+                    repeat = (n - i - 1) // length
+                    self._lines.extend(lines * repeat)
+                    i += repeat * length
+                    continue
+
+                line, length = self._full_lines[i % period]
+                if n - i > length:
+                    self._lines.append(line)
+                    i += length
+                    continue
+            self._line.append(sample)
+            self._length += 1 + len(sample)
+            i += 1
+
+    def lines(self) -> List[str]:
+        """Return the packed lines."""
+        if self._line:
+            self._flush()
+        return self._lines
+
+    def _flush(self):
+        self._lines.append(" ".join(self._line))
+        self._line = []
+        self._length = -1
+
+
+@functools.lru_cache(maxsize=None)
+def _background_lines(background: Pair[str, ...], width: int):
+    """Return, for every sample of a background pixel, the line of at most
+    `width` characters that starts with that sample when followed by nothing
+    but background samples, with the number of samples on that line, as well
+    as the cycle of such lines that leads back to the same sample, if any,
+    with the number of samples the cycle spans.
+    """
+    period = len(background)
+
+    full_lines = []
+    for phase in range(period):
+        samples = [background[phase]]
+        length = len(background[phase])
+        while True:
+            sample = background[(phase + len(samples)) % period]
+            if length + 1 + len(sample) > width:
+                break
+            samples.append(sample)
+            length += 1 + len(sample)
+        full_lines.append((" ".join(samples), len(samples)))
+
+    cycles: List[Optional[Pair[List[str], int]]] = []
+    for phase in range(period):
+        lines: List[str] = []
+        count = 0
+        cycle = None
+        while len(lines) < period:
+            line, length = full_lines[(phase + count) % period]
+            lines.append(line)
+            count += length
+            if count % period == 0:
+                cycle = (lines, count)
+                break
+        cycles.append(cycle)
+
+    return full_lines, cycles
+
+
+_PNG_SIGNATURE: bytes = b"\x89PNG\r\n\x1a\n"
+_PNG_FILTER_TYPES: Dict[str, int] = {
+    "none": 0, "sub": 1, "up": 2, "average": 3, "paeth": 4
+}
+_PNG_CHUNK_SIZE: int = 1 << 16
+
+# The magnitude of every byte taken as a signed difference.
+_MAGNITUDES: bytes = bytes(min(value, 256 - value) for value in range(256))
+
+
+def _write_png_chunk(fp: BinaryIO, chunk_type: bytes, data: bytes):
+    fp.write(struct.pack(">I", len(data)))
+    fp.write(chunk_type)
+    fp.write(data)
+    fp.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(chunk_type))))
+
+
+def _filter_png_row(filter_type: str, row: bytes, previous: bytes) -> bytes:
+    """Return a filtered scanline, led by its filter-type byte, for a row of
+    color values given the row above it.
+
+    All filters but Paeth operate on whole rows at once by treating the rows
+    as big integers with one lane per byte.
+    """
+    if filter_type == "none":
+        return b"\x00" + row
+
+    left = bytes(3) + row[:-3]
+    if filter_type == "sub":
+        return b"\x01" + _subtract_bytes(row, left)
+    if filter_type == "up":
+        return b"\x02" + _subtract_bytes(row, previous)
+    if filter_type == "average":
+        return b"\x03" + _subtract_bytes(row, _average_bytes(left, previous))
+    if filter_type == "paeth":
+        upper_left = bytes(3) + previous[:-3]
+        return b"\x04" + _paeth(row, left, previous, upper_left)
+
+    candidates = [_filter_png_row(name, row, previous)
+                  for name in ("none", "sub", "up", "average")]
+    return min(candidates,
+               key=lambda scanline: sum(scanline[1:].translate(_MAGNITUDES)))
+
+
+def _subtract_bytes(a: bytes, b: bytes) -> bytes:
+    """Subtract two byte strings bytewise, modulo 256."""
+    n = len(a)
+    high = int.from_bytes(b"\x80" * n, "big")
+    low = int.from_bytes(b"\x7f" * n, "big")
+    x = int.from_bytes(a, "big")
+    y = int.from_bytes(b, "big")
+    return (((x | high) - (y & low)) ^ ((x ^ y ^ high) & high)).to_bytes(
+        n, "big")
+
+
+def _average_bytes(a: bytes, b: bytes) -> bytes:
+    """Average two byte strings bytewise, rounding down."""
+    n = len(a)
+    low = int.from_bytes(b"\x7f" * n, "big")
+    x = int.from_bytes(a, "big")
+    y = int.from_bytes(b, "big")
+    return ((x & y) + ((x ^ y) >> 1 & low)).to_bytes(n, "big")
+
+
+def _paeth(row: bytes, left: bytes, upper: bytes, upper_left: bytes) -> bytes:
+    """Apply the Paeth filter to a row of bytes given its neighbours."""
+    filtered = bytearray(len(row))
+    for i, (value, a, b, c) in enumerate(zip(row, left, upper, upper_left)):
+        pa = abs(b - c)
+        pb = abs(a - c)
+        pc = abs(a + b - 2 * c)
+        if pa <= pb and pa <= pc:
+            predictor = a
+        elif pb <= pc:
+            predictor = b
+        else:
+            predictor = c
+        filtered[i] = (value - predictor) & 0xFF
+    return bytes(filtered)
@@ -5,40 +5,65 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-import numbers
+from operator import itemgetter
 
+from .records import is_scalar, make, unordered
 
-@dataclass
-class Color:
-    """A color."""
 
-    red: float
-    green: float
-    blue: float
+class Color(tuple):
+    """A color.
+
+    Colors are immutable and hashable: they are represented as built-in tuples
+    of their red, green, and blue components. Hence, they compare equal to,
+    and hash like, built-in tuples of the same components. They are not
+    ordered, though, and adding anything but another color to them raises
+    `TypeError` rather than concatenating them.
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, red: float, green: float, blue: float):
+        return tuple.__new__(cls, (red, green, blue))
+
+    def __getnewargs__(self):
+        return tuple(self)
+
+    red = property(itemgetter(0), doc="The red component of the color.")
+    green = property(itemgetter(1), doc="The green component of the color.")
+    blue = property(itemgetter(2), doc="The blue component of the color.")
+
+    def __repr__(self) -> str:
+        red, green, blue = self
+        return f"Color(red={red!r}, green={green!r}, blue={blue!r})"
 
     def hadamard(self, other: Color) -> Color:
         """Compute the Hadamard product of the color with another color."""
-        red = self.red * other.red
-        green = self.green * other.green
-        blue = self.blue * other.blue
-        return Color(red, green, blue)
+        red, green, blue = self
+        other_red, other_green, other_blue = other
+        return make(Color, (red * other_red, green * other_green,
+                            blue * other_blue))
 
     def __add__(self, other):
         if isinstance(other, Color):
-            red = self.red + other.red
-            green = self.green + other.green
-            blue = self.blue + other.blue
-            return Color(red, green, blue)
+            red, green, blue = self
+            other_red, other_green, other_blue = other
+            return make(Color, (red + other_red, green + other_green,
+                                blue + other_blue))
 
         return NotImplemented
 
+    def __radd__(self, other):
+        # Reached for built-in tuples, which would otherwise be concatenated
+        # with the color.
+        raise TypeError(f"unsupported operand type(s) for +:"
+                        f" '{type(other).__name__}' and 'Color'")
+
     def __sub__(self, other):
         if isinstance(other, Color):
-            red = self.red - other.red
-            green = self.green - other.green
-            blue = self.blue - other.blue
-            return Color(red, green, blue)
+            red, green, blue = self
+            other_red, other_green, other_blue = other
+            return make(Color, (red - other_red, green - other_green,
+                                blue - other_blue))
 
         return NotImplemented
 
@@ -46,17 +71,17 @@ class Color:
         if isinstance(other, Color):
             return self.hadamard(other)
 
-        if isinstance(other, numbers.Number):
-            red = self.red * other
-            green = self.green * other
-            blue = self.blue * other
-            return Color(red, green, blue)
+        if is_scalar(other):
+            red, green, blue = self
+            return make(Color, (red * other, green * other, blue * other))
 
         return NotImplemented
 
     def __rmul__(self, scalar):
         return self.__mul__(scalar)
 
+    __lt__ = __le__ = __gt__ = __ge__ = unordered
+
 
 RED: Color = Color(1.0, 0.0, 0.0)
 GREEN: Color = Color(0.0, 1.0, 0.0)
@@ -0,0 +1,210 @@
+# Copyright (c) 2020-2021 Stefan Holdermans.
+# Licensed under the MIT License.
+
+# Prevent pylint from mistakenly reporting that `Optional` is unsubscriptable:
+#   pylint: disable=unsubscriptable-object
+# See https://github.com/PyCQA/pylint/issues/3882.
+
+"""Uniform grids."""
+
+from array import array
+import math
+from typing import Iterable, Optional, Tuple as Pair
+
+from .spheres import Sphere, SphereIndex
+from .tuples import Tuple
+
+Resolution = Pair[int, int, int]
+
+
+class UniformGrid(SphereIndex):
+    """A grid of equally sized cells over the bounding box of a set of
+    spheres, each cell listing the spheres whose bounding boxes overlap it,
+    so that a ray only needs to be intersected with the spheres in the cells
+    it passes through.
+
+    Grids suit dense clouds of similarly sized spheres: they are built in a
+    single pass and rays walk their cells in order. Unless a resolution is
+    given, the number of cells along each axis is chosen such that the grid
+    has about `density` cells per sphere, with cells as close to cubes as the
+    extents of the spheres allow.
+
+    The grid captures the transformations of the spheres at construction and
+    is rebuilt automatically, before the next query, after any of the spheres
+    has been transformed.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+
+    MAX_RESOLUTION: int = 128
+
+    def __init__(self, spheres: Iterable[Sphere],
+                 resolution: Optional[Resolution] = None,
+                 density: float = 2.0):
+        super().__init__(spheres)
+        self._parameters = (resolution, density)
+        self._lower = (0.0, 0.0, 0.0)
+        self._cell_size = (1.0, 1.0, 1.0)
+        self._resolution: Resolution = (1, 1, 1)
+        self._starts = array("l", [0, 0])
+        self._items = array("l")
+        self._cells = array("d")
+        self._build()
+
+    @property
+    def resolution(self) -> Resolution:
+        """The number of cells along the x, y, and z axes."""
+        return self._resolution
+
+    def _nearest(self, origin: Tuple, direction: Tuple) -> Pair[int, float]:
+        """Walk the cells along the ray by 3D-DDA, testing each sphere once,
+        until a hit is confirmed inside the current cell.
+        """
+        # pylint: disable=too-many-locals,too-many-branches
+        # pylint: disable=too-many-statements
+        lower = self._lower
+        size = self._cell_size
+        resolution = self._resolution
+
+        # Clip the ray to the box of the grid.
+        t_enter = 0.0
+        t_exit = math.inf
+        for axis in range(3):
+            o = origin[axis]
+            d = direction[axis]
+            low = lower[axis]
+            high = low + size[axis] * resolution[axis]
+            if d == 0.0:
+                if not low <= o <= high:
+                    return -1, math.inf
+                continue
+            t0 = (low - o) / d
+            t1 = (high - o) / d
+            if t0 > t1:
+                t0, t1 = t1, t0
+            t_enter = max(t_enter, t0)
+            t_exit = min(t_exit, t1)
+        if t_enter > t_exit:
+            return -1, math.inf
+
+        cell = [0, 0, 0]
+        step = [0, 0, 0]
+        t_max = [math.inf] * 3
+        t_delta = [math.inf] * 3
+        for axis in range(3):
+            o = origin[axis]
+            d = direction[axis]
+            position = o + d * t_enter
+            i = int((position - lower[axis]) / size[axis])
+            i = min(max(i, 0), resolution[axis] - 1)
+            cell[axis] = i
+            if d > 0.0:
+                step[axis] = 1
+                t_max[axis] = (lower[axis] + (i + 1) * size[axis] - o) / d
+                t_delta[axis] = size[axis] / d
+            elif d < 0.0:
+                step[axis] = -1
+                t_max[axis] = (lower[axis] + i * size[axis] - o) / d
+                t_delta[axis] = -size[axis] / d
+
+        nx, ny, _ = resolution
+        starts = self._starts
+        items = self._items
+        cells = self._cells
+        tested = set()
+        best_index = -1
+        best_t = math.inf
+        x, y, z = cell
+        while True:
+            index = (z * ny + y) * nx + x
+            for k in range(starts[index], starts[index + 1]):
+                slot = items[k]
+                if slot in tested:
+                    continue
+                tested.add(slot)
+                t = self._hit_distance(cells, 16 * slot, origin, direction)
+                if t < best_t or (best_t == t < math.inf
+                                  and slot < best_index):
+                    best_index = slot
+                    best_t = t
+
+            tx, ty, tz = t_max
+            if tx <= ty and tx <= tz:
+                if best_t <= tx:
+                    break
+                x += step[0]
+                if not 0 <= x < nx:
+                    break
+                t_max[0] += t_delta[0]
+            elif ty <= tz:
+                if best_t <= ty:
+                    break
+                y += step[1]
+                if not 0 <= y < ny:
+                    break
+                t_max[1] += t_delta[1]
+            else:
+                if best_t <= tz:
+                    break
+                z += step[2]
+                if not 0 <= z < resolution[2]:
+                    break
+                t_max[2] += t_delta[2]
+
+        return best_index, best_t
+
+    def _build(self):
+        # pylint: disable=too-many-locals
+        resolution, density = self._parameters
+        if not self._spheres:
+            return
+
+        boxes = [sphere.bounds() for sphere in self._spheres]
+        lower = [min(box[0][axis] for box in boxes) for axis in range(3)]
+        upper = [max(box[1][axis] for box in boxes) for axis in range(3)]
+        extents = [max(high - low, 1e-9) for low, high in zip(lower, upper)]
+
+        if resolution is None:
+            volume = extents[0] * extents[1] * extents[2]
+            cells_per_unit = (density * len(boxes) / volume) ** (1 / 3)
+            resolution = tuple(
+                min(max(round(extent * cells_per_unit), 1),
+                    self.MAX_RESOLUTION)
+                for extent in extents)
+        if min(resolution) < 1:
+            raise ValueError("grids need at least one cell along every axis")
+
+        nx, ny, nz = resolution
+        size = [extent / n for extent, n in zip(extents, resolution)]
+
+        def cell_range(box: Pair[Tuple, Tuple], axis: int) -> range:
+            n = resolution[axis]
+            first = int((box[0][axis] - lower[axis]) / size[axis])
+            last = int((box[1][axis] - lower[axis]) / size[axis])
+            return range(min(max(first, 0), n - 1), min(max(last, 0), n - 1)
+                         + 1)
+
+        buckets = [[] for _ in range(nx * ny * nz)]
+        for slot, box in enumerate(boxes):
+            for z in cell_range(box, 2):
+                for y in cell_range(box, 1):
+                    row = (z * ny + y) * nx
+                    for x in cell_range(box, 0):
+                        buckets[row + x].append(slot)
+
+        starts = array("l", [0])
+        items = array("l")
+        for bucket in buckets:
+            items.extend(bucket)
+            starts.append(len(items))
+
+        cells = array("d")
+        for sphere in self._spheres:
+            cells.extend(sphere.inverse_transform.cells)
+
+        self._lower = (lower[0], lower[1], lower[2])
+        self._cell_size = (size[0], size[1], size[2])
+        self._resolution = (nx, ny, nz)
+        self._starts = starts
+        self._items = items
+        self._cells = cells
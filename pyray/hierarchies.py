@@ -0,0 +1,249 @@
+# Copyright (c) 2020-2021 Stefan Holdermans.
+# Licensed under the MIT License.
+
+# Prevent pylint from mistakenly reporting that `Optional` is unsubscriptable:
+#   pylint: disable=unsubscriptable-object
+# See https://github.com/PyCQA/pylint/issues/3882.
+
+"""Bounding volume hierarchies."""
+
+from array import array
+import math
+from typing import Iterable, List, Optional, Tuple as Pair
+
+from .spheres import Sphere, SphereIndex
+from .tuples import Tuple
+
+# Stand-in for zero direction components, so that the slab test never
+# multiplies zero by infinity.
+_TINY = 1e-300
+
+
+class BoundingVolumeHierarchy(SphereIndex):
+    """A binary tree of axis-aligned boxes over a set of spheres, so that a
+    ray only needs to be intersected with the spheres in the boxes it passes
+    through.
+
+    The tree is built top-down from the world-space bounding boxes of the
+    spheres: every node is split where the surface area heuristic, evaluated
+    over `bins` equally sized bins along the longest axis of the centers of
+    the boxes, estimates the lowest cost of tracing a ray through the two
+    halves, until splitting no longer pays off or at most `leaf_size` spheres
+    remain.
+
+    Nodes are stored in contiguous arrays, as are the inversed transformation
+    matrices of the spheres, in the order in which the leaves refer to them.
+    The hierarchy captures the transformations of the spheres at
+    construction and is rebuilt automatically, before the next query, after
+    any of the spheres has been transformed.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, spheres: Iterable[Sphere], leaf_size: int = 4,
+                 bins: int = 16):
+        super().__init__(spheres)
+        self._parameters = (max(leaf_size, 1), max(bins, 2))
+        self._bounds = array("d")
+        self._first = array("l")
+        self._count = array("l")
+        self._order = array("l")
+        self._cells = array("d")
+        self._build()
+
+    @property
+    def node_count(self) -> int:
+        """The number of nodes in the tree."""
+        return len(self._count)
+
+    def _nearest(self, origin: Tuple, direction: Tuple) -> Pair[int, float]:
+        """Visit the nodes front to back, skipping nodes that start beyond the
+        nearest intersection found so far.
+        """
+        # pylint: disable=too-many-locals,too-many-branches
+        ox, oy, oz, _ = origin
+        dx, dy, dz, _ = direction
+        ix = 1.0 / (dx or _TINY)
+        iy = 1.0 / (dy or _TINY)
+        iz = 1.0 / (dz or _TINY)
+        # Offsets of the near and far planes of a box along every axis.
+        nx, fx = (0, 3) if ix >= 0.0 else (3, 0)
+        ny, fy = (1, 4) if iy >= 0.0 else (4, 1)
+        nz, fz = (2, 5) if iz >= 0.0 else (5, 2)
+
+        bounds = self._bounds
+        first = self._first
+        count = self._count
+        order = self._order
+        cells = self._cells
+
+        best_index = -1
+        best_t = math.inf
+        stack = [(0.0, 0)]
+        while stack:
+            entry, node = stack.pop()
+            if entry > best_t:
+                continue
+
+            n = count[node]
+            if n:
+                start = first[node]
+                for slot in range(start, start + n):
+                    t = self._hit_distance(cells, 16 * slot, origin,
+                                           direction)
+                    if t < best_t or (best_t == t < math.inf
+                                      and order[slot] < best_index):
+                        best_index = order[slot]
+                        best_t = t
+                continue
+
+            entries = []
+            for child in (first[node], first[node] + 1):
+                b = 6 * child
+                near = max((bounds[b + nx] - ox) * ix,
+                           (bounds[b + ny] - oy) * iy,
+                           (bounds[b + nz] - oz) * iz)
+                far = min((bounds[b + fx] - ox) * ix,
+                          (bounds[b + fy] - oy) * iy,
+                          (bounds[b + fz] - oz) * iz)
+                if near <= far and far >= 0.0 and near <= best_t:
+                    entries.append((max(near, 0.0), child))
+
+            if len(entries) == 2 and entries[0][0] < entries[1][0]:
+                entries.reverse()
+            stack.extend(entries)
+
+        return best_index, best_t
+
+    def _build(self):
+        # pylint: disable=too-many-locals
+        leaf_size, bins = self._parameters
+        boxes = [sphere.bounds() for sphere in self._spheres]
+        lowers = [lower[:3] for lower, _ in boxes]
+        uppers = [upper[:3] for _, upper in boxes]
+        centers = [tuple((lo + hi) / 2 for lo, hi in zip(lower, upper))
+                   for lower, upper in zip(lowers, uppers)]
+
+        order: List[int] = []
+        first: List[int] = []
+        count: List[int] = []
+        node_bounds: List[float] = []
+
+        def new_node(indices: List[int]) -> int:
+            lower = [min(lowers[i][axis] for i in indices) for axis in range(3)]
+            upper = [max(uppers[i][axis] for i in indices) for axis in range(3)]
+            node_bounds.extend(lower + upper)
+            first.append(0)
+            count.append(0)
+            return len(count) - 1
+
+        if not self._spheres:
+            return
+
+        stack = [(new_node(list(range(len(self._spheres)))),
+                  list(range(len(self._spheres))))]
+        while stack:
+            node, indices = stack.pop()
+            split = None
+            if len(indices) > leaf_size:
+                split = _sah_split(indices, lowers, uppers, centers, bins,
+                                   node_bounds[6 * node:6 * node + 6])
+
+            if split is None:
+                first[node] = len(order)
+                count[node] = len(indices)
+                order.extend(indices)
+                continue
+
+            left, right = split
+            first[node] = new_node(left)
+            new_node(right)
+            stack.append((first[node] + 1, right))
+            stack.append((first[node], left))
+
+        self._bounds = array("d", node_bounds)
+        self._first = array("l", first)
+        self._count = array("l", count)
+        self._order = array("l", order)
+        cells = array("d")
+        for index in order:
+            cells.extend(self._spheres[index].inverse_transform.cells)
+        self._cells = cells
+
+
+def _surface_area(lower: List[float], upper: List[float]) -> float:
+    x = upper[0] - lower[0]
+    y = upper[1] - lower[1]
+    z = upper[2] - lower[2]
+    return 2.0 * (x * y + y * z + z * x)
+
+
+def _sah_split(indices: List[int], lowers: List[Pair[float, ...]],
+               uppers: List[Pair[float, ...]],
+               centers: List[Pair[float, ...]], bins: int,
+               node_bounds: List[float]
+               ) -> Optional[Pair[List[int], List[int]]]:
+    """Split a node along the longest axis of the centers of the boxes of its
+    spheres, at the bin boundary with the lowest estimated cost, or return
+    `None` if the node is cheaper to trace as a leaf.
+
+    The cost of a split is the sum, over both halves, of the number of
+    spheres times the surface area of the bounding box, relative to the
+    surface area of the node; a leaf costs one unit per sphere.
+    """
+    # pylint: disable=too-many-arguments,too-many-locals
+    low = [min(centers[i][axis] for i in indices) for axis in range(3)]
+    high = [max(centers[i][axis] for i in indices) for axis in range(3)]
+    axis = max(range(3), key=lambda a: high[a] - low[a])
+    extent = high[axis] - low[axis]
+    if extent <= 0.0:
+        return None
+
+    scale = bins / extent
+    bin_of = [min(int((centers[i][axis] - low[axis]) * scale), bins - 1)
+              for i in indices]
+    counts = [0] * bins
+    bin_lowers = [[math.inf] * 3 for _ in range(bins)]
+    bin_uppers = [[-math.inf] * 3 for _ in range(bins)]
+    for i, b in zip(indices, bin_of):
+        counts[b] += 1
+        lower, upper = bin_lowers[b], bin_uppers[b]
+        for a in range(3):
+            if lowers[i][a] < lower[a]:
+                lower[a] = lowers[i][a]
+            if uppers[i][a] > upper[a]:
+                upper[a] = uppers[i][a]
+
+    # Costs of the right halves, from the last bin down.
+    right_costs = [0.0] * bins
+    lower, upper = [math.inf] * 3, [-math.inf] * 3
+    n = 0
+    for b in range(bins - 1, 0, -1):
+        n += counts[b]
+        lower = [min(p, q) for p, q in zip(lower, bin_lowers[b])]
+        upper = [max(p, q) for p, q in zip(upper, bin_uppers[b])]
+        right_costs[b] = n * _surface_area(lower, upper) if n else 0.0
+
+    best_cost = math.inf
+    best_bin = 0
+    lower, upper = [math.inf] * 3, [-math.inf] * 3
+    n = 0
+    for b in range(bins - 1):
+        n += counts[b]
+        lower = [min(p, q) for p, q in zip(lower, bin_lowers[b])]
+        upper = [max(p, q) for p, q in zip(upper, bin_uppers[b])]
+        if n == 0 or n == len(indices):
+            continue
+        cost = n * _surface_area(lower, upper) + right_costs[b + 1]
+        if cost < best_cost:
+            best_cost = cost
+            best_bin = b
+
+    area = _surface_area(node_bounds[:3], node_bounds[3:])
+    if best_cost == math.inf or (area > 0.0
+                                 and best_cost / area >= len(indices)):
+        return None
+
+    left = [i for i, b in zip(indices, bin_of) if b <= best_bin]
+    right = [i for i, b in zip(indices, bin_of) if b > best_bin]
+    return left, right
@@ -7,9 +7,10 @@
 
 """Intersections."""
 
-from collections.abc import Iterable, Sequence
+from collections.abc import Iterable, Iterator, Sequence
 from dataclasses import dataclass
-from typing import Optional
+import heapq
+from typing import List, Optional
 
 
 @dataclass
@@ -26,7 +27,62 @@ def intersections(*xs: Intersection) -> Sequence[Intersection]:
 
 
 def hit(xs: Iterable[Intersection]) -> Optional[Intersection]:
-    """Identify the visible intersection from a ray's origin."""
-    xs = [i for i in xs if i.t >= 0.0]
-    xs = sorted(xs, key=lambda i: i.t)
-    return xs[0] if len(xs) > 0 else None
+    """Identify the visible intersection from a ray's origin.
+
+    Of equally distant intersections, the first one is taken.
+    """
+    nearest = None
+    for i in xs:
+        if i.t >= 0.0 and (nearest is None or i.t < nearest.t):
+            nearest = i
+    return nearest
+
+
+class IntersectionCollector:
+    """Collects the intersections of a ray with several objects, keeping
+    track of the visible intersection as the intersections of each object
+    are added.
+
+    Iterating over the collector merges the intersections of all objects into
+    a single sequence sorted by distance; the merge is lazy and only done for
+    callers that need the ordering.
+    """
+
+    def __init__(self):
+        self._hit: Optional[Intersection] = None
+        self._groups: List[Sequence[Intersection]] = []
+
+    @property
+    def hit(self) -> Optional[Intersection]:
+        """The visible intersection among those added so far, as `hit`
+        would identify it.
+        """
+        return self._hit
+
+    def add(self, xs: Iterable[Intersection]):
+        """Add the intersections of the ray with an object."""
+        xs = tuple(xs)
+        if not xs:
+            return
+
+        nearest = self._hit
+        ordered = True
+        previous = None
+        for i in xs:
+            if i.t >= 0.0 and (nearest is None or i.t < nearest.t):
+                nearest = i
+            if previous is not None and i.t < previous.t:
+                ordered = False
+            previous = i
+        self._hit = nearest
+        self._groups.append(xs if ordered else sorted(xs, key=_distance))
+
+    def __len__(self) -> int:
+        return sum(len(xs) for xs in self._groups)
+
+    def __iter__(self) -> Iterator[Intersection]:
+        return heapq.merge(*self._groups, key=_distance)
+
+
+def _distance(i: Intersection) -> float:
+    return i.t
@@ -1,23 +1,169 @@
 # Copyright (c) 2020-2021 Stefan Holdermans.
 # Licensed under the MIT License.
 
+# Prevent pylint from mistakenly reporting that `Optional` is unsubscriptable:
+#   pylint: disable=unsubscriptable-object
+# See https://github.com/PyCQA/pylint/issues/3882.
+
 """Lights."""
 
+from __future__ import annotations
+
 from dataclasses import dataclass
+import math
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple as Pair
+
 from .colors import Color
 from .tuples import Tuple, TupleTypeMismatchError
 
+Cell = Pair[int, int, int]
+
 
 @dataclass
 class PointLight:
-    """A light source with no size, existing at a single point in space."""
+    """A light source with no size, existing at a single point in space.
+
+    A light may be given a radius of influence, in which case its intensity
+    falls off smoothly with the distance from its position, down to nothing
+    at the radius. Lights without a radius reach everywhere at full
+    intensity.
+    """
 
     position: Tuple
     intensity: Color
+    radius: Optional[float] = None
 
-    def __init__(self, position: Tuple, intensity: Color):
+    def __init__(self, position: Tuple, intensity: Color,
+                 radius: Optional[float] = None):
         if not position.is_point():
             raise TupleTypeMismatchError
+        if radius is not None and not radius > 0.0:
+            raise ValueError("the radius of a light must be positive")
 
         self.position = position
         self.intensity = intensity
+        self.radius = radius
+
+    def attenuation(self, distance: float) -> float:
+        """Return the factor by which the intensity of the light is scaled at
+        a given distance from its position.
+        """
+        if self.radius is None:
+            return 1.0
+        return _attenuation(distance, self.radius)
+
+
+@dataclass
+class CullingStatistics:
+    """Counters that record how often lights were evaluated for shading a
+    point and how often they were skipped because they could not reach it.
+    """
+
+    evaluated: int = 0
+    culled: int = 0
+
+    def reset(self):
+        """Reset all counters to zero."""
+        self.evaluated = 0
+        self.culled = 0
+
+    def add(self, other: CullingStatistics):
+        """Add the counters of other statistics."""
+        self.evaluated += other.evaluated
+        self.culled += other.culled
+
+
+class LightIndex:
+    """A spatial index over a set of lights that yields, for a point, the
+    lights whose radius of influence contains it.
+
+    Lights with a radius are hashed into a sparse grid of cubic cells as
+    large as the largest radius, so that only the cells around a point need
+    to be looked at; lights without a radius reach every point. The
+    statistics in `culling_statistics` count the lights yielded for every
+    point (evaluated) and those left out (culled); several indices may share
+    one set of statistics.
+
+    The index captures the positions and radii of the lights at
+    construction; build a new index after changing any of them.
+    """
+
+    def __init__(self, lights: Iterable[PointLight],
+                 culling_statistics: Optional[CullingStatistics] = None):
+        self._lights = tuple(lights)
+        self._unbounded: Pair[int, ...] = ()
+        self._cells: Dict[Cell, List[int]] = {}
+        self._cell_size = 1.0
+        self.culling_statistics = (culling_statistics
+                                   if culling_statistics is not None
+                                   else CullingStatistics())
+
+        radii = [light.radius for light in self._lights
+                 if light.radius is not None]
+        if radii:
+            self._cell_size = max(radii)
+        unbounded = []
+        for index, light in enumerate(self._lights):
+            if light.radius is None:
+                unbounded.append(index)
+            else:
+                cell = self._cell(light.position)
+                self._cells.setdefault(cell, []).append(index)
+        self._unbounded = tuple(unbounded)
+
+    @property
+    def lights(self) -> Pair[PointLight, ...]:
+        """The lights, in the order in which they are indexed."""
+        return self._lights
+
+    def __len__(self) -> int:
+        return len(self._lights)
+
+    def lights_at(self, position: Tuple) -> Sequence[int]:
+        """Return the indices, in ascending order, of the lights that reach a
+        given point.
+        """
+        # pylint: disable=too-many-locals
+        statistics = self.culling_statistics
+        if not self._cells:
+            statistics.evaluated += len(self._unbounded)
+            return self._unbounded
+
+        px, py, pz = position[0], position[1], position[2]
+        cx, cy, cz = self._cell(position)
+        lights = self._lights
+        indices = list(self._unbounded)
+        for x in (cx - 1, cx, cx + 1):
+            for y in (cy - 1, cy, cy + 1):
+                for z in (cz - 1, cz, cz + 1):
+                    for index in self._cells.get((x, y, z), ()):
+                        light = lights[index]
+                        dx = light.position[0] - px
+                        dy = light.position[1] - py
+                        dz = light.position[2] - pz
+                        if dx * dx + dy * dy + dz * dz < (light.radius
+                                                          * light.radius):
+                            indices.append(index)
+        indices.sort()
+
+        statistics.evaluated += len(indices)
+        statistics.culled += len(lights) - len(indices)
+        return indices
+
+    def _cell(self, position: Tuple) -> Cell:
+        size = self._cell_size
+        return (math.floor(position[0] / size),
+                math.floor(position[1] / size),
+                math.floor(position[2] / size))
+
+
+def _attenuation(distance: float, radius: float) -> float:
+    """Return the windowed falloff at a given distance from a light with a
+    given radius of influence: one at the light, zero at and beyond the
+    radius.
+    """
+    if distance >= radius:
+        return 0.0
+    ratio = distance / radius
+    falloff = 1.0 - ratio * ratio
+    return falloff * falloff
@@ -1,11 +1,21 @@
 # Copyright (c) 2020-2021 Stefan Holdermans.
 # Licensed under the MIT License.
 
+# Prevent pylint from mistakenly reporting that `Optional` is unsubscriptable:
+#   pylint: disable=unsubscriptable-object
+# See https://github.com/PyCQA/pylint/issues/3882.
+
 """Materials."""
 
+from array import array
 from dataclasses import dataclass
+import itertools
+import math
+from typing import Any, Iterable, Optional
+
+from . import backends
 from .colors import Color, BLACK, WHITE
-from .lights import PointLight
+from .lights import PointLight, _attenuation
 from .tuples import Tuple, TupleTypeMismatchError
 
 
@@ -20,17 +30,29 @@ class Material:
     shininess: float = 200.0
 
     def lighting(
-        self, light: PointLight, point: Tuple, eyev: Tuple, normalv: Tuple
+        self, light: PointLight, point: Tuple, eyev: Tuple, normalv: Tuple,
+        in_shadow: bool = False
     ) -> Color:
         """Illuminate the material at a specified point for a given light source
         and given eye and normal vectors.
 
+        A point in shadow receives ambient light only. All light is scaled by
+        the attenuation of the light at the point.
+
         Raises `TupleTypeMismatchError` if `point` is not a point or if any of
         `eyev` and `normalv` are not vectors.
         """
+        # pylint: disable=too-many-locals
         if not (point.is_point() or eyev.is_vector() or normalv.is_vector()):
             raise TupleTypeMismatchError
 
+        attenuation = 1.0
+        if light.radius is not None:
+            distance = (light.position - point).magnitude()
+            attenuation = light.attenuation(distance)
+            if attenuation == 0.0:
+                return BLACK
+
         effective_color = self.color * light.intensity
 
         ambient = effective_color * self.ambient
@@ -38,7 +60,7 @@ class Material:
         lightv = (light.position - point).normalized()
         light_dot_normal = lightv.dot(normalv)
 
-        if light_dot_normal < 0.0:
+        if in_shadow or light_dot_normal < 0.0:
             diffuse = BLACK
             specular = BLACK
         else:
@@ -53,4 +75,84 @@ class Material:
                 factor = reflect_dot_eye ** self.shininess
                 specular = light.intensity * self.specular * factor
 
-        return ambient + diffuse + specular
+        color = ambient + diffuse + specular
+        return color * attenuation if attenuation != 1.0 else color
+
+    def lighting_many(
+        self, light: PointLight, points: Iterable[Tuple],
+        eyevs: Iterable[Tuple], normalvs: Iterable[Tuple],
+        in_shadow: Optional[Iterable[bool]] = None
+    ) -> Any:
+        """Illuminate the material at a batch of points for a given light
+        source, with an eye and a normal vector for every point, and
+        optionally a flag for every point that tells whether it is in shadow.
+
+        Returns the red, green, and blue intensities of the illuminated
+        points, one point after another, as `lighting` would compute them,
+        ready to be pasted into a canvas. With the NumPy backend, the points
+        and vectors may also be given as arrays of shape (n, 4) and a NumPy
+        array is returned.
+
+        Unlike `lighting`, the types of the tuples are not checked.
+        """
+        # pylint: disable=too-many-arguments,too-many-locals
+        material = (self.color[0], self.color[1], self.color[2], self.ambient,
+                    self.diffuse, self.specular, self.shininess)
+        radius = math.inf if light.radius is None else light.radius
+        source = (light.position[0], light.position[1], light.position[2],
+                  light.intensity[0], light.intensity[1], light.intensity[2],
+                  radius)
+        result = backends.current().lighting(material, source, points, eyevs,
+                                             normalvs, in_shadow)
+        if result is not NotImplemented:
+            return result
+
+        red, green, blue, ambient, diffuse, specular, shininess = material
+        lx, ly, lz, light_red, light_green, light_blue, _ = source
+        effective_red = red * light_red
+        effective_green = green * light_green
+        effective_blue = blue * light_blue
+        ambient_color = (effective_red * ambient, effective_green * ambient,
+                         effective_blue * ambient)
+        diffuse_color = (effective_red * diffuse, effective_green * diffuse,
+                         effective_blue * diffuse)
+        specular_color = (light_red * specular, light_green * specular,
+                          light_blue * specular)
+
+        if in_shadow is None:
+            in_shadow = itertools.repeat(False)
+
+        intensities = array("d")
+        ambient_red, ambient_green, ambient_blue = ambient_color
+        for point, eyev, normalv, shadowed in zip(points, eyevs, normalvs,
+                                                  in_shadow):
+            px, py, pz = point[0], point[1], point[2]
+            vx, vy, vz = lx - px, ly - py, lz - pz
+            magnitude = math.sqrt(vx * vx + vy * vy + vz * vz)
+            vx, vy, vz = vx / magnitude, vy / magnitude, vz / magnitude
+            nx, ny, nz = normalv[0], normalv[1], normalv[2]
+            light_dot_normal = vx * nx + vy * ny + vz * nz
+
+            if shadowed or light_dot_normal < 0.0:
+                color = ambient_color
+            else:
+                color = (ambient_red + diffuse_color[0] * light_dot_normal,
+                         ambient_green + diffuse_color[1] * light_dot_normal,
+                         ambient_blue + diffuse_color[2] * light_dot_normal)
+
+                scale = 2.0 * light_dot_normal
+                reflect_dot_eye = ((nx * scale - vx) * eyev[0]
+                                   + (ny * scale - vy) * eyev[1]
+                                   + (nz * scale - vz) * eyev[2])
+                if reflect_dot_eye > 0.0:
+                    factor = reflect_dot_eye ** shininess
+                    color = (color[0] + specular_color[0] * factor,
+                             color[1] + specular_color[1] * factor,
+                             color[2] + specular_color[2] * factor)
+
+            attenuation = _attenuation(magnitude, radius)
+            if attenuation != 1.0:
+                color = (color[0] * attenuation, color[1] * attenuation,
+                         color[2] * attenuation)
+            intensities.extend(color)
+        return intensities
@@ -8,20 +8,41 @@
 """Matrices."""
 
 from __future__ import annotations
-from typing import Iterator, List, Optional, Tuple as Pair
+import math
+from typing import Iterator, List, Optional, Sequence, Tuple as Pair
+from . import backends
 from .tuples import Tuple
 
+# The ratio of the magnitude of the determinant of a matrix to the product of
+# the lengths of its rows, at or below which the matrix is considered singular.
+# By Hadamard's inequality, the ratio lies between 0 and 1, whatever the scale
+# of the matrix.
+_SINGULARITY_TOLERANCE = 1e-12
+
 
 class Matrix():
     """A square matrix, i.e., a matrix with the same number of rows and columns.
+
+    Matrices of order 2, 3, and 4 are created as instances of the unrolled
+    specialisations `Matrix2`, `Matrix3`, and `Matrix4`, whatever the backend:
+    these keep their cells in lists and never consult the backend.
     """
 
+    __slots__ = ("_order", "_cells")
+
+    def __new__(cls, *args, **kwargs):
+        # pylint: disable=self-cls-assignment
+        if cls is Matrix:
+            order = args[0] if args else kwargs.get("order")
+            cls = _SPECIALISATIONS.get(order, Matrix)
+        return super().__new__(cls)
+
     def __init__(self, order: int, cells: Optional[List[float]] = None):
         if order < 1:
             raise ValueError
 
         self._order = order
-        self._cells = [0.0] * order * order
+        self._cells = self._storage([0.0] * order * order)
 
         if cells is not None:
             self._init_cells(cells)
@@ -30,13 +51,22 @@ class Matrix():
         if len(cells) != self.order * self.order:
             raise ValueError
 
-        self._cells = cells
+        self._cells = self._storage(cells)
+
+    @staticmethod
+    def _storage(cells: List[float]) -> Sequence[float]:
+        return backends.current().cells(cells)
 
     @property
     def order(self) -> int:
         """Return the order of the matrix."""
         return self._order
 
+    @property
+    def cells(self) -> List[float]:
+        """The cells of the matrix in row-major order."""
+        return list(self._cells)
+
     def is_first_order(self) -> bool:
         """Return whether the matrix is first-order."""
         return self.order == 1
@@ -62,7 +92,7 @@ class Matrix():
 
     def __contains__(self, index: Pair[int, int]) -> bool:
         row, col = index
-        return row in range(self.order) and col in range(self.order)
+        return 0 <= row < self._order and 0 <= col < self._order
 
     def __eq__(self, other):
         if isinstance(other, Matrix):
@@ -82,6 +112,11 @@ class Matrix():
             if self.order != other.order:
                 raise OrderError
 
+            cells = backends.current().multiply(
+                self.order, self._cells, other._cells)
+            if cells is not NotImplemented:
+                return Matrix(self.order, cells)
+
             m = Matrix(self.order)
             for row, col in self:
                 prods = [self[row, i] * other[i, col]
@@ -93,6 +128,11 @@ class Matrix():
             if self.order != 4:
                 raise OrderError
 
+            xyzw = backends.current().transform(
+                self._cells, other.x, other.y, other.z, other.w)
+            if xyzw is not NotImplemented:
+                return Tuple(*xyzw)
+
             x = (self[0, 0] * other.x + self[0, 1] * other.y
                  + self[0, 2] * other.z + self[0, 3] * other.w)
             y = (self[1, 0] * other.x + self[1, 1] * other.y
@@ -115,6 +155,10 @@ class Matrix():
 
     def transposed(self) -> Matrix:
         """Return the transposition of the matrix."""
+        cells = backends.current().transpose(self.order, self._cells)
+        if cells is not NotImplemented:
+            return Matrix(self.order, cells)
+
         m = Matrix(self.order)
         for row, col in m:
             m[row, col] = self[col, row]
@@ -158,24 +202,58 @@ class Matrix():
         return minor if (row + col) % 2 == 0 else -minor
 
     def determinant(self) -> float:
-        """Return the determinant of the matrix."""
+        """Return the determinant of the matrix.
+
+        Matrices of order 3 and higher are handed to the selected backend or,
+        if it has no native kernel, factorised by means of an LU decomposition
+        rather than expanded in cofactors.
+        """
         if self.is_first_order():
             return self[0, 0]
 
+        if self.order >= 3:
+            det = backends.current().determinant(self.order, self._cells)
+            if det is not NotImplemented:
+                return det
+
+            return self.lu().determinant()
+
         acc = 0.0
         for col in range(self.order):
             acc += self[0, col] * self.cofactor(0, col)
         return acc
 
     def is_invertible(self) -> bool:
-        """Return whether the matrix is invertible."""
-        return self.determinant() != 0.0
+        """Return whether the matrix is invertible.
+
+        Matrices whose determinant is negligible relative to the lengths of
+        their rows, such as singular matrices whose determinant is off zero by
+        a rounding error, are not invertible.
+        """
+        return not _is_singular(self.order, self._cells, self.determinant())
 
     def inversed(self) -> Matrix:
         """Return the inverse of the matrix.
 
         Raises `NotInvertibleError` if the matrix is not invertible.
         """
+        if self.order >= 3:
+            backend = backends.current()
+            det = backend.determinant(self.order, self._cells)
+            if det is not NotImplemented:
+                if _is_singular(self.order, self._cells, det):
+                    raise NotInvertibleError()
+
+                cells = backend.inverse(self.order, self._cells)
+                if cells is not NotImplemented:
+                    return Matrix(self.order, cells)
+
+            lu = self.lu()
+            if _is_singular(self.order, self._cells, lu.determinant()):
+                raise NotInvertibleError()
+
+            return lu.inversed()
+
         if not self.is_invertible():
             raise NotInvertibleError()
 
@@ -186,6 +264,370 @@ class Matrix():
             m[col, row] = c / det
         return m
 
+    def lu(self) -> LUDecomposition:
+        """Return the LU decomposition with partial pivoting of the matrix."""
+        return LUDecomposition(self)
+
+
+class LUDecomposition:
+    """The LU decomposition with partial pivoting of a square matrix A, i.e.,
+    a lower unit triangular matrix L, an upper triangular matrix U, and a row
+    permutation P, such that PA = LU.
+
+    A single decomposition yields the determinant, the inverse, and solutions
+    of linear systems in A, each in O(n^3) time.
+    """
+
+    def __init__(self, matrix: Matrix):
+        order = matrix.order
+        rows = [[matrix[row, col] for col in range(order)]
+                for row in range(order)]
+        permutation = list(range(order))
+        sign = 1.0
+        singular = False
+
+        for k in range(order):
+            column = [abs(row[k]) for row in rows[k:]]
+            pivot = k + column.index(max(column))
+            if rows[pivot][k] == 0.0:
+                singular = True
+                continue
+
+            if pivot != k:
+                rows[k], rows[pivot] = rows[pivot], rows[k]
+                permutation[k], permutation[pivot] = (permutation[pivot],
+                                                      permutation[k])
+                sign = -sign
+
+            pivot_row = rows[k]
+            for row in rows[k + 1:]:
+                factor = row[k] / pivot_row[k]
+                row[k] = factor
+                if factor != 0.0:
+                    for col in range(k + 1, order):
+                        row[col] -= factor * pivot_row[col]
+
+        self._order = order
+        self._rows = rows
+        self._permutation = permutation
+        self._sign = sign
+        self._singular = singular
+
+    @property
+    def order(self) -> int:
+        """Return the order of the decomposed matrix."""
+        return self._order
+
+    @property
+    def permutation(self) -> List[int]:
+        """The row permutation P, given as, for every row of LU, the index of
+        the corresponding row in the decomposed matrix.
+        """
+        return list(self._permutation)
+
+    @property
+    def lower(self) -> Matrix:
+        """The lower unit triangular matrix L."""
+        m = Matrix.identity(self.order)
+        for row, col in m:
+            if col < row:
+                m[row, col] = self._rows[row][col]
+        return m
+
+    @property
+    def upper(self) -> Matrix:
+        """The upper triangular matrix U."""
+        m = Matrix(self.order)
+        for row, col in m:
+            if col >= row:
+                m[row, col] = self._rows[row][col]
+        return m
+
+    def is_singular(self) -> bool:
+        """Return whether the decomposed matrix is singular."""
+        return self._singular
+
+    def determinant(self) -> float:
+        """Return the determinant of the decomposed matrix."""
+        if self._singular:
+            return 0.0
+
+        det = self._sign
+        for k in range(self.order):
+            det *= self._rows[k][k]
+        return det
+
+    def solve(self, b: List[float]) -> List[float]:
+        """Solve the linear system Ax = b for x, where A is the decomposed
+        matrix.
+
+        Raises `ValueError` if `b` does not have as many elements as A has
+        rows, and `NotInvertibleError` if A is singular.
+        """
+        if len(b) != self.order:
+            raise ValueError
+
+        if self.determinant() == 0.0:
+            raise NotInvertibleError()
+
+        rows = self._rows
+        x = [b[i] for i in self._permutation]
+
+        for row in range(self.order):
+            lower = rows[row]
+            for col in range(row):
+                x[row] -= lower[col] * x[col]
+
+        for row in reversed(range(self.order)):
+            upper = rows[row]
+            for col in range(row + 1, self.order):
+                x[row] -= upper[col] * x[col]
+            x[row] /= upper[row]
+
+        return x
+
+    def inversed(self) -> Matrix:
+        """Return the inverse of the decomposed matrix.
+
+        Raises `NotInvertibleError` if the matrix is singular.
+        """
+        order = self.order
+        cells = [0.0] * order * order
+        for col in range(order):
+            unit = [1.0 if row == col else 0.0 for row in range(order)]
+            for row, cell in enumerate(self.solve(unit)):
+                cells[row * order + col] = cell
+        return Matrix(order, cells)
+
+
+def _float_list(cells: Sequence[float]) -> List[float]:
+    """Return cells, given as a list or as any other sequence, as a list of
+    floats.
+    """
+    return cells if isinstance(cells, list) else [float(c) for c in cells]
+
+
+class Matrix2(Matrix):
+    """A 2x2 matrix with unrolled arithmetic."""
+
+    __slots__ = ()
+
+    _storage = staticmethod(_float_list)
+
+    @classmethod
+    def _of(cls, cells: List[float]) -> Matrix2:
+        m = super().__new__(cls)
+        m._order = 2
+        m._cells = cells
+        return m
+
+    def __mul__(self, other):
+        if isinstance(other, Matrix) and other.order == 2:
+            a00, a01, a10, a11 = self._cells
+            b00, b01, b10, b11 = other._cells
+            return Matrix2._of([a00 * b00 + a01 * b10, a00 * b01 + a01 * b11,
+                                a10 * b00 + a11 * b10, a10 * b01 + a11 * b11])
+
+        return super().__mul__(other)
+
+    def transposed(self) -> Matrix:
+        a00, a01, a10, a11 = self._cells
+        return Matrix2._of([a00, a10, a01, a11])
+
+    def determinant(self) -> float:
+        a00, a01, a10, a11 = self._cells
+        return a00 * a11 - a01 * a10
+
+    def inversed(self) -> Matrix:
+        a00, a01, a10, a11 = self._cells
+        det = a00 * a11 - a01 * a10
+        if _is_singular(2, self._cells, det):
+            raise NotInvertibleError()
+
+        return Matrix2._of([a11 / det, -a01 / det, -a10 / det, a00 / det])
+
+
+class Matrix3(Matrix):
+    """A 3x3 matrix with unrolled arithmetic."""
+
+    __slots__ = ()
+
+    _storage = staticmethod(_float_list)
+
+    @classmethod
+    def _of(cls, cells: List[float]) -> Matrix3:
+        m = super().__new__(cls)
+        m._order = 3
+        m._cells = cells
+        return m
+
+    def __mul__(self, other):
+        # pylint: disable=too-many-locals
+        if isinstance(other, Matrix) and other.order == 3:
+            a00, a01, a02, a10, a11, a12, a20, a21, a22 = self._cells
+            b00, b01, b02, b10, b11, b12, b20, b21, b22 = other._cells
+            return Matrix3._of([
+                a00 * b00 + a01 * b10 + a02 * b20,
+                a00 * b01 + a01 * b11 + a02 * b21,
+                a00 * b02 + a01 * b12 + a02 * b22,
+                a10 * b00 + a11 * b10 + a12 * b20,
+                a10 * b01 + a11 * b11 + a12 * b21,
+                a10 * b02 + a11 * b12 + a12 * b22,
+                a20 * b00 + a21 * b10 + a22 * b20,
+                a20 * b01 + a21 * b11 + a22 * b21,
+                a20 * b02 + a21 * b12 + a22 * b22])
+
+        return super().__mul__(other)
+
+    def transposed(self) -> Matrix:
+        a00, a01, a02, a10, a11, a12, a20, a21, a22 = self._cells
+        return Matrix3._of([a00, a10, a20, a01, a11, a21, a02, a12, a22])
+
+    def determinant(self) -> float:
+        a00, a01, a02, a10, a11, a12, a20, a21, a22 = self._cells
+        return (a00 * (a11 * a22 - a12 * a21)
+                - a01 * (a10 * a22 - a12 * a20)
+                + a02 * (a10 * a21 - a11 * a20))
+
+    def inversed(self) -> Matrix:
+        a00, a01, a02, a10, a11, a12, a20, a21, a22 = self._cells
+        c00 = a11 * a22 - a12 * a21
+        c01 = a12 * a20 - a10 * a22
+        c02 = a10 * a21 - a11 * a20
+        det = a00 * c00 + a01 * c01 + a02 * c02
+        if _is_singular(3, self._cells, det):
+            raise NotInvertibleError()
+
+        return Matrix3._of([
+            c00 / det, (a02 * a21 - a01 * a22) / det,
+            (a01 * a12 - a02 * a11) / det,
+            c01 / det, (a00 * a22 - a02 * a20) / det,
+            (a02 * a10 - a00 * a12) / det,
+            c02 / det, (a01 * a20 - a00 * a21) / det,
+            (a00 * a11 - a01 * a10) / det])
+
+
+class Matrix4(Matrix):
+    """A 4x4 matrix with unrolled arithmetic."""
+
+    __slots__ = ()
+
+    _storage = staticmethod(_float_list)
+
+    @classmethod
+    def _of(cls, cells: List[float]) -> Matrix4:
+        m = super().__new__(cls)
+        m._order = 4
+        m._cells = cells
+        return m
+
+    def __getitem__(self, index: Pair[int, int]) -> float:
+        row, col = index
+        if not (0 <= row < 4 and 0 <= col < 4):
+            raise IndexError
+
+        return self._cells[row * 4 + col]
+
+    def __mul__(self, other):
+        # pylint: disable=too-many-locals
+        if isinstance(other, Tuple):
+            m = self._cells
+            x, y, z, w = other
+            return Tuple(m[0] * x + m[1] * y + m[2] * z + m[3] * w,
+                         m[4] * x + m[5] * y + m[6] * z + m[7] * w,
+                         m[8] * x + m[9] * y + m[10] * z + m[11] * w,
+                         m[12] * x + m[13] * y + m[14] * z + m[15] * w)
+
+        if isinstance(other, Matrix) and other.order == 4:
+            (a00, a01, a02, a03, a10, a11, a12, a13,
+             a20, a21, a22, a23, a30, a31, a32, a33) = self._cells
+            (b00, b01, b02, b03, b10, b11, b12, b13,
+             b20, b21, b22, b23, b30, b31, b32, b33) = other._cells
+            return Matrix4._of([
+                a00 * b00 + a01 * b10 + a02 * b20 + a03 * b30,
+                a00 * b01 + a01 * b11 + a02 * b21 + a03 * b31,
+                a00 * b02 + a01 * b12 + a02 * b22 + a03 * b32,
+                a00 * b03 + a01 * b13 + a02 * b23 + a03 * b33,
+                a10 * b00 + a11 * b10 + a12 * b20 + a13 * b30,
+                a10 * b01 + a11 * b11 + a12 * b21 + a13 * b31,
+                a10 * b02 + a11 * b12 + a12 * b22 + a13 * b32,
+                a10 * b03 + a11 * b13 + a12 * b23 + a13 * b33,
+                a20 * b00 + a21 * b10 + a22 * b20 + a23 * b30,
+                a20 * b01 + a21 * b11 + a22 * b21 + a23 * b31,
+                a20 * b02 + a21 * b12 + a22 * b22 + a23 * b32,
+                a20 * b03 + a21 * b13 + a22 * b23 + a23 * b33,
+                a30 * b00 + a31 * b10 + a32 * b20 + a33 * b30,
+                a30 * b01 + a31 * b11 + a32 * b21 + a33 * b31,
+                a30 * b02 + a31 * b12 + a32 * b22 + a33 * b32,
+                a30 * b03 + a31 * b13 + a32 * b23 + a33 * b33])
+
+        return super().__mul__(other)
+
+    def transposed(self) -> Matrix:
+        # pylint: disable=too-many-locals
+        (a00, a01, a02, a03, a10, a11, a12, a13,
+         a20, a21, a22, a23, a30, a31, a32, a33) = self._cells
+        return Matrix4._of([a00, a10, a20, a30,
+                            a01, a11, a21, a31,
+                            a02, a12, a22, a32,
+                            a03, a13, a23, a33])
+
+    def _subfactors(self):
+        # pylint: disable=too-many-locals
+        (a00, a01, a02, a03, a10, a11, a12, a13,
+         a20, a21, a22, a23, a30, a31, a32, a33) = self._cells
+        upper = (a00 * a11 - a10 * a01, a00 * a12 - a10 * a02,
+                 a00 * a13 - a10 * a03, a01 * a12 - a11 * a02,
+                 a01 * a13 - a11 * a03, a02 * a13 - a12 * a03)
+        lower = (a20 * a31 - a30 * a21, a20 * a32 - a30 * a22,
+                 a20 * a33 - a30 * a23, a21 * a32 - a31 * a22,
+                 a21 * a33 - a31 * a23, a22 * a33 - a32 * a23)
+        return upper, lower
+
+    def determinant(self) -> float:
+        (s0, s1, s2, s3, s4, s5), (c0, c1, c2, c3, c4, c5) = self._subfactors()
+        return s0 * c5 - s1 * c4 + s2 * c3 + s3 * c2 - s4 * c1 + s5 * c0
+
+    def inversed(self) -> Matrix:
+        # pylint: disable=too-many-locals
+        (a00, a01, a02, a03, a10, a11, a12, a13,
+         a20, a21, a22, a23, a30, a31, a32, a33) = self._cells
+        (s0, s1, s2, s3, s4, s5), (c0, c1, c2, c3, c4, c5) = self._subfactors()
+        det = s0 * c5 - s1 * c4 + s2 * c3 + s3 * c2 - s4 * c1 + s5 * c0
+        if _is_singular(4, self._cells, det):
+            raise NotInvertibleError()
+
+        return Matrix4._of([
+            (a11 * c5 - a12 * c4 + a13 * c3) / det,
+            (-a01 * c5 + a02 * c4 - a03 * c3) / det,
+            (a31 * s5 - a32 * s4 + a33 * s3) / det,
+            (-a21 * s5 + a22 * s4 - a23 * s3) / det,
+            (-a10 * c5 + a12 * c2 - a13 * c1) / det,
+            (a00 * c5 - a02 * c2 + a03 * c1) / det,
+            (-a30 * s5 + a32 * s2 - a33 * s1) / det,
+            (a20 * s5 - a22 * s2 + a23 * s1) / det,
+            (a10 * c4 - a11 * c2 + a13 * c0) / det,
+            (-a00 * c4 + a01 * c2 - a03 * c0) / det,
+            (a30 * s4 - a31 * s2 + a33 * s0) / det,
+            (-a20 * s4 + a21 * s2 - a23 * s0) / det,
+            (-a10 * c3 + a11 * c1 - a12 * c0) / det,
+            (a00 * c3 - a01 * c1 + a02 * c0) / det,
+            (-a30 * s3 + a31 * s1 - a32 * s0) / det,
+            (a20 * s3 - a21 * s1 + a22 * s0) / det])
+
+
+_SPECIALISATIONS = {2: Matrix2, 3: Matrix3, 4: Matrix4}
+
+
+def _is_singular(order: int, cells: Sequence[float], det: float) -> bool:
+    """Return whether a matrix, given by its order, its cells, and its
+    determinant, is singular or too close to singular to be inverted.
+    """
+    bound = 1.0
+    for row in range(0, order * order, order):
+        bound *= math.sqrt(sum(cell * cell for cell in cells[row:row + order]))
+    return abs(det) <= _SINGULARITY_TOLERANCE * bound
+
 
 class OrderError(Exception):
     """Raised when a matrix operation is invoked on a matrix of incompatible
@@ -25,6 +25,16 @@ class Ray:
         self.origin = origin
         self.direction = direction
 
+    @classmethod
+    def _of(cls, origin: Tuple, direction: Tuple) -> Ray:
+        """Create a ray without checking that its origin is a point and its
+        direction a vector.
+        """
+        ray = cls.__new__(cls)
+        ray.origin = origin
+        ray.direction = direction
+        return ray
+
     def position(self, t: float) -> Tuple:
         """Compute the point at a given distance along the ray."""
         return self.origin + self.direction * t
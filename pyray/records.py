@@ -0,0 +1,28 @@
+# Copyright (c) 2020-2021 Stefan Holdermans.
+# Licensed under the MIT License.
+
+"""Helpers for immutable values, such as tuples and colors, that are
+represented as built-in tuples of their components.
+"""
+
+import numbers
+
+# Create a value of a given subclass of `tuple` from a built-in tuple of its
+# components, bypassing the `__new__` of the subclass.
+make = tuple.__new__
+
+_SCALARS = frozenset((float, int))
+
+
+def is_scalar(value) -> bool:
+    """Return whether a value is a number, checking the common built-in types
+    before falling back on the `numbers` ABCs.
+    """
+    return value.__class__ in _SCALARS or isinstance(value, numbers.Number)
+
+
+def unordered(self, other):
+    """Refuse to order values, rather than to compare them lexicographically
+    like built-in tuples.
+    """
+    raise TypeError(f"'{type(self).__name__}' objects are unordered")
@@ -0,0 +1,504 @@
+# Copyright (c) 2020-2021 Stefan Holdermans.
+# Licensed under the MIT License.
+
+# Prevent pylint from mistakenly reporting that `Optional` is unsubscriptable:
+#   pylint: disable=unsubscriptable-object
+# See https://github.com/PyCQA/pylint/issues/3882.
+
+"""Scenes and rendering."""
+
+from __future__ import annotations
+
+from array import array
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import functools
+import itertools
+import math
+import multiprocessing
+from multiprocessing import util
+import os
+import threading
+import time
+from typing import (AsyncIterator, Callable, Dict, Iterable, Iterator, List,
+                    Optional, Sequence, Tuple as Pair)
+
+from . import backends
+from .cameras import Camera, Tile
+from .canvases import Canvas, SharedCanvas
+from .colors import Color, BLACK
+from .intersections import IntersectionCollector
+from .lights import CullingStatistics, LightIndex, PointLight
+from .rays import Ray
+from .shadows import ShadowTester
+from .spheres import Sphere
+from .tuples import Tuple, point
+
+# Distance by which points on surfaces are moved along their normals before
+# testing shadows, so that surfaces do not shadow themselves.
+_SHADOW_BIAS = 1e-5
+
+
+class Scene:
+    """A scene of spheres lit by point lights.
+
+    The scene is viewed through a camera, if one is given, or else from an
+    eye point through a square wall, parallel to the xy plane and centered on
+    the z axis, onto which the canvas is projected.
+
+    Points are only shaded for the lights that reach them. The statistics in
+    `culling_statistics` count the lights evaluated and culled since they
+    were last reset; every render resets them, so that they describe the
+    last frame.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, spheres: Iterable[Sphere] = (),
+                 lights: Iterable[PointLight] = (),
+                 eye: Tuple = point(0.0, 0.0, -5.0),
+                 wall_z: float = 10.0, wall_size: float = 7.0,
+                 camera: Optional[Camera] = None):
+        # pylint: disable=too-many-arguments
+        self.spheres: List[Sphere] = list(spheres)
+        self.lights: List[PointLight] = list(lights)
+        self.eye = eye
+        self.wall_z = wall_z
+        self.wall_size = wall_size
+        self.camera = camera
+        self.culling_statistics = CullingStatistics()
+
+        # The shadow tester and the light index last handed out, each with
+        # the state of the scene for which it was built.
+        self._shadows: Optional[Pair[object, ShadowTester]] = None
+        self._light_index: Optional[Pair[object, LightIndex]] = None
+
+    def ray_for_pixel(self, x: int, y: int, width: int, height: int) -> Ray:
+        """Return the ray through a given pixel of a canvas of a given size.
+        """
+        if self.camera is not None:
+            return self.camera.ray_for_pixel(x, y)
+
+        pixel_size = self.wall_size / max(width, height)
+        x0 = -pixel_size * width / 2
+        y0 = pixel_size * height / 2
+        position = point(x0 + pixel_size * x, y0 - pixel_size * y,
+                         self.wall_z)
+        return Ray(self.eye, (position - self.eye).normalized())
+
+    def shadow_tester(self) -> ShadowTester:
+        """Return a shadow tester for the spheres and lights of the scene.
+
+        The tester is kept between calls, so that it keeps remembering the
+        spheres that cast shadows, until spheres or lights are added to,
+        removed from, or replaced in the scene.
+        """
+        key = (tuple(map(id, self.spheres)), tuple(map(id, self.lights)))
+        if self._shadows is None or key != self._shadows[0]:
+            self._shadows = (key, ShadowTester(self.spheres, self.lights))
+        return self._shadows[1]
+
+    def light_index(self) -> LightIndex:
+        """Return a spatial index over the lights of the scene that counts
+        into the culling statistics of the scene.
+
+        The index is kept between calls until lights are added to, removed
+        from, or replaced in the scene, or any of them is moved or given
+        another radius.
+        """
+        key = tuple((id(light), light.position, light.radius)
+                    for light in self.lights)
+        if self._light_index is None or key != self._light_index[0]:
+            self._light_index = (key, LightIndex(self.lights,
+                                                 self.culling_statistics))
+        return self._light_index[1]
+
+    def color_at(self, ray: Ray, shadows: Optional[ShadowTester] = None,
+                 lights: Optional[LightIndex] = None) -> Color:
+        """Return the color seen along a ray: the color of the visible
+        intersection of the ray with the spheres, illuminated by all lights
+        that reach it and that it is not shadowed from, or black if the ray
+        hits nothing.
+
+        Shadows are tested with `shadows`, which should be a tester for the
+        scene; reusing one tester for neighbouring rays lets it remember the
+        spheres that cast shadows. The lights that reach the intersection are
+        looked up in `lights`, which should be an index over the lights of the
+        scene. If no tester or index is given, those of `shadow_tester` and
+        `light_index` are used.
+        """
+        # pylint: disable=too-many-locals
+        collector = IntersectionCollector()
+        for sphere in self.spheres:
+            collector.add(sphere.intersections(ray))
+        i = collector.hit
+        if i is None:
+            return BLACK
+
+        if shadows is None:
+            shadows = self.shadow_tester()
+        if lights is None:
+            lights = self.light_index()
+        position = ray.position(i.t)
+        normalv = i.object.normal_at(position)
+        eyev = -ray.direction
+        # Test shadows from just above the surface, on the side of the eye.
+        bias = _SHADOW_BIAS if normalv.dot(eyev) >= 0.0 else -_SHADOW_BIAS
+        over_position = position + normalv * bias
+        red = green = blue = 0.0
+        for index in lights.lights_at(position):
+            in_shadow = shadows.is_shadowed(over_position, index)
+            contribution = i.object.material.lighting(
+                lights.lights[index], position, eyev, normalv, in_shadow)
+            red += contribution[0]
+            green += contribution[1]
+            blue += contribution[2]
+        return Color(red, green, blue)
+
+    def render_tile(self, tile: Tile, width: int, height: int,
+                    stop: Optional[Callable[[], bool]] = None) -> array:
+        """Trace the pixels of a tile, given by the position of its top-left
+        pixel and its size, of a canvas of a given size.
+
+        Returns the red, green, and blue intensities of the pixels, row by row.
+        If a stop flag is given, it is checked before every row, and once it
+        is set, only the rows traced so far are returned.
+        """
+        # pylint: disable=too-many-locals
+        left, top, tile_width, tile_height = tile
+        rays = self.camera.rays(tile) if self.camera is not None else None
+        intensities = array("d")
+        shadows = self.shadow_tester()
+        lights = self.light_index()
+        for y in range(top, top + tile_height):
+            if stop is not None and stop():
+                break
+            if rays is not None:
+                for ray in itertools.islice(rays, tile_width):
+                    intensities.extend(self.color_at(ray, shadows, lights))
+                continue
+            for x in range(left, left + tile_width):
+                ray = self.ray_for_pixel(x, y, width, height)
+                intensities.extend(self.color_at(ray, shadows, lights))
+        return intensities
+
+
+def tiles(width: int, height: int, tile_size: int) -> Iterator[Tile]:
+    """Split a canvas of a given size into square tiles, row by row; tiles on
+    the right and bottom edges may be smaller.
+    """
+    for top in range(0, height, tile_size):
+        for left in range(0, width, tile_size):
+            yield (left, top, min(tile_size, width - left),
+                   min(tile_size, height - top))
+
+
+def render(scene: Scene, width: int, height: int,
+           workers: Optional[int] = None, tile_size: int = 32) -> Canvas:
+    """Render a scene onto a new canvas of a given size.
+
+    The canvas is split into tiles of `tile_size` by `tile_size` pixels, which
+    are traced in a pool of `workers` processes, by default one per CPU. The
+    scene is sent to every worker once, when it starts. Workers write their
+    tiles directly into a shared canvas, where available. With a single
+    worker, tiles are traced in the calling process. The result does not
+    depend on the number of workers or the tile size.
+
+    If the scene has a camera, the size of the canvas must match it. The
+    directions of the camera's rays are computed in the calling process, so
+    that they are cached for later renders and sent to the workers with the
+    scene.
+
+    Raises `ValueError` if `workers` or `tile_size` is less than 1, or if the
+    size of the canvas does not match the camera.
+    """
+    workers = _check_render_arguments(scene, width, height, workers,
+                                      tile_size)
+    scene.culling_statistics.reset()
+
+    if workers == 1:
+        canvas = Canvas(width, height)
+        for tile in tiles(width, height, tile_size):
+            canvas.paste(tile[0], tile[1], tile[2],
+                         scene.render_tile(tile, width, height))
+        return canvas
+
+    _cache_camera_directions(scene, width, height, tile_size)
+
+    try:
+        shared = SharedCanvas.create(width, height)
+    except ImportError:
+        canvas = Canvas(width, height)
+        jobs = list(tiles(width, height, tile_size))
+        with _executor(scene, width, height, workers, None) as executor:
+            for tile, (intensities, statistics) in zip(
+                    jobs, executor.map(_render_tile, jobs)):
+                canvas.paste(tile[0], tile[1], tile[2], intensities)
+                scene.culling_statistics.add(statistics)
+        return canvas
+
+    with shared:
+        with _executor(scene, width, height, workers, shared) as executor:
+            for _, statistics in executor.map(_render_tile,
+                                              tiles(width, height, tile_size)):
+                scene.culling_statistics.add(statistics)
+        return shared.copy()
+
+
+@dataclass
+class RenderedTile:
+    """A tile rendered by `render_async`, with the progress of the render."""
+
+    tile: Tile
+    intensities: array
+    completed: int
+    total: int
+
+    @property
+    def progress(self) -> float:
+        """The fraction of the tiles that have been rendered."""
+        return self.completed / self.total
+
+
+async def render_async(scene: Scene, width: int, height: int,
+                       workers: Optional[int] = None, tile_size: int = 32,
+                       canvas: Optional[Canvas] = None
+                       ) -> AsyncIterator[RenderedTile]:
+    """Render a scene asynchronously, yielding tiles as they are finished.
+
+    Tiles are traced as by `render`, in a pool of `workers` processes or,
+    with a single worker, in a thread, so that the event loop is never
+    blocked. Finished tiles come in the order in which they complete, with
+    the number of tiles completed so far; if a canvas is given, every tile is
+    pasted into it before it is yielded, so that it can be encoded as a
+    partial image.
+
+    At most two tiles per worker are queued at any time. If the task
+    iterating over the tiles is cancelled, or the iterator is closed, queued
+    tiles are cancelled, tiles in progress stop at their next row, and the
+    workers are shut down without waiting for them.
+
+    Raises `ValueError` as `render` does.
+    """
+    # pylint: disable=too-many-arguments,too-many-locals
+    workers = _check_render_arguments(scene, width, height, workers,
+                                      tile_size)
+    scene.culling_statistics.reset()
+    all_tiles = list(tiles(width, height, tile_size))
+    total = len(all_tiles)
+    jobs = iter(all_tiles)
+
+    if workers == 1:
+        stop = threading.Event()
+        executor: Executor = ThreadPoolExecutor(max_workers=1)
+        function = functools.partial(_render_scene_tile, scene, width,
+                                     height, stop)
+    else:
+        stop = multiprocessing.Event()
+        _cache_camera_directions(scene, width, height, tile_size)
+        executor = _executor(scene, width, height, workers, None, stop)
+        function = _render_tile
+
+    loop = asyncio.get_running_loop()
+    queued: Dict[asyncio.Future, Tile] = {}
+
+    def enqueue():
+        for tile in itertools.islice(jobs, 2 * workers - len(queued)):
+            queued[loop.run_in_executor(executor, function, tile)] = tile
+
+    completed = 0
+    try:
+        enqueue()
+        while queued:
+            done, _ = await asyncio.wait(queued,
+                                         return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                tile = queued.pop(future)
+                intensities, statistics = future.result()
+                if statistics is not None:
+                    scene.culling_statistics.add(statistics)
+                enqueue()
+                if canvas is not None:
+                    canvas.paste(tile[0], tile[1], tile[2], intensities)
+                completed += 1
+                yield RenderedTile(tile, intensities, completed, total)
+    finally:
+        stop.set()
+        for future in queued:
+            future.cancel()
+        _shutdown_now(executor)
+
+
+def render_progressive(scene: Scene, width: int, height: int,
+                       steps: Sequence[int] = (8, 4, 2, 1),
+                       time_budget: Optional[float] = None
+                       ) -> Iterator[Canvas]:
+    """Render a scene progressively, from coarse to fine, yielding a new
+    canvas after every pass.
+
+    Each pass traces the pixels whose coordinates are both multiples of the
+    next of the given steps, skipping pixels traced in earlier passes, and
+    fills the gaps by repeating the traced pixel at the top-left corner of
+    every block of `step` by `step` pixels. The final pass, with a step of 1,
+    gives the same image as `render`.
+
+    If a time budget, in seconds, is given, rendering stops once it is
+    exhausted, after the first pass has been completed; the last canvas
+    yielded is then the best image so far, including the pixels traced in
+    the interrupted pass.
+
+    Raises `ValueError` if no steps are given or any step is less than 1.
+    """
+    # pylint: disable=too-many-locals
+    if not steps or min(steps) < 1:
+        raise ValueError
+
+    deadline = (time.monotonic() + time_budget if time_budget is not None
+                else math.inf)
+    scene.culling_statistics.reset()
+    shadows = scene.shadow_tester()
+    lights = scene.light_index()
+    traced = array("d", [0.0]) * (3 * width * height)
+    done = bytearray(width * height)
+    completed: Optional[int] = None
+
+    for step in steps:
+        fresh: List[Pair[int, int]] = []
+        for y in range(0, height, step):
+            for x in range(0, width, step):
+                if done[y * width + x]:
+                    continue
+                ray = scene.ray_for_pixel(x, y, width, height)
+                i = 3 * (y * width + x)
+                traced[i:i + 3] = array("d", scene.color_at(ray, shadows,
+                                                            lights))
+                done[y * width + x] = 1
+                fresh.append((x, y))
+
+            if completed is not None and time.monotonic() >= deadline:
+                yield _snapshot(traced, width, height, completed, fresh)
+                return
+
+        completed = step
+        yield _snapshot(traced, width, height, step, ())
+        if time.monotonic() >= deadline:
+            return
+
+
+def _snapshot(traced: array, width: int, height: int, step: int,
+              fresh: Iterable[Pair[int, int]]) -> Canvas:
+    """Return a canvas that repeats the pixels traced at multiples of `step`
+    over their blocks and shows the other freshly traced pixels as is.
+    """
+    canvas = Canvas(width, height)
+    for y in range(height):
+        source = 3 * (y - y % step) * width
+        if step == 1:
+            canvas.paste(0, y, width, traced[source:source + 3 * width])
+            continue
+
+        row = array("d")
+        for x in range(0, width, step):
+            i = source + 3 * x
+            row.extend(traced[i:i + 3] * min(step, width - x))
+        canvas.paste(0, y, width, row)
+
+    for x, y in fresh:
+        i = 3 * (y * width + x)
+        canvas[x, y] = Color(*traced[i:i + 3])
+    return canvas
+
+
+def _check_render_arguments(scene: Scene, width: int, height: int,
+                            workers: Optional[int], tile_size: int) -> int:
+    """Check the arguments of a render and return the number of workers."""
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1 or tile_size < 1:
+        raise ValueError
+    camera = scene.camera
+    if camera is not None and (width, height) != (camera.hsize, camera.vsize):
+        raise ValueError("canvas size does not match the camera")
+    return workers
+
+
+def _cache_camera_directions(scene: Scene, width: int, height: int,
+                             tile_size: int):
+    """Compute the directions of the rays through all tiles in the calling
+    process, so that they are sent to the workers with the scene.
+    """
+    if scene.camera is not None:
+        for tile in tiles(width, height, tile_size):
+            scene.camera.directions(tile)
+
+
+def _executor(scene: Scene, width: int, height: int, workers: int,
+              canvas: Optional[SharedCanvas],
+              stop: Optional[multiprocessing.synchronize.Event] = None
+              ) -> ProcessPoolExecutor:
+    # pylint: disable=too-many-arguments
+    name = canvas.name if canvas is not None else None
+    return ProcessPoolExecutor(
+        max_workers=workers, initializer=_start_worker,
+        initargs=(scene, backends.get_backend(), width, height, name, stop))
+
+
+def _shutdown_now(executor: Executor):
+    """Shut down an executor without waiting for its workers, cancelling the
+    calls that have not started, where supported.
+    """
+    try:
+        # pylint: disable=unexpected-keyword-arg
+        executor.shutdown(wait=False, cancel_futures=True)
+    except TypeError:
+        executor.shutdown(wait=False)
+
+
+# The scene rendered by a worker process, the size of the canvas, the
+# shared canvas into which the worker writes its tiles, if any, and the flag
+# that tells it to stop tracing, if any.
+# pylint: disable=invalid-name
+_scene: Optional[Scene] = None
+_size: Pair[int, int] = (0, 0)
+_canvas: Optional[SharedCanvas] = None
+_stop: Optional[multiprocessing.synchronize.Event] = None
+# pylint: enable=invalid-name
+
+
+def _start_worker(scene: Scene, backend: str, width: int, height: int,
+                  name: Optional[str],
+                  stop: Optional[multiprocessing.synchronize.Event]):
+    # pylint: disable=global-statement,invalid-name,too-many-arguments
+    global _scene, _size, _canvas, _stop
+    backends.set_backend(backend)
+    _scene = scene
+    _size = (width, height)
+    _stop = stop
+    _canvas = None
+    if name is not None:
+        _canvas = SharedCanvas.attach(name, width, height)
+        # Worker processes exit without running `atexit` handlers, but with
+        # running the finalizers of `multiprocessing`.
+        util.Finalize(_canvas, _canvas.close, exitpriority=0)
+
+
+def _render_scene_tile(scene: Scene, width: int, height: int,
+                       stop: threading.Event,
+                       tile: Tile) -> Pair[array, None]:
+    return scene.render_tile(tile, width, height, stop.is_set), None
+
+
+def _render_tile(tile: Tile) -> Pair[Optional[array], CullingStatistics]:
+    """Trace a tile and write it to the shared canvas, if any, or else
+    return its intensities, along with the culling statistics of the tile.
+    """
+    statistics = _scene.culling_statistics
+    statistics.reset()
+    stop = _stop.is_set if _stop is not None else None
+    intensities = _scene.render_tile(tile, *_size, stop)
+    if _canvas is None:
+        return intensities, statistics
+    _canvas.paste(tile[0], tile[1], tile[2], intensities)
+    return None, statistics
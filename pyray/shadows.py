@@ -0,0 +1,67 @@
+# Copyright (c) 2020-2021 Stefan Holdermans.
+# Licensed under the MIT License.
+
+"""Shadows."""
+
+from typing import Iterable, List, Tuple as Pair
+
+from .caches import CacheStatistics
+from .lights import PointLight
+from .spheres import Sphere, SphereTable
+from .tuples import Tuple
+
+
+class ShadowTester:
+    """Tells whether points are in the shadow of a set of spheres with
+    respect to a set of lights.
+
+    A point is in shadow if the segment from the point to the light intersects
+    any sphere, so the test stops at the first sphere found rather than
+    looking for the nearest one. For every light, the tester remembers the
+    sphere that last cast a shadow and tests it first, as neighbouring points
+    are usually shadowed by the same sphere. The statistics in
+    `cache_statistics` count how often that sphere turned out to be an
+    occluder again (hits) and how often all spheres had to be searched
+    (recomputations).
+
+    The tester captures the transformations of the spheres at construction,
+    in a `SphereTable`, which refreshes them automatically after any of the
+    spheres has been transformed. The remembered spheres are only tested
+    first, so they never cause wrong answers, even after spheres have moved.
+    """
+
+    def __init__(self, spheres: Iterable[Sphere],
+                 lights: Iterable[PointLight]):
+        self._table = SphereTable(spheres)
+        self._lights = tuple(lights)
+        self._occluders: List[int] = [-1] * len(self._lights)
+        self.cache_statistics = CacheStatistics()
+
+    @property
+    def lights(self) -> Pair[PointLight, ...]:
+        """The lights, in the order in which they are indexed."""
+        return self._lights
+
+    def is_shadowed(self, position: Tuple, light: int) -> bool:
+        """Tell whether a point is in the shadow of a sphere with respect to
+        the light at a given index.
+
+        Points on the surface of a sphere should be moved slightly away from
+        the surface first, so that the sphere does not shadow itself.
+        """
+        v = self._lights[light].position - position
+        distance = v.magnitude()
+        if distance == 0.0:
+            return False
+
+        direction = v / distance
+        last = self._occluders[light]
+        occluder = self._table.occluder(position, direction, distance, last)
+        if occluder == last != -1:
+            self.cache_statistics.hits += 1
+            return True
+
+        self.cache_statistics.recomputations += 1
+        if occluder >= 0:
+            self._occluders[light] = occluder
+        return occluder >= 0
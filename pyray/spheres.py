@@ -1,12 +1,20 @@
 # Copyright (c) 2020-2021 Stefan Holdermans.
 # Licensed under the MIT License.
 
+# Prevent pylint from mistakenly reporting that `Optional` is unsubscriptable:
+#   pylint: disable=unsubscriptable-object
+# See https://github.com/PyCQA/pylint/issues/3882.
+
 """Spheres."""
 
+from array import array
 from collections.abc import Sequence
+import itertools
 import math
-from typing import Tuple as Pair
+from typing import Any, Iterable, List, Optional, Tuple as Pair
 
+from . import backends
+from .caches import CacheStatistics
 from .intersections import Intersection
 from .materials import Material
 from .matrices import Matrix
@@ -15,7 +23,7 @@ from .transformations import Transformation
 from .transformations import translation, scaling
 from .transformations import rotation_x, rotation_y, rotation_z
 from .transformations import shearing
-from .tuples import Tuple, TupleTypeMismatchError, point
+from .tuples import Tuple, TupleTypeMismatchError, ORIGIN, point, vector
 
 
 class Sphere:
@@ -23,17 +31,60 @@ class Sphere:
 
     def __init__(self):
         self._transformation = Transformation()
+        self._cached_version: Optional[int] = None
+        self._inverse_transform = Matrix.identity(4)
+        self._normal_transform = Matrix.identity(4)
+        self.cache_statistics = CacheStatistics()
         self.material = Material()
 
     @property
     def transform(self) -> Matrix:
-        """The sphere's transformation matrix."""
+        """A copy of the sphere's transformation matrix.
+
+        Changing the copy does not transform the sphere: use `translate`,
+        `scale`, `rotate_*` or `shear` instead.
+        """
         return self._transformation.matrix
 
+    @property
+    def version(self) -> int:
+        """A counter that is incremented every time the sphere is
+        transformed.
+        """
+        return self._transformation.version
+
     @property
     def inverse_transform(self) -> Matrix:
-        """The sphere's inversed transformation matrix."""
-        return self.transform.inversed()
+        """The sphere's inversed transformation matrix.
+
+        The matrix is cached and only recomputed after the sphere's
+        transformation has changed. It is shared by all callers and must not
+        be changed.
+        """
+        self._refresh_cache()
+        return self._inverse_transform
+
+    @property
+    def normal_transform(self) -> Matrix:
+        """The transposition of the sphere's inversed transformation matrix,
+        which maps normals in object space to normals in world space.
+
+        The matrix is cached and only recomputed after the sphere's
+        transformation has changed. It is shared by all callers and must not
+        be changed.
+        """
+        self._refresh_cache()
+        return self._normal_transform
+
+    def _refresh_cache(self):
+        if self._cached_version == self._transformation.version:
+            self.cache_statistics.hits += 1
+            return
+
+        self.cache_statistics.recomputations += 1
+        self._inverse_transform = self.transform.inversed()
+        self._normal_transform = self._inverse_transform.transposed()
+        self._cached_version = self._transformation.version
 
     def translate(self, x: float, y: float, z: float):
         """Translate the sphere."""
@@ -71,7 +122,7 @@ class Sphere:
     def intersections(self, ray: Ray) -> Sequence[Intersection]:
         """Return the intersections of a given ray with the sphere."""
         ray = ray.transformed(self.inverse_transform)
-        sphere_to_ray = ray.origin - point(0.0, 0.0, 0.0)
+        sphere_to_ray = ray.origin - ORIGIN
 
         a = ray.direction.dot(ray.direction)
         b = 2.0 * ray.direction.dot(sphere_to_ray)
@@ -87,6 +138,47 @@ class Sphere:
 
         return (Intersection(t1, self), Intersection(t2, self))
 
+    def intersect_many(self, origins: Iterable[Tuple],
+                       directions: Iterable[Tuple]) -> Pair[Any, Any]:
+        """Intersect a batch of rays, given by their origins and directions,
+        with the sphere.
+
+        Returns a pair of arrays: the distances `t` to the hits of the rays,
+        i.e., their lowest nonnegative intersections, or infinity for rays
+        that do not hit the sphere, and a mask that tells which rays hit the
+        sphere. With the NumPy backend, `origins` and `directions` may also be
+        given as arrays of shape (n, 4) and NumPy arrays are returned.
+        """
+        cells = self.inverse_transform.cells
+        result = backends.current().intersect_unit_sphere(cells, origins,
+                                                          directions)
+        if result is not NotImplemented:
+            return result
+
+        ts = array("d")
+        hits: List[bool] = []
+        for origin, direction in zip(origins, directions):
+            t1, t2 = unit_sphere_roots(cells, 0, origin, direction)
+            t = t1 if t1 >= 0.0 else t2 if t2 >= 0.0 else math.inf
+            ts.append(t)
+            hits.append(t < math.inf)
+        return ts, hits
+
+    def bounds(self) -> Pair[Tuple, Tuple]:
+        """Return the corners with the least and greatest coordinates of the
+        smallest axis-aligned box in world space that contains the sphere.
+        """
+        cells = self.transform.cells
+        lower = []
+        upper = []
+        for row in range(3):
+            a, b, c, center = cells[4 * row:4 * row + 4]
+            extent = math.sqrt(a * a + b * b + c * c)
+            lower.append(center - extent)
+            upper.append(center + extent)
+        return (point(lower[0], lower[1], lower[2]),
+                point(upper[0], upper[1], upper[2]))
+
     def normal_at(self, world_point: Tuple) -> Tuple:
         """Return the normal on the sphere at a given point.
 
@@ -96,7 +188,248 @@ class Sphere:
             raise TupleTypeMismatchError
 
         object_point = self.inverse_transform * world_point
-        object_normal = object_point - point(0.0, 0.0, 0.0)
-        world_normal = self.inverse_transform.transposed() * object_normal
-        world_normal.w = 0.0
-        return world_normal.normalized()
+        object_normal = object_point - ORIGIN
+        world_normal = self.normal_transform * object_normal
+        return vector(world_normal.x, world_normal.y,
+                      world_normal.z).normalized()
+
+
+class SphereTable:
+    """A table of spheres that stores their inversed transformation matrices
+    in one contiguous array, so that rays can be intersected with all of them
+    at once.
+
+    The table captures the transformations of the spheres at construction
+    and refreshes them automatically, before the next query, after any of the
+    spheres has been transformed.
+    """
+
+    def __init__(self, spheres: Iterable[Sphere]):
+        self._spheres = tuple(spheres)
+        self._cells = array("d")
+        self._watch = TransformWatch(self._spheres)
+        self.refresh()
+
+    @property
+    def spheres(self) -> Pair[Sphere, ...]:
+        """The spheres in the table."""
+        return self._spheres
+
+    def __len__(self) -> int:
+        return len(self._spheres)
+
+    def refresh(self):
+        """Repack the inversed transformation matrices of the spheres."""
+        self._watch.reset()
+        cells = array("d")
+        for sphere in self._spheres:
+            cells.extend(sphere.inverse_transform.cells)
+        self._cells = cells
+
+    def nearest_many(self, origins: Iterable[Tuple],
+                     directions: Iterable[Tuple]) -> Pair[Any, Any]:
+        """Intersect a batch of rays, given by their origins and directions,
+        with all spheres in the table.
+
+        Returns a pair of arrays: for every ray, the index of the sphere with
+        the nearest nonnegative intersection, or -1 if it hits none, and the
+        distance `t` to that intersection, or infinity.
+        """
+        if self._watch.changed():
+            self.refresh()
+
+        result = backends.current().nearest_unit_sphere_hits(
+            self._cells, origins, directions)
+        if result is not NotImplemented:
+            return result
+
+        cells = self._cells
+        indices: List[int] = []
+        ts = array("d")
+        for origin, direction in zip(origins, directions):
+            nearest_index = -1
+            nearest_t = math.inf
+            for index in range(len(self._spheres)):
+                t1, t2 = unit_sphere_roots(cells, 16 * index, origin,
+                                           direction)
+                t = t1 if t1 >= 0.0 else t2
+                if 0.0 <= t < nearest_t:
+                    nearest_index = index
+                    nearest_t = t
+            indices.append(nearest_index)
+            ts.append(nearest_t)
+        return indices, ts
+
+    def nearest(self, origin: Tuple, direction: Tuple) -> Pair[int, float]:
+        """Intersect a ray, given by its origin and direction, with all
+        spheres in the table.
+
+        Returns the index of the sphere with the nearest nonnegative
+        intersection, or -1 if the ray hits none, and the distance `t` to that
+        intersection, or infinity.
+        """
+        indices, ts = self.nearest_many((origin,), (direction,))
+        return int(indices[0]), float(ts[0])
+
+    def hit(self, ray: Ray) -> Optional[Intersection]:
+        """Identify the visible intersection of a ray with the spheres in the
+        table, as `hit` would for the intersections of the ray with each of
+        the spheres.
+        """
+        index, t = self.nearest(ray.origin, ray.direction)
+        return Intersection(t, self._spheres[index]) if index >= 0 else None
+
+    def occluder(self, origin: Tuple, direction: Tuple, distance: float,
+                 first: int = -1, epsilon: float = 0.0) -> int:
+        """Return the index of any sphere in the table that a ray, given by
+        its origin and direction, intersects at a distance `t` with
+        `epsilon < t < distance`, or -1 if there is no such sphere.
+
+        Unlike `nearest`, the search stops at the first sphere found. The
+        sphere at index `first`, if any, is tested before all others. Both
+        intersections with a sphere are tested, so that a ray starting on its
+        surface, at an intersection with `t == 0`, still finds the other one.
+        """
+        if self._watch.changed():
+            self.refresh()
+
+        count = len(self._spheres)
+        order: Iterable[int] = range(count)
+        if 0 <= first < count:
+            order = itertools.chain((first,), range(first),
+                                    range(first + 1, count))
+        cells = self._cells
+        for index in order:
+            t1, t2 = unit_sphere_roots(cells, 16 * index, origin, direction)
+            if epsilon < t1 < distance or epsilon < t2 < distance:
+                return index
+        return -1
+
+
+class TransformWatch:
+    """Tells whether any of a set of spheres has been transformed since the
+    watch was last reset.
+
+    Only if any transformation at all has changed since the last check are
+    the versions of the spheres compared, so that checks are cheap while
+    nothing is transformed.
+    """
+
+    def __init__(self, spheres: Iterable[Sphere]):
+        self._spheres = tuple(spheres)
+        self._generation = 0
+        self._versions: List[int] = []
+        self.reset()
+
+    def reset(self):
+        """Take the current transformations of the spheres as unchanged."""
+        self._generation = Transformation.generation()
+        self._versions = [sphere.version for sphere in self._spheres]
+
+    def changed(self) -> bool:
+        """Return whether any of the spheres has been transformed since the
+        watch was last reset.
+        """
+        generation = Transformation.generation()
+        if generation == self._generation:
+            return False
+
+        self._generation = generation
+        return [sphere.version for sphere in self._spheres] != self._versions
+
+
+class SphereIndex:
+    """A structure over a set of spheres, built from their transformations,
+    through which rays are intersected with only some of the spheres.
+
+    The structure captures the transformations of the spheres at
+    construction and is rebuilt automatically, before the next query, after
+    any of the spheres has been transformed. Subclasses build it in `_build`
+    and search it in `_nearest`.
+    """
+
+    def __init__(self, spheres: Iterable[Sphere]):
+        self._spheres = tuple(spheres)
+        self._watch = TransformWatch(self._spheres)
+
+    @property
+    def spheres(self) -> Pair[Sphere, ...]:
+        """The spheres in the structure."""
+        return self._spheres
+
+    def __len__(self) -> int:
+        return len(self._spheres)
+
+    def nearest(self, origin: Tuple, direction: Tuple) -> Pair[int, float]:
+        """Intersect a ray, given by its origin and direction, with the
+        spheres in the structure.
+
+        Returns the index of the sphere with the nearest nonnegative
+        intersection, or -1 if the ray hits none, and the distance `t` to that
+        intersection, or infinity. Of spheres hit at the same distance, the
+        first one is taken.
+        """
+        if not self._spheres:
+            return -1, math.inf
+        if self._watch.changed():
+            self._watch.reset()
+            self._build()
+        return self._nearest(origin, direction)
+
+    def hit(self, ray: Ray) -> Optional[Intersection]:
+        """Identify the visible intersection of a ray with the spheres in the
+        structure, as `hit` would for the intersections of the ray with each
+        of the spheres.
+        """
+        index, t = self.nearest(ray.origin, ray.direction)
+        return Intersection(t, self._spheres[index]) if index >= 0 else None
+
+    def _build(self):
+        raise NotImplementedError
+
+    def _nearest(self, origin: Tuple, direction: Tuple) -> Pair[int, float]:
+        raise NotImplementedError
+
+    @staticmethod
+    def _hit_distance(cells: Sequence[float], offset: int, origin: Tuple,
+                      direction: Tuple) -> float:
+        """Return the distance to the nearest nonnegative intersection of a
+        ray with the sphere whose inversed transformation matrix starts at
+        `offset` in `cells`, or infinity.
+        """
+        t1, t2 = unit_sphere_roots(cells, offset, origin, direction)
+        return t1 if t1 >= 0.0 else t2 if t2 >= 0.0 else math.inf
+
+
+def unit_sphere_roots(cells: Sequence[float], offset: int, origin: Tuple,
+                      direction: Tuple) -> Pair[float, float]:
+    """Return the distances `t1 <= t2` at which a ray, given by its origin and
+    direction, intersects a unit sphere after transforming the ray by the 4x4
+    matrix starting at `offset` in `cells`, or two infinities if the ray
+    misses the sphere.
+    """
+    # pylint: disable=too-many-locals
+    (m00, m01, m02, m03, m10, m11, m12, m13,
+     m20, m21, m22, m23, m30, m31, m32, m33) = cells[offset:offset + 16]
+    ox, oy, oz, ow = origin
+    dx, dy, dz, dw = direction
+
+    sx = m00 * ox + m01 * oy + m02 * oz + m03 * ow
+    sy = m10 * ox + m11 * oy + m12 * oz + m13 * ow
+    sz = m20 * ox + m21 * oy + m22 * oz + m23 * ow
+    sw = m30 * ox + m31 * oy + m32 * oz + m33 * ow - 1.0
+    dx, dy, dz, dw = (m00 * dx + m01 * dy + m02 * dz + m03 * dw,
+                      m10 * dx + m11 * dy + m12 * dz + m13 * dw,
+                      m20 * dx + m21 * dy + m22 * dz + m23 * dw,
+                      m30 * dx + m31 * dy + m32 * dz + m33 * dw)
+
+    a = dx * dx + dy * dy + dz * dz + dw * dw
+    b = 2.0 * (dx * sx + dy * sy + dz * sz + dw * sw)
+    c = sx * sx + sy * sy + sz * sz + sw * sw - 1.0
+
+    discriminant = b * b - 4 * a * c
+    if discriminant < 0.0:
+        return math.inf, math.inf
+
+    root = math.sqrt(discriminant)
+    return (-b - root) / (2.0 * a), (-b + root) / (2.0 * a)
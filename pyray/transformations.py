@@ -15,13 +15,36 @@ class Transformation:
     transformation matrices.
     """
 
+    _generation = 0
+
     def __init__(self):
         self._matrix = Matrix.identity(4)
+        self._version = 0
 
     @property
     def matrix(self) -> Matrix:
-        """The transformation matrix."""
-        return self._matrix
+        """A copy of the transformation matrix.
+
+        Changing the copy does not change the transformation: use `add`
+        instead, so that the version of the transformation is incremented.
+        """
+        m = self._matrix
+        return Matrix(m.order, [m[index] for index in m])
+
+    @property
+    def version(self) -> int:
+        """A counter that is incremented every time a transformation matrix is
+        added.
+        """
+        return self._version
+
+    @staticmethod
+    def generation() -> int:
+        """Return a counter that is incremented every time a transformation
+        matrix is added to any transformation, so that structures capturing
+        many transformations can tell cheaply that none of them changed.
+        """
+        return Transformation._generation
 
     def add(self, transform: Matrix):
         """Add a transformation matrix.
@@ -32,6 +55,8 @@ class Transformation:
             raise OrderError
 
         self._matrix = transform * self._matrix
+        self._version += 1
+        Transformation._generation += 1
 
     def apply(self, t: Tuple) -> Tuple:
         """Apply the transformation to a tuple."""
@@ -102,3 +127,18 @@ def shearing(x: Pair[float, float] = (0.0, 0.0),
     transform[2, 0] = z_x
     transform[2, 1] = z_y
     return transform
+
+
+def view_transform(from_point: Tuple, to_point: Tuple, up: Tuple) -> Matrix:
+    """Construct a matrix that orients the world relative to an eye at
+    `from_point`, looking at `to_point`, with `up` pointing roughly upwards.
+    """
+    forward = (to_point - from_point).normalized()
+    left = forward.cross(up.normalized())
+    true_up = left.cross(forward)
+    orientation = Matrix(4, [left.x, left.y, left.z, 0.0,
+                             true_up.x, true_up.y, true_up.z, 0.0,
+                             -forward.x, -forward.y, -forward.z, 0.0,
+                             0.0, 0.0, 0.0, 1.0])
+    return orientation * translation(-from_point.x, -from_point.y,
+                                     -from_point.z)
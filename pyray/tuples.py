@@ -5,50 +5,64 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
 import math
-import numbers
+from operator import itemgetter
 
+from .records import is_scalar, make, unordered
 
-@dataclass
-class Tuple:
-    """A tuple."""
 
-    x: float
-    y: float
-    z: float
-    w: float
+class Tuple(tuple):
+    """A tuple.
+
+    Tuples are immutable and hashable: they are represented as built-in tuples
+    of their x, y, z, and w components. Hence, they compare equal to, and hash
+    like, built-in tuples of the same components. They are not ordered,
+    though, and adding anything but another tuple to them raises `TypeError`
+    rather than concatenating them.
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, x: float, y: float, z: float, w: float):
+        return tuple.__new__(cls, (x, y, z, w))
+
+    def __getnewargs__(self):
+        return tuple(self)
+
+    x = property(itemgetter(0), doc="The x component of the tuple.")
+    y = property(itemgetter(1), doc="The y component of the tuple.")
+    z = property(itemgetter(2), doc="The z component of the tuple.")
+    w = property(itemgetter(3), doc="The w component of the tuple.")
+
+    def __repr__(self) -> str:
+        x, y, z, w = self
+        return f"Tuple(x={x!r}, y={y!r}, z={z!r}, w={w!r})"
 
     def is_point(self) -> bool:
         """Return whether the tuple is a point."""
-        return self.w == 1.0
+        return self[3] == 1.0
 
     def is_vector(self) -> bool:
         """Return whether the tuple is a vector."""
-        return self.w == 0.0
+        return self[3] == 0.0
 
     def magnitude(self) -> float:
         """Return the magnitude of the tuple."""
-        return math.sqrt(self.x * self.x
-                         + self.y * self.y
-                         + self.z * self.z
-                         + self.w * self.w)
+        x, y, z, w = self
+        return math.sqrt(x * x + y * y + z * z + w * w)
 
     def normalized(self) -> Tuple:
         """Normalize the tuple."""
-        magnitude = self.magnitude()
-        x = self.x / magnitude
-        y = self.y / magnitude
-        z = self.z / magnitude
-        w = self.w / magnitude
-        return Tuple(x, y, z, w)
+        x, y, z, w = self
+        magnitude = math.sqrt(x * x + y * y + z * z + w * w)
+        return make(Tuple, (x / magnitude, y / magnitude, z / magnitude,
+                            w / magnitude))
 
     def dot(self, other: Tuple) -> float:
         """Compute the dot product of the tuple with another tuple."""
-        return (self.x * other.x
-                + self.y * other.y
-                + self.z * other.z
-                + self.w * other.w)
+        x, y, z, w = self
+        ox, oy, oz, ow = other
+        return x * ox + y * oy + z * oz + w * ow
 
     def cross(self, other: Tuple) -> Tuple:
         """For vectors, compute the cross product of the tuple with another
@@ -56,48 +70,45 @@ class Tuple:
 
         Raises `TupleTypeMismatchError` if either tuple is not a vector.
         """
-        if not (self.is_vector() and other.is_vector()):
+        x, y, z, w = self
+        ox, oy, oz, ow = other
+        if not (w == 0.0 and ow == 0.0):
             raise TupleTypeMismatchError("only defined for vectors")
 
-        x = self.y * other.z - self.z * other.y
-        y = self.z * other.x - self.x * other.z
-        z = self.x * other.y - self.y * other.x
-        return Tuple(x, y, z, 0.0)
+        return make(Tuple, (y * oz - z * oy, z * ox - x * oz,
+                            x * oy - y * ox, 0.0))
 
     def __add__(self, other):
         if isinstance(other, Tuple):
-            x = self.x + other.x
-            y = self.y + other.y
-            z = self.z + other.z
-            w = self.w + other.w
-            return Tuple(x, y, z, w)
+            x, y, z, w = self
+            ox, oy, oz, ow = other
+            return make(Tuple, (x + ox, y + oy, z + oz, w + ow))
 
         return NotImplemented
 
+    def __radd__(self, other):
+        # Reached for built-in tuples, which would otherwise be concatenated
+        # with the tuple.
+        raise TypeError(f"unsupported operand type(s) for +:"
+                        f" '{type(other).__name__}' and 'Tuple'")
+
     def __sub__(self, other):
         if isinstance(other, Tuple):
-            x = self.x - other.x
-            y = self.y - other.y
-            z = self.z - other.z
-            w = self.w - other.w
-            return Tuple(x, y, z, w)
+            x, y, z, w = self
+            ox, oy, oz, ow = other
+            return make(Tuple, (x - ox, y - oy, z - oz, w - ow))
 
         return NotImplemented
 
     def __neg__(self):
-        x = -self.x
-        y = -self.y
-        z = -self.z
-        w = -self.w
-        return Tuple(x, y, z, w)
+        x, y, z, w = self
+        return make(Tuple, (-x, -y, -z, -w))
 
     def __mul__(self, scalar):
-        if isinstance(scalar, numbers.Number):
-            x = self.x * scalar
-            y = self.y * scalar
-            z = self.z * scalar
-            w = self.w * scalar
-            return Tuple(x, y, z, w)
+        if is_scalar(scalar):
+            x, y, z, w = self
+            return make(Tuple, (x * scalar, y * scalar, z * scalar,
+                                w * scalar))
 
         return NotImplemented
 
@@ -105,15 +116,15 @@ class Tuple:
         return self.__mul__(scalar)
 
     def __truediv__(self, scalar):
-        if isinstance(scalar, numbers.Number):
-            x = self.x / scalar
-            y = self.y / scalar
-            z = self.z / scalar
-            w = self.w / scalar
-            return Tuple(x, y, z, w)
+        if is_scalar(scalar):
+            x, y, z, w = self
+            return make(Tuple, (x / scalar, y / scalar, z / scalar,
+                                w / scalar))
 
         return NotImplemented
 
+    __lt__ = __le__ = __gt__ = __ge__ = unordered
+
     def reflected(self, normal: Tuple):
         """Return the vector obtained by reflecting the vector around a given
         normal.
@@ -140,3 +151,6 @@ def point(x: float, y: float, z: float) -> Tuple:
 def vector(x: float, y: float, z: float) -> Tuple:
     """Create a vector."""
     return Tuple(x, y, z, 0.0)
+
+
+ORIGIN: Tuple = point(0.0, 0.0, 0.0)
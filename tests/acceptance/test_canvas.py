@@ -3,6 +3,7 @@
 
 """Canvas-test utilities."""
 
+import io
 import os
 import unittest
 import pyray
@@ -20,9 +21,17 @@ class TestCanvas(unittest.TestCase):
 
     def assertCanvas(self, canvas: pyray.Canvas):
         # pylint: disable=invalid-name
-        """Assert that the PPM-formatted string representation of a canvas
-        matches the contents of the test case's golden file.
+        """Assert that the PPM-formatted string representation of a canvas,
+        as well as the PPM file written for it, matches the contents of the
+        test case's golden file, and that the golden file reads back into a
+        canvas with the same pixels.
         """
         ppm = canvas.ppm()
+        fp = io.StringIO()
+        canvas.write_ppm(fp)
         with open(self._golden_file_path) as golden_file:
-            self.assertEqual(golden_file.read(), ppm)
+            golden = golden_file.read()
+        self.assertEqual(golden, ppm)
+        self.assertEqual(golden, fp.getvalue())
+        golden_canvas = pyray.Canvas.from_ppm(self._golden_file_path)
+        self.assertEqual(ppm, golden_canvas.ppm())
@@ -71,3 +71,19 @@ class TestPlotting(TestCanvas):
         run(canvas, env, proj)
 
         self.assertCanvas(canvas)
+
+    def test_sparse_plotting(self):
+        """Test plotting the course of a virtual projectile on a sparse canvas.
+        """
+        gravity = pyray.vector(0.0, -0.1, 0.0)
+        wind = pyray.vector(-0.01, 0.0, 0.0)
+        env = Environment(gravity, wind)
+
+        position = pyray.point(0.0, 1.0, 0.0)
+        velocity = pyray.vector(1.0, 1.8, 0.0).normalized() * 11.25
+        proj = Projectile(position, velocity)
+
+        canvas = pyray.SparseCanvas(900, 550)
+        run(canvas, env, proj)
+
+        self.assertCanvas(canvas)
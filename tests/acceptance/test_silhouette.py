@@ -4,9 +4,50 @@
 """Acceptance test for ray-sphere intersection."""
 
 
+from typing import Callable, Iterator, List, Sequence, Tuple as Pair
 import pyray
 from .test_canvas import TestCanvas
 
+RAY_ORIGIN = pyray.point(0.0, 0.0, -5.0)
+WALL_Z = 10.0
+WALL_SIZE = 7.0
+CANVAS_PIXELS = 100
+
+Hits = Callable[[pyray.Sphere, List[pyray.Tuple]], Sequence[bool]]
+
+
+def scanlines(canvas: pyray.Canvas) -> Iterator[Pair[int, List[pyray.Tuple]]]:
+    """Yield every row of a canvas together with the directions of the rays
+    cast through its pixels onto the wall.
+    """
+    half = WALL_SIZE / 2
+    pixel_size = WALL_SIZE / canvas.width
+
+    for y in range(canvas.height):
+        world_y = half - pixel_size * y
+
+        directions = []
+        for x in range(canvas.width):
+            world_x = -half + pixel_size * x
+            position = pyray.point(world_x, world_y, WALL_Z)
+            directions.append((position - RAY_ORIGIN).normalized())
+
+        yield y, directions
+
+
+def serial_hits(shape: pyray.Sphere,
+                directions: List[pyray.Tuple]) -> Sequence[bool]:
+    """Return whether rays hit a sphere by intersecting one ray at a time."""
+    return [pyray.hit(shape.intersections(pyray.Ray(RAY_ORIGIN, direction)))
+            is not None for direction in directions]
+
+
+def batched_hits(shape: pyray.Sphere,
+                 directions: List[pyray.Tuple]) -> Sequence[bool]:
+    """Return whether rays hit a sphere by intersecting all rays at once."""
+    _, hits = shape.intersect_many([RAY_ORIGIN] * len(directions), directions)
+    return hits
+
 
 class TestSilhouette(TestCanvas):
     """Test case for casting rays at a sphere and drawing the picture to a
@@ -16,28 +57,27 @@ class TestSilhouette(TestCanvas):
     def __init__(self, *args, **kwargs):
         super().__init__('silhouette.ppm', *args, **kwargs)
 
-    def test_silhouette(self):
-        """Test casting rays at a sphere and drawing the picture to a canvas."""
-        ray_origin = pyray.point(0.0, 0.0, -5.0)
-        wall_z = 10.0
-        wall_size = 7.0
-        half = wall_size / 2
-
-        canvas_pixels = 100
-        pixel_size = wall_size / canvas_pixels
-
-        canvas = pyray.Canvas(canvas_pixels, canvas_pixels)
+    def assertSilhouette(self, hits: Hits):
+        # pylint: disable=invalid-name
+        """Assert that drawing the silhouette of a sphere, given a function
+        that tells which rays of a scanline hit it, matches the golden file.
+        """
+        canvas = pyray.Canvas(CANVAS_PIXELS, CANVAS_PIXELS)
         shape = pyray.Sphere()
 
-        for y in range(canvas.height):
-            world_y = half - pixel_size * y
-
-            for x in range(canvas.width):
-                world_x = -half + pixel_size * x
-                position = pyray.point(world_x, world_y, wall_z)
-
-                r = pyray.Ray(ray_origin, (position - ray_origin).normalized())
-                if pyray.hit(shape.intersections(r)):
+        for y, directions in scanlines(canvas):
+            for x, is_hit in enumerate(hits(shape, directions)):
+                if is_hit:
                     canvas[x, y] = pyray.RED
 
         self.assertCanvas(canvas)
+
+    def test_silhouette(self):
+        """Test casting rays at a sphere and drawing the picture to a canvas."""
+        self.assertSilhouette(serial_hits)
+
+    def test_batched_silhouette(self):
+        """Test drawing the silhouette by intersecting a scanline of rays at a
+        time.
+        """
+        self.assertSilhouette(batched_hits)
@@ -0,0 +1,101 @@
+# Copyright (c) 2020-2021 Stefan Holdermans.
+# Licensed under the MIT License.
+
+"""Unit tests for numeric backends."""
+
+import os
+import subprocess
+import sys
+import unittest
+import pyray
+from .test_pyray import TestPyray
+
+
+class TestBackends(TestPyray):
+    """Test case for selecting numeric backends."""
+
+    def setUp(self):
+        self._backend = pyray.get_backend()
+
+    def tearDown(self):
+        pyray.set_backend(self._backend)
+
+    def test_python_backend_is_available(self):
+        """Assert that the pure-Python backend is always available."""
+        self.assertIn("python", pyray.available_backends())
+
+    def test_default_backend(self):
+        """Assert that the pure-Python backend is selected by default, even if
+        NumPy is installed.
+        """
+        env = {key: value for key, value in os.environ.items()
+               if key != "PYRAY_BACKEND"}
+        root = os.path.dirname(os.path.dirname(pyray.__file__))
+        output = subprocess.run(
+            [sys.executable, "-c", "import pyray; print(pyray.get_backend())"],
+            cwd=root, env=env, stdout=subprocess.PIPE, check=True,
+            universal_newlines=True).stdout
+        self.assertEqual("python", output.strip())
+
+    def test_selecting_backend(self):
+        """Test selecting the pure-Python backend."""
+        pyray.set_backend("python")
+        self.assertEqual("python", pyray.get_backend())
+
+    def test_selecting_unknown_backend(self):
+        """Assert that selecting an unknown backend raises `ValueError`."""
+        with self.assertRaises(ValueError):
+            pyray.set_backend("fortran")
+        self.assertEqual(self._backend, pyray.get_backend())
+
+    def test_matrix_arithmetic_across_backends(self):
+        """Assert that all backends agree on matrix arithmetic."""
+        a = [3.0, -9.0, 7.0, 3.0,
+             3.0, -8.0, 2.0, -9.0,
+             -4.0, 4.0, 4.0, 1.0,
+             -6.0, 5.0, -1.0, 1.0]
+        b = [8.0, 2.0, 2.0, 2.0,
+             3.0, -1.0, 7.0, 0.0,
+             7.0, 0.0, 5.0, 4.0,
+             6.0, -2.0, 0.0, 5.0]
+        p = pyray.point(1.0, 2.0, 3.0)
+
+        pyray.set_backend("python")
+        expected = pyray.matrix4x4(a) * pyray.matrix4x4(b)
+
+        for name in pyray.available_backends():
+            with self.subTest(backend=name):
+                pyray.set_backend(name)
+                m = pyray.matrix4x4(a) * pyray.matrix4x4(b)
+                self.assertMatricesAlmostEqual(expected, m)
+                self.assertMatricesAlmostEqual(
+                    pyray.Matrix.identity(4), m * m.inversed())
+                self.assertMatricesAlmostEqual(expected, m.transposed()
+                                               .transposed())
+                self.assertFloatsAlmostEqual(expected.determinant(),
+                                             m.determinant())
+                self.assertTuplesAlmostEqual(expected * p, m * p)
+
+    @unittest.skipIf("numpy" in pyray.available_backends(),
+                     "NumPy is installed")
+    def test_numpy_backend_without_numpy(self):
+        """Assert that selecting the NumPy backend without NumPy installed
+        raises `ImportError`.
+        """
+        with self.assertRaises(ImportError):
+            pyray.set_backend("numpy")
+
+    @unittest.skipUnless("numpy" in pyray.available_backends(),
+                         "NumPy is not installed")
+    def test_noninvertibility_with_numpy(self):
+        """Assert that inverting a noninvertible matrix with the NumPy backend
+        raises `NotInvertibleError`.
+        """
+        pyray.set_backend("numpy")
+        a = pyray.matrix4x4([1.0, 2.0, 3.0, 4.0,
+                             2.0, 4.0, 6.0, 8.0,
+                             0.0, 1.0, 0.0, 1.0,
+                             5.0, 0.0, 2.0, 1.0])
+        self.assertFalse(a.is_invertible())
+        with self.assertRaises(pyray.NotInvertibleError):
+            a.inversed()
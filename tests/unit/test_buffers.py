@@ -0,0 +1,153 @@
+# Copyright (c) 2020-2021 Stefan Holdermans.
+# Licensed under the MIT License.
+
+"""Unit tests for accumulation buffers."""
+
+import math
+import pyray
+from .test_pyray import TestPyray
+
+
+class TestAccumulationBuffers(TestPyray):
+    """Test case for accumulation buffers."""
+
+    def test_creating_buffer(self):
+        """Test creating an accumulation buffer."""
+        b = pyray.AccumulationBuffer(10, 20)
+        self.assertEqual(10, b.width)
+        self.assertEqual(20, b.height)
+        self.assertEqual(600, len(b.buffer))
+        self.assertEqual(pyray.BLACK, b[9, 19])
+
+    def test_adding_colors(self):
+        """Test accumulating weighted colors in a pixel."""
+        b = pyray.AccumulationBuffer(4, 3)
+        b.add(2, 1, pyray.Color(1.0, 2.0, 3.0))
+        b.add(2, 1, pyray.Color(4.0, 4.0, 4.0), 0.5)
+        self.assertColorsAlmostEqual(pyray.Color(3.0, 4.0, 5.0), b[2, 1])
+        self.assertEqual(pyray.BLACK, b[1, 2])
+
+    def test_adding_outside_buffer(self):
+        """Assert that colors cannot be added outside the buffer."""
+        b = pyray.AccumulationBuffer(4, 3)
+        with self.assertRaises(IndexError):
+            b.add(4, 0, pyray.WHITE)
+        with self.assertRaises(IndexError):
+            b.add_block(3, 0, 2, [1.0] * 6)
+
+    def test_adding_blocks(self):
+        """Test accumulating a weighted block of pixels."""
+        b = pyray.AccumulationBuffer(4, 3)
+        block = [0.1, 0.2, 0.3, 0.4, 0.5, 0.6,
+                 0.7, 0.8, 0.9, 1.0, 1.1, 1.2]
+        b.add_block(1, 1, 2, block)
+        b.add_block(1, 1, 2, block, 2.0)
+        self.assertColorsAlmostEqual(pyray.Color(0.3, 0.6, 0.9), b[1, 1])
+        self.assertColorsAlmostEqual(pyray.Color(3.0, 3.3, 3.6), b[2, 2])
+        self.assertEqual(pyray.BLACK, b[0, 1])
+        self.assertEqual(pyray.BLACK, b[3, 2])
+
+    def test_scaling_and_clearing(self):
+        """Test scaling and clearing the intensities of all pixels."""
+        b = pyray.AccumulationBuffer(2, 2)
+        b.add(0, 0, pyray.Color(2.0, 4.0, 6.0))
+        b.add(1, 1, pyray.Color(8.0, 8.0, 8.0))
+        b.scale(0.25)
+        self.assertColorsAlmostEqual(pyray.Color(0.5, 1.0, 1.5), b[0, 0])
+        self.assertColorsAlmostEqual(pyray.Color(2.0, 2.0, 2.0), b[1, 1])
+        b.clear()
+        self.assertEqual([0.0] * 12, list(b.buffer))
+
+    def test_updating_in_place(self):
+        """Assert that adding blocks, scaling, and clearing update the pixel
+        buffer in place.
+        """
+        b = pyray.AccumulationBuffer(3, 5)
+        pixels = b.buffer
+        b.add_block(0, 0, 3, [1.0] * 45, 2.0)
+        b.scale(0.5)
+        self.assertEqual([1.0] * 45, list(b.buffer))
+        b.clear()
+        self.assertIs(pixels, b.buffer)
+        self.assertEqual([0.0] * 45, list(pixels))
+        pyray.AccumulationBuffer(0, 0).clear()
+
+    def test_buffer_as_canvas(self):
+        """Assert that a buffer is a canvas, whose pixels can be set and
+        pasted as those of any canvas.
+        """
+        b = pyray.AccumulationBuffer(4, 3)
+        self.assertIsInstance(b, pyray.Canvas)
+        self.assertFalse(b.compact)
+        b[1, 2] = pyray.Color(1.5, 2.5, 3.5)
+        b.paste(2, 0, 1, [4.0, 5.0, 6.0])
+        b.add(1, 2, pyray.WHITE)
+        self.assertColorsAlmostEqual(pyray.Color(2.5, 3.5, 4.5), b[1, 2])
+        self.assertColorsAlmostEqual(pyray.Color(4.0, 5.0, 6.0), b[2, 0])
+        with self.assertRaises(IndexError):
+            b.paste(3, 0, 2, [1.0] * 6)
+
+
+class TestToneMapping(TestPyray):
+    """Test case for tone-mapping accumulation buffers."""
+
+    def test_tone_mapping_agrees_with_canvas(self):
+        """Assert that, without gamma correction, tone mapping gives the
+        color values of a canvas.
+        """
+        width = 97
+        b = pyray.AccumulationBuffer(width, 2)
+        c = pyray.Canvas(width, 2)
+        for x in range(width):
+            color = pyray.Color(x / 83.0 - 0.1, x / 307.0, 1.0 - x / 89.0)
+            b.add(x, 0, color)
+            b.add(x, 1, color, 4.0)
+            c[x, 0] = color
+            c[x, 1] = color
+        self.assertEqual(c.p6()[:-3 * width], b.canvas().p6()[:-3 * width])
+        self.assertEqual(c.p6()[-3 * width:],
+                         list(b.tone_mapped_rows(exposure=0.25))[1])
+
+    def test_exposure(self):
+        """Test scaling intensities by an exposure while tone mapping."""
+        b = pyray.AccumulationBuffer(2, 1)
+        b.add(0, 0, pyray.Color(2.0, 1.0, -1.0))
+        b.add(1, 0, pyray.Color(8.0, 0.5, 0.2))
+        self.assertEqual([bytes([255, 128, 0, 255, 64, 26])],
+                         list(b.tone_mapped_rows(exposure=0.5)))
+
+    def test_gamma_correction(self):
+        """Test gamma-correcting intensities while tone mapping."""
+        b = pyray.AccumulationBuffer(3, 1)
+        b.add(0, 0, pyray.Color(0.0, 0.2, 1.0))
+        b.add(1, 0, pyray.Color(0.5, 0.04, 1.5))
+        b.add(2, 0, pyray.Color(0.9, 0.02, 0.64))
+        self.assertEqual([bytes([0, 114, 255, 180, 51, 255, 242, 36, 204])],
+                         list(b.tone_mapped_rows(gamma=2.0)))
+
+    def test_non_finite_intensities(self):
+        """Assert that tone mapping maps NaN to 0 and infinities to the
+        extremes.
+        """
+        b = pyray.AccumulationBuffer(1, 1)
+        b.add(0, 0, pyray.Color(math.nan, math.inf, -math.inf))
+        for gamma in None, 2.2:
+            self.assertEqual([bytes([0, 255, 0])],
+                             list(b.tone_mapped_rows(gamma=gamma)))
+
+    def test_invalid_gamma(self):
+        """Assert that gamma must be positive."""
+        b = pyray.AccumulationBuffer(1, 1)
+        with self.assertRaises(ValueError):
+            list(b.tone_mapped_rows(gamma=0.0))
+
+    def test_tone_mapping_onto_canvas(self):
+        """Test tone-mapping a buffer onto a compact canvas."""
+        b = pyray.AccumulationBuffer(2, 2)
+        b.add(1, 0, pyray.Color(1.5, 0.5, 0.0))
+        b.add(0, 1, pyray.Color(0.0, 0.0, 4.0))
+        c = b.canvas(exposure=0.5)
+        self.assertTrue(c.compact)
+        self.assertEqual((2, 2), (c.width, c.height))
+        self.assertEqual(bytes([0, 0, 0, 191, 64, 0, 0, 0, 255, 0, 0, 0]),
+                         bytes(c.buffer))
@@ -0,0 +1,99 @@
+# Copyright (c) 2020-2021 Stefan Holdermans.
+# Licensed under the MIT License.
+
+"""Unit tests for cameras."""
+
+import math
+import pyray
+from .test_pyray import TestPyray
+
+
+class TestCameras(TestPyray):
+    """Test case for cameras."""
+
+    def test_camera(self):
+        """Test constructing a camera."""
+        c = pyray.Camera(160, 120, math.pi / 2.0)
+        self.assertEqual(160, c.hsize)
+        self.assertEqual(120, c.vsize)
+        self.assertFloatsAlmostEqual(math.pi / 2.0, c.field_of_view)
+        self.assertMatricesAlmostEqual(pyray.Matrix.identity(4), c.transform)
+
+    def test_pixel_size_for_horizontal_canvas(self):
+        """Test the pixel size for a horizontal canvas."""
+        c = pyray.Camera(200, 125, math.pi / 2.0)
+        self.assertFloatsAlmostEqual(0.01, c.pixel_size)
+
+    def test_pixel_size_for_vertical_canvas(self):
+        """Test the pixel size for a vertical canvas."""
+        c = pyray.Camera(125, 200, math.pi / 2.0)
+        self.assertFloatsAlmostEqual(0.01, c.pixel_size)
+
+    def test_ray_through_center_of_canvas(self):
+        """Test constructing a ray through the center of the canvas."""
+        c = pyray.Camera(201, 101, math.pi / 2.0)
+        r = c.ray_for_pixel(100, 50)
+        self.assertTuplesAlmostEqual(pyray.point(0.0, 0.0, 0.0), r.origin)
+        self.assertTuplesAlmostEqual(pyray.vector(0.0, 0.0, -1.0),
+                                     r.direction)
+
+    def test_ray_through_corner_of_canvas(self):
+        """Test constructing a ray through a corner of the canvas."""
+        c = pyray.Camera(201, 101, math.pi / 2.0)
+        r = c.ray_for_pixel(0, 0)
+        self.assertTuplesAlmostEqual(pyray.point(0.0, 0.0, 0.0), r.origin)
+        self.assertTuplesAlmostEqual(pyray.vector(0.66519, 0.33259, -0.66851),
+                                     r.direction)
+
+    def test_ray_when_camera_is_transformed(self):
+        """Test constructing a ray when the camera is transformed."""
+        c = pyray.Camera(201, 101, math.pi / 2.0)
+        c.transform = (pyray.rotation_y(math.pi / 4.0)
+                       * pyray.translation(0.0, -2.0, 5.0))
+        r = c.ray_for_pixel(100, 50)
+        self.assertTuplesAlmostEqual(pyray.point(0.0, 2.0, -5.0), r.origin)
+        self.assertTuplesAlmostEqual(
+            pyray.vector(math.sqrt(2.0) / 2.0, 0.0, -math.sqrt(2.0) / 2.0),
+            r.direction)
+
+    def test_directions(self):
+        """Test precomputing the directions of the rays through a tile."""
+        c = pyray.Camera(11, 7, math.pi / 3.0)
+        directions = c.directions((2, 3, 4, 2))
+        self.assertEqual(4 * 4 * 2, len(directions))
+        expected = [component
+                    for py in (3, 4) for px in (2, 3, 4, 5)
+                    for component in c.ray_for_pixel(px, py).direction]
+        self.assertEqual(expected, list(directions))
+
+    def test_directions_of_whole_canvas(self):
+        """Test precomputing the directions of the rays through the whole
+        canvas.
+        """
+        c = pyray.Camera(5, 3, math.pi / 2.0)
+        self.assertEqual(list(c.directions((0, 0, 5, 3))),
+                         list(c.directions()))
+
+    def test_rays(self):
+        """Test generating the rays through a tile from the cached
+        directions.
+        """
+        c = pyray.Camera(5, 3, math.pi / 2.0)
+        c.transform = pyray.translation(1.0, 2.0, 3.0)
+        rays = list(c.rays((1, 1, 2, 2)))
+        self.assertEqual([c.ray_for_pixel(px, py)
+                          for py in (1, 2) for px in (1, 2)], rays)
+
+    def test_directions_cache(self):
+        """Assert that directions are only recomputed after the camera's
+        transformation has changed.
+        """
+        c = pyray.Camera(5, 3, math.pi / 2.0)
+        first = c.directions()
+        self.assertIs(first, c.directions())
+        self.assertEqual(1, c.cache_statistics.recomputations)
+        self.assertEqual(1, c.cache_statistics.hits)
+
+        c.transform = pyray.rotation_y(math.pi / 2.0)
+        self.assertNotEqual(list(first), list(c.directions()))
+        self.assertEqual(2, c.cache_statistics.recomputations)
@@ -3,10 +3,67 @@
 
 """Unit tests for canvases."""
 
+import io
+import math
+import os
+import struct
+import tempfile
+import unittest
+import zlib
 import pyray
 from .test_pyray import TestPyray
 
 
+def decode_png(data: bytes):
+    """Decode a PNG image with 8-bit RGB pixels into its width, height, and
+    color values.
+    """
+    # pylint: disable=too-many-locals
+    assert data[:8] == b"\x89PNG\r\n\x1a\n"
+    chunks = []
+    i = 8
+    while i < len(data):
+        length, = struct.unpack(">I", data[i:i + 4])
+        chunk = data[i + 4:i + 8 + length]
+        crc, = struct.unpack(">I", data[i + 8 + length:i + 12 + length])
+        assert crc == zlib.crc32(chunk)
+        chunks.append((chunk[:4], chunk[4:]))
+        i += 12 + length
+
+    assert chunks[0][0] == b"IHDR" and chunks[-1][0] == b"IEND"
+    width, height, depth, color_type = struct.unpack(">IIBB",
+                                                     chunks[0][1][:10])
+    assert (depth, color_type) == (8, 2)
+
+    raw = zlib.decompress(b"".join(data for chunk_type, data in chunks
+                                   if chunk_type == b"IDAT"))
+    stride = 3 * width
+    previous = bytearray(stride)
+    values = bytearray()
+    for y in range(height):
+        filter_type = raw[y * (stride + 1)]
+        row = bytearray(raw[y * (stride + 1) + 1:(y + 1) * (stride + 1)])
+        for x in range(stride):
+            a = row[x - 3] if x >= 3 else 0
+            b = previous[x]
+            c = previous[x - 3] if x >= 3 else 0
+            if filter_type == 1:
+                row[x] = (row[x] + a) & 0xFF
+            elif filter_type == 2:
+                row[x] = (row[x] + b) & 0xFF
+            elif filter_type == 3:
+                row[x] = (row[x] + (a + b) // 2) & 0xFF
+            elif filter_type == 4:
+                p = a + b - c
+                pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+                predictor = (a if pa <= pb and pa <= pc
+                             else b if pb <= pc else c)
+                row[x] = (row[x] + predictor) & 0xFF
+        values += row
+        previous = row
+    return width, height, bytes(values)
+
+
 class TestCanvasCreation(TestPyray):
     """Test case for canvas creation."""
 
@@ -36,6 +93,54 @@ class TestCanvasCreation(TestPyray):
         c[2, 3] = red
         self.assertEqual(red, c[2, 3])
 
+    def test_writing_pixels_outside_canvas(self):
+        """Assert that writing pixels outside a canvas raises `IndexError`."""
+        c = pyray.Canvas(10, 20)
+        with self.assertRaises(IndexError):
+            c[10, 0] = pyray.RED
+        with self.assertRaises(IndexError):
+            c[0, -1] = pyray.RED
+
+    def test_pixel_buffer(self):
+        """Assert that pixels are stored row by row in the pixel buffer."""
+        c = pyray.Canvas(3, 2)
+        c[1, 1] = pyray.Color(0.25, 0.5, 0.75)
+        self.assertEqual(18, len(c.buffer))
+        self.assertEqual([0.25, 0.5, 0.75], list(c.buffer[12:15]))
+
+    def test_compact_canvas(self):
+        """Test writing pixels to a compact canvas."""
+        c = pyray.Canvas(10, 20, compact=True)
+        self.assertEqual(pyray.BLACK, c[0, 0])
+        c[2, 3] = pyray.Color(1.5, 0.5, -0.5)
+        self.assertEqual([255, 128, 0], list(c.buffer[96:99]))
+        self.assertColorsAlmostEqual(pyray.Color(1.0, 128 / 255, 0.0), c[2, 3])
+
+
+class TestPasting(TestPyray):
+    """Test case for pasting blocks of pixels into canvases."""
+
+    def test_paste(self):
+        """Test pasting a block of pixels into a canvas."""
+        for c in (pyray.Canvas(4, 3), pyray.Canvas(4, 3, compact=True),
+                  pyray.SparseCanvas(4, 3)):
+            with self.subTest(canvas=c):
+                c.paste(1, 1, 2, [1.0, 0.0, 0.0, 0.0, 1.0, 0.0,
+                                  0.0, 0.0, 1.0, 1.0, 1.0, 1.0])
+                self.assertEqual(pyray.RED, c[1, 1])
+                self.assertEqual(pyray.GREEN, c[2, 1])
+                self.assertEqual(pyray.BLUE, c[1, 2])
+                self.assertEqual(pyray.WHITE, c[2, 2])
+                self.assertEqual(pyray.BLACK, c[3, 2])
+
+    def test_paste_outside_canvas(self):
+        """Test that blocks must fit in the canvas."""
+        c = pyray.Canvas(4, 3)
+        with self.assertRaises(IndexError):
+            c.paste(3, 0, 2, [0.0] * 6)
+        with self.assertRaises(IndexError):
+            c.paste(0, 2, 1, [0.0] * 6)
+
 
 class TestCanvasPersistence(TestPyray):
     """Test case for canvas persistence."""
@@ -84,3 +189,328 @@ class TestCanvasPersistence(TestPyray):
         c = pyray.Canvas(5, 3)
         ppm = c.ppm()
         self.assertEqual("", ppm.split("\n")[-1])
+
+    def test_compact_ppm(self):
+        """Assert that compact canvases have the same PPM representation as
+        canvases storing floats.
+        """
+        c = pyray.Canvas(10, 2)
+        d = pyray.Canvas(10, 2, compact=True)
+        for x, y in c:
+            color = pyray.Color(x / 9.0, 0.8, 1.2 - y)
+            c[x, y] = color
+            d[x, y] = color
+        self.assertEqual(c.ppm(), d.ppm())
+
+    def test_ppm_of_non_finite_intensities(self):
+        """Assert that all canvases map NaN and infinite intensities to the
+        same color values.
+        """
+        canvases = [pyray.Canvas(1, 2), pyray.Canvas(1, 2, compact=True),
+                    pyray.SparseCanvas(1, 2)]
+        for c in canvases:
+            with self.subTest(canvas=c):
+                c[0, 0] = pyray.Color(math.nan, 0.5, -math.inf)
+                c.paste(0, 1, 1, [math.inf, math.nan, 0.5])
+                self.assertEqual(["0 128 0", "255 0 128"],
+                                 c.ppm().split("\n")[3:5])
+                self.assertEqual(bytes([0, 128, 0, 255, 0, 128]),
+                                 c.p6()[-6:])
+
+    def test_write_ppm(self):
+        """Test writing the PPM representation of a canvas to a file."""
+        c = pyray.Canvas(40, 3)
+        for x, y in c:
+            c[x, y] = pyray.Color(x / 39.0, 0.1 * y, 0.5)
+        fp = io.StringIO()
+        c.write_ppm(fp)
+        self.assertEqual(c.ppm(), fp.getvalue())
+
+    def test_ppm_rounding(self):
+        """Test rounding intensities halfway between color values in PPM
+        files.
+        """
+        c = pyray.Canvas(171, 1)
+        for x, y in c:
+            c[x, y] = pyray.Color(x / 510, (x + 171) / 510, (x + 342) / 510)
+        samples = [int(sample) for sample in c.ppm().split()[4:]]
+        expected = [round(255 * min(intensity, 1.0))
+                    for x in range(171)
+                    for intensity in (x / 510, (x + 171) / 510,
+                                      (x + 342) / 510)]
+        self.assertEqual(expected, samples)
+
+    def test_p6(self):
+        """Test constructing a binary PPM representation of a canvas."""
+        c = pyray.Canvas(5, 3)
+        c[0, 0] = pyray.Color(1.5, 0.0, 0.0)
+        c[2, 1] = pyray.Color(0.0, 0.5, 0.0)
+        c[4, 2] = pyray.Color(-0.5, 0.0, 1.0)
+        p6 = c.p6()
+        self.assertEqual(b"P6\n5 3\n255\n", p6[:11])
+        self.assertEqual([int(sample) for sample in c.ppm().split()[4:]],
+                         list(p6[11:]))
+
+    def test_write_p6(self):
+        """Test writing the binary PPM representation of a canvas to a file.
+        """
+        c = pyray.Canvas(4, 2, compact=True)
+        for x, y in c:
+            c[x, y] = pyray.Color(x / 3.0, y, 0.25)
+        fp = io.BytesIO()
+        c.write_p6(fp)
+        self.assertEqual(c.p6(), fp.getvalue())
+
+    def test_png(self):
+        """Test constructing PNG representations of a canvas with each filter
+        type.
+        """
+        c = pyray.Canvas(9, 7)
+        for x, y in c:
+            c[x, y] = pyray.Color(x / 8.0, (x * y % 5) / 4.0, 1.1 - y / 6.0)
+        values = c.p6()[11:]
+        for filter_type in "none", "sub", "up", "average", "paeth", "adaptive":
+            with self.subTest(filter_type=filter_type):
+                self.assertEqual((9, 7, values),
+                                 decode_png(c.png(filter_type)))
+
+    def test_write_png(self):
+        """Test writing the PNG representation of a canvas to a file."""
+        c = pyray.Canvas(3, 2)
+        c[1, 1] = pyray.Color(0.2, 0.4, 0.6)
+        fp = io.BytesIO()
+        c.write_png(fp, "up", 9)
+        self.assertEqual(c.png("up", 9), fp.getvalue())
+
+    def test_png_with_unknown_filter_type(self):
+        """Test that PNG filter types must be known."""
+        with self.assertRaises(ValueError):
+            pyray.Canvas(3, 2).png("median")
+
+    def test_png_of_empty_canvas(self):
+        """Test that canvases without pixels have no PNG representation."""
+        with self.assertRaises(ValueError):
+            pyray.Canvas(0, 2).png()
+
+    def test_ppm_of_empty_canvas(self):
+        """Test the PPM representation of a canvas without pixels."""
+        c = pyray.Canvas(0, 2)
+        self.assertEqual("P3\n0 2\n255\n", c.ppm())
+
+
+class TestCanvasLoading(TestPyray):
+    """Test case for reading canvases from PPM files."""
+
+    def setUp(self):
+        # pylint: disable=consider-using-with
+        self._directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self._directory.cleanup)
+
+    def write(self, data: bytes) -> str:
+        """Write data to a temporary file and return its path."""
+        path = os.path.join(self._directory.name, "image.ppm")
+        with open(path, "wb") as file:
+            file.write(data)
+        return path
+
+    def canvas(self) -> pyray.Canvas:
+        """Return a canvas with a gradient."""
+        c = pyray.Canvas(30, 4)
+        for x, y in c:
+            c[x, y] = pyray.Color(x / 29.0, y / 3.0, 1.2 - x / 29.0)
+        return c
+
+    def test_reading_p3(self):
+        """Test reading a canvas from a plain PPM file."""
+        c = self.canvas()
+        d = pyray.Canvas.from_ppm(self.write(c.ppm().encode("ascii")))
+        self.assertEqual((30, 4), (d.width, d.height))
+        self.assertFalse(d.compact)
+        self.assertEqual(c.ppm(), d.ppm())
+        self.assertColorsAlmostEqual(pyray.Color(0.0, 1.0, 1.0), d[0, 3])
+
+    def test_reading_p6(self):
+        """Test reading a canvas from a binary PPM file."""
+        c = self.canvas()
+        d = pyray.Canvas.from_ppm(self.write(c.p6()))
+        self.assertEqual(c.ppm(), d.ppm())
+
+    def test_reading_compact_canvas(self):
+        """Test reading a compact canvas from PPM files."""
+        c = self.canvas()
+        for data in c.ppm().encode("ascii"), c.p6():
+            d = pyray.Canvas.from_ppm(self.write(data), compact=True)
+            self.assertTrue(d.compact)
+            self.assertEqual(c.p6(), d.p6())
+
+    def test_reading_comments(self):
+        """Test reading PPM files with comments in their headers."""
+        path = self.write(b"P3 # a comment\n# another\n2 1\n15\n"
+                          b"15 0 0 0 15 0\n")
+        c = pyray.Canvas.from_ppm(path)
+        self.assertEqual(pyray.RED, c[0, 0])
+        self.assertEqual(pyray.GREEN, c[1, 0])
+
+    def test_reading_wide_samples(self):
+        """Test reading PPM files with two bytes per sample."""
+        path = self.write(b"P6\n1 1\n1000\n\x01\xf4\x03\xe8\x00\x00")
+        c = pyray.Canvas.from_ppm(path)
+        self.assertColorsAlmostEqual(pyray.Color(0.5, 1.0, 0.0), c[0, 0])
+
+    def test_reading_sparse_canvas(self):
+        """Test reading a sparse canvas from a PPM file."""
+        c = pyray.Canvas(30, 4)
+        c[3, 1] = c[17, 2] = pyray.Color(1.0, 0.2, 0.0)
+        d = pyray.SparseCanvas.from_ppm(self.write(c.p6()))
+        self.assertIsInstance(d, pyray.SparseCanvas)
+        self.assertEqual(c.ppm(), d.ppm())
+        e = pyray.SparseCanvas.from_ppm(self.write(c.ppm().encode("ascii")),
+                                        background=pyray.BLUE)
+        self.assertEqual(pyray.BLACK, e[0, 0])
+        self.assertEqual(c.ppm(), e.ppm())
+
+    def test_reading_malformed_files(self):
+        """Test that reading malformed PPM files fails."""
+        for data in (b"P5\n1 1\n255\n\x00", b"P3\n1 1\n", b"P3\n1 x\n255\n",
+                     b"P3\n1 1\n255\n0 0\n", b"P3\n1 1\n255\n0 0 256\n",
+                     b"P3\n1 1\n255\n0 0 -1\n", b"P3\n1 1\n255\n0 0 0 0\n",
+                     b"P3\n1 1\n65535\n0 0 70000\n", b"P3\n1 1\n255\n0 0 x\n",
+                     b"P6\n1 1\n255\n\x00\x00"):
+            with self.subTest(data=data):
+                with self.assertRaises(ValueError):
+                    pyray.Canvas.from_ppm(self.write(data))
+
+
+@unittest.skipIf(pyray.canvases.shared_memory is None,
+                 "shared memory is not supported")
+class TestSharedCanvases(TestPyray):
+    """Test case for canvases in shared memory."""
+
+    def test_attach(self):
+        """Test that pixels written through an attached canvas show up in the
+        canvas that created the shared memory.
+        """
+        with pyray.SharedCanvas.create(4, 3) as c:
+            with pyray.SharedCanvas.attach(c.name, 4, 3) as d:
+                d[2, 1] = pyray.Color(0.25, 0.5, 0.75)
+                d.paste(0, 2, 1, [1.0, 0.0, 0.0])
+            self.assertEqual(pyray.Color(0.25, 0.5, 0.75), c[2, 1])
+            self.assertEqual(pyray.RED, c[0, 2])
+            self.assertEqual(pyray.BLACK, c[3, 0])
+
+    def test_compact_shared_canvas(self):
+        """Test sharing a compact canvas."""
+        with pyray.SharedCanvas.create(4, 3, compact=True) as c:
+            with pyray.SharedCanvas.attach(c.name, 4, 3, compact=True) as d:
+                d[1, 1] = pyray.WHITE
+            self.assertEqual(pyray.WHITE, c[1, 1])
+
+    def test_shared_ppm(self):
+        """Assert that a shared canvas has the same PPM representation as a
+        canvas with the same pixels.
+        """
+        c = pyray.Canvas(10, 2)
+        with pyray.SharedCanvas.create(10, 2) as d:
+            for x, y in c:
+                color = pyray.Color(x / 9.0, 0.8, 1.2 - y)
+                c[x, y] = color
+                d[x, y] = color
+            self.assertEqual(c.ppm(), d.ppm())
+            self.assertEqual(c.p6(), d.p6())
+
+    def test_copy(self):
+        """Test copying a shared canvas into an ordinary canvas."""
+        with pyray.SharedCanvas.create(3, 2) as c:
+            c[1, 1] = pyray.GREEN
+            d = c.copy()
+        self.assertIs(pyray.Canvas, type(d))
+        self.assertEqual((3, 2), (d.width, d.height))
+        self.assertEqual(pyray.GREEN, d[1, 1])
+        d[0, 0] = pyray.RED
+        self.assertEqual(pyray.RED, d[0, 0])
+
+    def test_unlink(self):
+        """Test that shared memory is freed when the creating canvas exits."""
+        with pyray.SharedCanvas.create(3, 2) as c:
+            name = c.name
+        with self.assertRaises(FileNotFoundError):
+            pyray.SharedCanvas.attach(name, 3, 2)
+
+    def test_unlink_after_failed_close(self):
+        """Test that shared memory is freed when the creating canvas exits,
+        even if it cannot be closed.
+        """
+        with self.assertRaises(BufferError):
+            with pyray.SharedCanvas.create(3, 2) as c:
+                name = c.name
+                view = c.buffer[:3]
+        view.release()
+        with self.assertRaises(FileNotFoundError):
+            pyray.SharedCanvas.attach(name, 3, 2)
+
+    def test_attach_too_large(self):
+        """Test that attached canvases must fit in the shared memory."""
+        with pyray.SharedCanvas.create(3, 2) as c:
+            with self.assertRaises(ValueError):
+                pyray.SharedCanvas.attach(c.name, 30, 20)
+
+
+class TestSparseCanvases(TestPyray):
+    """Test case for sparse canvases."""
+
+    def test_background(self):
+        """Assert that unwritten pixels of a sparse canvas have the background
+        color.
+        """
+        c = pyray.SparseCanvas(10, 20, pyray.BLUE)
+        self.assertEqual(pyray.BLUE, c[3, 4])
+        c[3, 4] = pyray.RED
+        self.assertEqual(pyray.RED, c[3, 4])
+        self.assertEqual(pyray.BLUE, c[4, 3])
+
+    def test_writing_pixels_outside_sparse_canvas(self):
+        """Assert that writing pixels outside a sparse canvas raises
+        `IndexError`.
+        """
+        c = pyray.SparseCanvas(10, 20)
+        with self.assertRaises(IndexError):
+            c[0, 20] = pyray.RED
+
+    def test_sparse_canvas_positions(self):
+        """Test the positions of a sparse canvas."""
+        c = pyray.SparseCanvas(10, 20)
+        self.assertEqual([(x, y) for x in range(10) for y in range(20)],
+                         list(c))
+
+    def test_sparse_canvas_storage(self):
+        """Assert that a sparse canvas only stores the pixels written to it."""
+        # pylint: disable=protected-access
+        c = pyray.SparseCanvas(3000, 2000, pyray.BLUE)
+        c[1, 1] = pyray.Color(1.0, 0.5, 0.0)
+        c[2, 1] = pyray.RED
+        self.assertEqual({1: {1: pyray.Color(1.0, 0.5, 0.0), 2: pyray.RED}},
+                         c._rows)
+        self.assertNotIsInstance(c, pyray.Canvas)
+
+    def test_sparse_ppm(self):
+        """Assert that a sparse canvas has the same PPM representation as a
+        canvas with the same pixels.
+        """
+        background = pyray.Color(0.2, 0.4, 0.6)
+        c = pyray.Canvas(40, 6)
+        for x, y in c:
+            c[x, y] = background
+        d = pyray.SparseCanvas(40, 6, background)
+        for x, y in [(0, 0), (39, 0), (17, 2), (18, 2), (5, 5)]:
+            color = pyray.Color(x / 39.0, 1.0, 0.0)
+            c[x, y] = color
+            d[x, y] = color
+        self.assertEqual(c.ppm(), d.ppm())
+        self.assertEqual(c.p6(), d.p6())
+        self.assertEqual(c.png(), d.png())
+
+    def test_sparse_buffer(self):
+        """Assert that sparse canvases have no pixel buffer."""
+        c = pyray.SparseCanvas(3, 2)
+        with self.assertRaises(AttributeError):
+            _ = c.buffer
@@ -3,6 +3,7 @@
 
 """Unit tests for colors."""
 
+import pickle
 import pyray
 from .test_pyray import TestPyray
 
@@ -37,6 +38,39 @@ class TestColors(TestPyray):
         """Test the color white."""
         self.assertEqual(pyray.Color(1.0, 1.0, 1.0), pyray.WHITE)
 
+    def test_color_immutability(self):
+        """Assert that the components of a color cannot be changed."""
+        c = pyray.Color(-0.5, 0.4, 1.7)
+        with self.assertRaises(AttributeError):
+            c.red = 0.0
+
+    def test_color_hashability(self):
+        """Assert that equal colors have equal hashes."""
+        colors = {pyray.Color(1.0, 0.0, 0.0), pyray.RED, pyray.BLACK}
+        self.assertEqual(2, len(colors))
+
+    def test_color_pickling(self):
+        """Assert that colors survive pickling."""
+        c = pickle.loads(pickle.dumps(pyray.Color(-0.5, 0.4, 1.7)))
+        self.assertIsInstance(c, pyray.Color)
+        self.assertEqual(pyray.Color(-0.5, 0.4, 1.7), c)
+
+    def test_color_as_built_in_tuple(self):
+        """Assert that colors equal built-in tuples of their components, but
+        are neither ordered nor concatenated.
+        """
+        c = pyray.Color(0.9, 0.6, 0.75)
+        self.assertEqual((0.9, 0.6, 0.75), c)
+        self.assertEqual(hash((0.9, 0.6, 0.75)), hash(c))
+        with self.assertRaises(TypeError):
+            _ = c < pyray.WHITE
+        with self.assertRaises(TypeError):
+            _ = c <= (1.0, 1.0, 1.0)
+        with self.assertRaises(TypeError):
+            _ = c + (0.1, 0.1, 0.1)
+        with self.assertRaises(TypeError):
+            _ = (0.1, 0.1, 0.1) + c
+
 
 class TestColorOperations(TestPyray):
     """Test case for color operations."""
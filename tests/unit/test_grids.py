@@ -0,0 +1,102 @@
+# Copyright (c) 2020-2021 Stefan Holdermans.
+# Licensed under the MIT License.
+
+"""Unit tests for uniform grids."""
+
+import random
+import pyray
+from .test_hierarchies import random_rays
+from .test_pyray import TestPyray
+
+
+def particles(n: int) -> list:
+    """Return small spheres scattered through a cube."""
+    rng = random.Random(5)
+    spheres = []
+    for _ in range(n):
+        sphere = pyray.Sphere()
+        radius = rng.uniform(0.2, 0.6)
+        sphere.scale(radius, radius, radius)
+        sphere.translate(rng.uniform(-8.0, 8.0), rng.uniform(-8.0, 8.0),
+                         rng.uniform(-8.0, 8.0))
+        spheres.append(sphere)
+    return spheres
+
+
+class TestUniformGrids(TestPyray):
+    """Test case for uniform grids."""
+
+    def test_empty_grid(self):
+        """Test a grid without spheres."""
+        grid = pyray.UniformGrid([])
+        self.assertEqual(0, len(grid))
+        r = pyray.Ray(pyray.point(0.0, 0.0, -5.0), pyray.vector(0.0, 0.0, 1.0))
+        self.assertIsNone(grid.hit(r))
+
+    def test_automatic_resolution(self):
+        """Test that the resolution grows with the number of spheres."""
+        self.assertEqual((1, 1, 1), pyray.UniformGrid(particles(1)).resolution)
+        nx, ny, nz = pyray.UniformGrid(particles(500)).resolution
+        self.assertTrue(500 <= nx * ny * nz <= 2000)
+
+    def test_explicit_resolution(self):
+        """Test giving the resolution of a grid."""
+        grid = pyray.UniformGrid(particles(10), resolution=(2, 3, 4))
+        self.assertEqual((2, 3, 4), grid.resolution)
+        with self.assertRaises(ValueError):
+            pyray.UniformGrid(particles(10), resolution=(2, 0, 4))
+
+    def test_hit(self):
+        """Assert that grids identify the same hits as `hit` does for the
+        intersections with every sphere.
+        """
+        spheres = particles(200)
+        grid = pyray.UniformGrid(spheres)
+        self.assertHitsAsIntersections(grid, spheres,
+                                       random_rays(200, 12.0, 13))
+
+    def test_axis_aligned_rays(self):
+        """Test rays with zero direction components, from outside and inside
+        the grid.
+        """
+        spheres = particles(100)
+        grid = pyray.UniformGrid(spheres)
+        table = pyray.SphereTable(spheres)
+        for x in range(-8, 9, 2):
+            for z in -20.0, 0.0:
+                origin = pyray.point(float(x), 0.5 * x, z)
+                direction = pyray.vector(0.0, 0.0, 1.0)
+                index, t = table.nearest(origin, direction)
+                grid_index, grid_t = grid.nearest(origin, direction)
+                self.assertEqual(index, grid_index)
+                self.assertFloatsAlmostEqual(t, grid_t)
+
+    def test_rays_missing_grid(self):
+        """Test rays that pass by the grid."""
+        grid = pyray.UniformGrid(particles(20))
+        for origin, direction in [
+                (pyray.point(0.0, 20.0, -20.0), pyray.vector(0.0, 0.0, 1.0)),
+                (pyray.point(0.0, 0.0, -20.0), pyray.vector(0.0, 0.0, -1.0)),
+                (pyray.point(30.0, 0.0, 0.0), pyray.vector(1.0, 1.0, 0.0))]:
+            self.assertEqual(-1, grid.nearest(origin, direction)[0])
+
+    def test_equally_distant_hits(self):
+        """Assert that of spheres hit at the same distance the first one is
+        taken.
+        """
+        spheres = [pyray.Sphere() for _ in range(5)]
+        grid = pyray.UniformGrid(spheres)
+        r = pyray.Ray(pyray.point(0.0, 0.0, -5.0), pyray.vector(0.0, 0.0, 1.0))
+        self.assertIs(spheres[0], grid.hit(r).object)
+
+    def test_rebuild_after_transformation(self):
+        """Assert that a grid picks up changed sphere transformations by
+        itself, even beyond its original bounds.
+        """
+        spheres = particles(20)
+        grid = pyray.UniformGrid(spheres)
+        spheres[5].translate(0.0, 0.0, 100.0)
+        lower, upper = spheres[5].bounds()
+        center = (lower + upper) / 2.0
+        r = pyray.Ray(center, pyray.vector(0.0, 0.0, 1.0))
+        self.assertIs(spheres[5], grid.hit(r).object)
@@ -0,0 +1,113 @@
+# Copyright (c) 2020-2021 Stefan Holdermans.
+# Licensed under the MIT License.
+
+"""Unit tests for bounding volume hierarchies."""
+
+import random
+from typing import List
+import pyray
+from .test_pyray import TestPyray
+
+
+def scattered_spheres(n: int) -> list:
+    """Return ellipsoids scattered through a cube."""
+    rng = random.Random(7)
+    spheres = []
+    for _ in range(n):
+        sphere = pyray.Sphere()
+        radius = rng.uniform(0.2, 1.0)
+        sphere.scale(radius, radius * rng.uniform(0.5, 2.0), radius)
+        sphere.rotate_z(rng.uniform(0.0, 3.0))
+        sphere.translate(rng.uniform(-10.0, 10.0), rng.uniform(-10.0, 10.0),
+                         rng.uniform(-10.0, 10.0))
+        spheres.append(sphere)
+    return spheres
+
+
+def random_rays(n: int, extent: float, seed: int) -> List[pyray.Ray]:
+    """Return rays from random points in a cube of a given half extent around
+    the origin in random directions.
+    """
+    rng = random.Random(seed)
+    rays = []
+    for _ in range(n):
+        origin = pyray.point(rng.uniform(-extent, extent),
+                             rng.uniform(-extent, extent),
+                             rng.uniform(-extent, extent))
+        direction = pyray.vector(rng.uniform(-1.0, 1.0),
+                                 rng.uniform(-1.0, 1.0),
+                                 rng.uniform(-1.0, 1.0)).normalized()
+        rays.append(pyray.Ray(origin, direction))
+    return rays
+
+
+class TestBoundingVolumeHierarchies(TestPyray):
+    """Test case for bounding volume hierarchies."""
+
+    def test_empty_hierarchy(self):
+        """Test a hierarchy without spheres."""
+        bvh = pyray.BoundingVolumeHierarchy([])
+        self.assertEqual(0, len(bvh))
+        r = pyray.Ray(pyray.point(0.0, 0.0, -5.0), pyray.vector(0.0, 0.0, 1.0))
+        self.assertIsNone(bvh.hit(r))
+
+    def test_hierarchy_is_split(self):
+        """Test that hierarchies over many spheres have inner nodes."""
+        bvh = pyray.BoundingVolumeHierarchy(scattered_spheres(100))
+        self.assertEqual(100, len(bvh))
+        self.assertGreater(bvh.node_count, 100 // 4)
+
+    def test_hit(self):
+        """Assert that hierarchies identify the same hits as `hit` does for
+        the intersections with every sphere.
+        """
+        spheres = scattered_spheres(200)
+        bvh = pyray.BoundingVolumeHierarchy(spheres, leaf_size=2)
+        self.assertHitsAsIntersections(bvh, spheres,
+                                       random_rays(200, 15.0, 11))
+
+    def test_axis_aligned_rays(self):
+        """Test rays with zero direction components."""
+        spheres = scattered_spheres(50)
+        bvh = pyray.BoundingVolumeHierarchy(spheres)
+        table = pyray.SphereTable(spheres)
+        for x in range(-10, 11, 2):
+            for y in range(-10, 11, 2):
+                origin = pyray.point(float(x), float(y), -20.0)
+                direction = pyray.vector(0.0, 0.0, 1.0)
+                index, t = table.nearest(origin, direction)
+                bvh_index, bvh_t = bvh.nearest(origin, direction)
+                self.assertEqual(index, bvh_index)
+                self.assertFloatsAlmostEqual(t, bvh_t)
+
+    def test_equally_distant_hits(self):
+        """Assert that of spheres hit at the same distance the first one is
+        taken.
+        """
+        spheres = [pyray.Sphere() for _ in range(10)]
+        bvh = pyray.BoundingVolumeHierarchy(spheres, leaf_size=1)
+        r = pyray.Ray(pyray.point(0.0, 0.0, -5.0), pyray.vector(0.0, 0.0, 1.0))
+        self.assertIs(spheres[0], bvh.hit(r).object)
+
+    def test_ray_originating_inside_sphere(self):
+        """Test a ray originating inside a sphere in the hierarchy."""
+        spheres = scattered_spheres(20)
+        bvh = pyray.BoundingVolumeHierarchy(spheres)
+        lower, upper = spheres[3].bounds()
+        center = (lower + upper) / 2.0
+        r = pyray.Ray(center, pyray.vector(0.0, 1.0, 0.0))
+        expected = pyray.hit([i for sphere in spheres
+                              for i in sphere.intersections(r)])
+        self.assertIs(expected.object, bvh.hit(r).object)
+
+    def test_rebuild_after_transformation(self):
+        """Assert that a hierarchy picks up changed sphere transformations by
+        itself.
+        """
+        spheres = scattered_spheres(20)
+        bvh = pyray.BoundingVolumeHierarchy(spheres)
+        spheres[5].translate(0.0, 0.0, 100.0)
+        lower, upper = spheres[5].bounds()
+        center = (lower + upper) / 2.0
+        r = pyray.Ray(center, pyray.vector(0.0, 0.0, 1.0))
+        self.assertIs(spheres[5], bvh.hit(r).object)
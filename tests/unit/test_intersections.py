@@ -65,3 +65,73 @@ class TestIntersections(TestPyray):
         xs = pyray.intersections(i1, i2, i3, i4)
         i = pyray.hit(xs)
         self.assertEqual(i4, i)
+
+    def test_hit_prefers_first_of_equal_intersections(self):
+        """Assert that of equally distant intersections the first is the hit."""
+        s1 = pyray.Sphere()
+        s2 = pyray.Sphere()
+        i1 = pyray.Intersection(2.0, s1)
+        i2 = pyray.Intersection(2.0, s2)
+        xs = pyray.intersections(i1, i2)
+        self.assertIs(i1, pyray.hit(xs))
+
+
+class TestIntersectionCollector(TestPyray):
+    """Test cases for collecting intersections with several objects."""
+
+    def test_empty_collector(self):
+        """Assert that an empty collector has no hit and no intersections."""
+        collector = pyray.IntersectionCollector()
+        self.assertIsNone(collector.hit)
+        self.assertEqual(0, len(collector))
+        self.assertEqual([], list(collector))
+
+    def test_collecting_intersections(self):
+        """Assert that a collector tracks the hit among all added
+        intersections.
+        """
+        s1 = pyray.Sphere()
+        s2 = pyray.Sphere()
+        collector = pyray.IntersectionCollector()
+        collector.add([pyray.Intersection(-1.0, s1),
+                       pyray.Intersection(5.0, s1)])
+        self.assertEqual(pyray.Intersection(5.0, s1), collector.hit)
+        collector.add([pyray.Intersection(3.0, s2),
+                       pyray.Intersection(4.0, s2)])
+        self.assertEqual(pyray.Intersection(3.0, s2), collector.hit)
+        self.assertEqual(4, len(collector))
+
+    def test_collector_agrees_with_hit(self):
+        """Assert that a collector identifies the same hit as `hit`."""
+        s1 = pyray.Sphere()
+        s2 = pyray.Sphere()
+        groups = [[pyray.Intersection(7.0, s1), pyray.Intersection(2.0, s1)],
+                  [pyray.Intersection(-3.0, s2), pyray.Intersection(2.0, s2)]]
+        collector = pyray.IntersectionCollector()
+        for xs in groups:
+            collector.add(xs)
+        self.assertIs(pyray.hit(xs for group in groups for xs in group),
+                      collector.hit)
+        self.assertIs(groups[0][1], collector.hit)
+
+    def test_iterating_over_collected_intersections(self):
+        """Assert that a collector yields its intersections sorted by
+        distance.
+        """
+        s1 = pyray.Sphere()
+        s2 = pyray.Sphere()
+        collector = pyray.IntersectionCollector()
+        collector.add([pyray.Intersection(6.0, s1),
+                       pyray.Intersection(1.0, s1)])
+        collector.add([pyray.Intersection(-2.0, s2),
+                       pyray.Intersection(4.0, s2)])
+        ts = [i.t for i in collector]
+        self.assertEqual([-2.0, 1.0, 4.0, 6.0], ts)
+
+    def test_collecting_no_intersections(self):
+        """Assert that adding a ray that misses leaves the collector empty."""
+        collector = pyray.IntersectionCollector()
+        collector.add(pyray.Sphere().intersections(
+            pyray.Ray(pyray.point(0, 2, -5), pyray.vector(0, 0, 1))))
+        self.assertIsNone(collector.hit)
+        self.assertEqual(0, len(collector))
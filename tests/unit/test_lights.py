@@ -17,3 +17,77 @@ class TestLights(TestPyray):
         light = pyray.PointLight(position, intensity)
         self.assertEqual(position, light.position)
         self.assertEqual(intensity, light.intensity)
+
+    def test_point_light_has_no_radius_by_default(self):
+        """Assert that a point light reaches everywhere by default."""
+        light = pyray.PointLight(pyray.point(0.0, 0.0, 0.0), pyray.WHITE)
+        self.assertIsNone(light.radius)
+        self.assertEqual(1.0, light.attenuation(1e9))
+
+    def test_attenuation(self):
+        """Test the falloff of a light with a radius of influence."""
+        light = pyray.PointLight(pyray.point(0.0, 0.0, 0.0), pyray.WHITE, 2.0)
+        self.assertEqual(1.0, light.attenuation(0.0))
+        self.assertFloatsAlmostEqual(0.5625, light.attenuation(1.0))
+        self.assertEqual(0.0, light.attenuation(2.0))
+        self.assertEqual(0.0, light.attenuation(3.0))
+
+    def test_radius_must_be_positive(self):
+        """Assert that a light cannot have a radius of zero or less."""
+        with self.assertRaises(ValueError):
+            pyray.PointLight(pyray.point(0.0, 0.0, 0.0), pyray.WHITE, 0.0)
+
+
+class TestLightIndices(TestPyray):
+    """Test case for spatial indices over lights."""
+
+    @staticmethod
+    def _lights():
+        lights = [pyray.PointLight(pyray.point(0.0, 10.0, 0.0), pyray.WHITE)]
+        for i in range(5):
+            for j in range(5):
+                lights.append(pyray.PointLight(
+                    pyray.point(2.0 * i, 0.0, 2.0 * j), pyray.WHITE,
+                    1.0 + 0.25 * i))
+        return lights
+
+    def test_lights_at_agrees_with_brute_force(self):
+        """Assert that an index yields exactly the lights that reach a point.
+        """
+        lights = self._lights()
+        index = pyray.LightIndex(lights)
+        for x in range(-2, 12):
+            for z in range(-2, 12):
+                p = pyray.point(x * 0.75, 0.5, z * 0.75)
+                expected = [i for i, light in enumerate(lights)
+                            if light.attenuation((light.position - p)
+                                                 .magnitude()) > 0.0]
+                self.assertEqual(expected, list(index.lights_at(p)))
+
+    def test_culling_statistics(self):
+        """Test counting the lights evaluated and culled."""
+        statistics = pyray.CullingStatistics()
+        index = pyray.LightIndex(self._lights(), statistics)
+        self.assertIs(statistics, index.culling_statistics)
+        self.assertEqual([0, 1], list(index.lights_at(
+            pyray.point(0.0, 0.0, 0.0))))
+        self.assertEqual(2, statistics.evaluated)
+        self.assertEqual(24, statistics.culled)
+        statistics.reset()
+        self.assertEqual(0, statistics.evaluated)
+        self.assertEqual(0, statistics.culled)
+
+    def test_index_without_radii(self):
+        """Assert that lights without a radius are never culled."""
+        light = pyray.PointLight(pyray.point(0.0, 0.0, 0.0), pyray.WHITE)
+        index = pyray.LightIndex([light, light])
+        self.assertEqual([0, 1], list(index.lights_at(
+            pyray.point(1e6, 0.0, 0.0))))
+        self.assertEqual(2, index.culling_statistics.evaluated)
+        self.assertEqual(0, index.culling_statistics.culled)
+
+    def test_empty_index(self):
+        """Test looking up lights in an empty index."""
+        index = pyray.LightIndex([])
+        self.assertEqual(0, len(index))
+        self.assertEqual([], list(index.lights_at(pyray.point(0.0, 0.0, 0.0))))
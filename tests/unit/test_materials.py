@@ -75,3 +75,107 @@ class TestLighting(TestPyray):
         light = pyray.PointLight(pyray.point(0.0, 0.0, 10.0), pyray.WHITE)
         result = self._material.lighting(light, self._position, eyev, normalv)
         self.assertColorsAlmostEqual(pyray.Color(0.1, 0.1, 0.1), result)
+
+    def test_lighting_with_surface_in_shadow(self):
+        """Test lighting with the surface in shadow."""
+        eyev = pyray.vector(0.0, 0.0, -1.0)
+        normalv = pyray.vector(0.0, 0.0, -1.0)
+        light = pyray.PointLight(pyray.point(0.0, 0.0, -10.0), pyray.WHITE)
+        result = self._material.lighting(light, self._position, eyev, normalv,
+                                         True)
+        self.assertColorsAlmostEqual(pyray.Color(0.1, 0.1, 0.1), result)
+
+    def test_lighting_with_attenuated_light(self):
+        """Test lighting with a light that has a radius of influence."""
+        eyev = pyray.vector(0.0, 0.0, -1.0)
+        normalv = pyray.vector(0.0, 0.0, -1.0)
+        light = pyray.PointLight(pyray.point(0.0, 0.0, -10.0), pyray.WHITE,
+                                 20.0)
+        result = self._material.lighting(light, self._position, eyev, normalv)
+        self.assertColorsAlmostEqual(pyray.Color(1.06875, 1.06875, 1.06875),
+                                     result)
+
+    def test_lighting_beyond_radius_of_light(self):
+        """Test lighting with a light that does not reach the surface."""
+        eyev = pyray.vector(0.0, 0.0, -1.0)
+        normalv = pyray.vector(0.0, 0.0, -1.0)
+        light = pyray.PointLight(pyray.point(0.0, 0.0, -10.0), pyray.WHITE,
+                                 10.0)
+        result = self._material.lighting(light, self._position, eyev, normalv)
+        self.assertEqual(pyray.BLACK, result)
+
+
+class TestBatchedLighting(TestPyray):
+    """Test case for lighting batches of points."""
+
+    def setUp(self):
+        self._backend = pyray.get_backend()
+
+    def tearDown(self):
+        pyray.set_backend(self._backend)
+
+    def test_lighting_many_agrees_with_lighting(self):
+        """Assert that lighting a batch of points gives the same colors as
+        lighting every point on its own.
+        """
+        m = pyray.Material(color=pyray.Color(1.0, 0.2, 1.0), shininess=10.0)
+        s = math.sqrt(2.0) / 2.0
+        points = [pyray.point(0.0, 0.0, 0.0)] * 5
+        eyevs = [pyray.vector(0.0, 0.0, -1.0), pyray.vector(0.0, s, -s),
+                 pyray.vector(0.0, -s, -s), pyray.vector(0.0, 0.0, -1.0),
+                 pyray.vector(0.0, 0.0, -1.0)]
+        normalvs = [pyray.vector(0.0, 0.0, -1.0)] * 3 + [
+            pyray.vector(0.0, 0.0, 1.0), pyray.vector(0.0, 0.0, -1.0)]
+        in_shadow = [False, False, False, False, True]
+
+        for radius in None, 20.0:
+            light = pyray.PointLight(pyray.point(0.0, 10.0, -10.0),
+                                     pyray.Color(1.0, 0.9, 0.8), radius)
+            for name in pyray.available_backends():
+                with self.subTest(backend=name, radius=radius):
+                    pyray.set_backend(name)
+                    intensities = m.lighting_many(light, points, eyevs,
+                                                  normalvs, in_shadow)
+                    self.assertEqual(15, len(intensities))
+                    for i, args in enumerate(zip(points, eyevs, normalvs,
+                                                 in_shadow)):
+                        expected = m.lighting(light, *args)
+                        self.assertColorsAlmostEqual(
+                            expected,
+                            pyray.Color(*intensities[3 * i:3 * i + 3]))
+
+    def test_lighting_many_without_shadows(self):
+        """Assert that points are lit if no shadow flags are given."""
+        m = pyray.Material()
+        light = pyray.PointLight(pyray.point(0.0, 0.0, -10.0), pyray.WHITE)
+        intensities = m.lighting_many(light, [pyray.point(0.0, 0.0, 0.0)],
+                                      [pyray.vector(0.0, 0.0, -1.0)],
+                                      [pyray.vector(0.0, 0.0, -1.0)])
+        self.assertColorsAlmostEqual(pyray.Color(1.9, 1.9, 1.9),
+                                     pyray.Color(*intensities))
+
+    def test_lighting_many_from_generators(self):
+        """Assert that a batch of points may be given by generators."""
+        m = pyray.Material()
+        light = pyray.PointLight(pyray.point(0.0, 0.0, -10.0), pyray.WHITE)
+        for name in pyray.available_backends():
+            with self.subTest(backend=name):
+                pyray.set_backend(name)
+                intensities = m.lighting_many(
+                    light, (pyray.point(0.0, 0.0, 0.0) for _ in range(2)),
+                    (pyray.vector(0.0, 0.0, -1.0) for _ in range(2)),
+                    (pyray.vector(0.0, 0.0, -1.0) for _ in range(2)),
+                    (shadowed for shadowed in (False, True)))
+                self.assertColorsAlmostEqual(pyray.Color(1.9, 1.9, 1.9),
+                                             pyray.Color(*intensities[:3]))
+                self.assertColorsAlmostEqual(pyray.Color(0.1, 0.1, 0.1),
+                                             pyray.Color(*intensities[3:]))
+
+    def test_lighting_empty_batch(self):
+        """Test lighting an empty batch of points."""
+        light = pyray.PointLight(pyray.point(0.0, 0.0, -10.0), pyray.WHITE)
+        for name in pyray.available_backends():
+            with self.subTest(backend=name):
+                pyray.set_backend(name)
+                self.assertEqual(
+                    0, len(pyray.Material().lighting_many(light, [], [], [])))
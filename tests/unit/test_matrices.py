@@ -3,6 +3,8 @@
 
 """Unit tests for matrices."""
 
+import pickle
+import unittest
 import pyray
 from .test_pyray import TestPyray
 
@@ -219,6 +221,26 @@ class TestMatrixInversion(TestPyray):
                              0.0, 0.0, 0.0, 0.0])
         self.assertFalse(a.is_invertible())
 
+    def test_nearly_singular_matrix(self):
+        """Assert that a singular matrix whose determinant is off zero by a
+        rounding error is not invertible, whatever the backend.
+        """
+        backend = pyray.get_backend()
+        try:
+            for name in pyray.available_backends():
+                with self.subTest(backend=name):
+                    pyray.set_backend(name)
+                    a = pyray.matrix4x4([float(i) for i in range(1, 17)])
+                    self.assertFalse(a.is_invertible())
+                    with self.assertRaises(pyray.NotInvertibleError):
+                        a.inversed()
+                    b = pyray.Matrix(5, [float(i) for i in range(1, 26)])
+                    self.assertFalse(b.is_invertible())
+                    with self.assertRaises(pyray.NotInvertibleError):
+                        b.inversed()
+        finally:
+            pyray.set_backend(backend)
+
     def test_inverse_1(self):
         """Test calculating the inverse of a matrix."""
         a = pyray.matrix4x4([-5.0, 2.0, 6.0, -8.0,
@@ -270,3 +292,165 @@ class TestMatrixInversion(TestPyray):
                              6.0, -2.0, 0.0, 5.0])
         c = a * b
         self.assertMatricesAlmostEqual(a, c * b.inversed())
+
+
+class TestLUDecomposition(TestPyray):
+    """Test case for LU decompositions."""
+
+    def test_factorisation(self):
+        """Assert that the product of the lower and upper triangular matrices
+        equals the permuted matrix.
+        """
+        a = pyray.matrix4x4([-2.0, -8.0, 3.0, 5.0,
+                             -3.0, 1.0, 7.0, 3.0,
+                             1.0, 2.0, -9.0, 6.0,
+                             -6.0, 7.0, 7.0, -9.0])
+        lu = a.lu()
+        p = lu.permutation
+        permuted = pyray.matrix4x4([a[p[row], col] for row, col in a])
+        self.assertMatricesAlmostEqual(permuted, lu.lower * lu.upper)
+
+    def test_determinant(self):
+        """Test calculating the determinant of a 4x4 matrix from its LU
+        decomposition.
+        """
+        a = pyray.matrix4x4([-2.0, -8.0, 3.0, 5.0,
+                             -3.0, 1.0, 7.0, 3.0,
+                             1.0, 2.0, -9.0, 6.0,
+                             -6.0, 7.0, 7.0, -9.0])
+        self.assertFloatsAlmostEqual(-4071.0, a.lu().determinant())
+
+    def test_singularity(self):
+        """Test decomposing a noninvertible matrix."""
+        a = pyray.matrix4x4([-4.0, 2.0, -2.0, -3.0,
+                             9.0, 6.0, 2.0, 6.0,
+                             0.0, -5.0, 1.0, -5.0,
+                             0.0, 0.0, 0.0, 0.0])
+        lu = a.lu()
+        self.assertTrue(lu.is_singular())
+        self.assertEqual(0.0, lu.determinant())
+        with self.assertRaises(pyray.NotInvertibleError):
+            lu.solve([1.0, 2.0, 3.0, 4.0])
+        with self.assertRaises(pyray.NotInvertibleError):
+            a.inversed()
+
+    def test_solve(self):
+        """Test solving a linear system."""
+        a = pyray.matrix3x3([2.0, 1.0, -1.0,
+                             -3.0, -1.0, 2.0,
+                             -2.0, 1.0, 2.0])
+        x = a.lu().solve([8.0, -11.0, -3.0])
+        self.assertEqual(3, len(x))
+        self.assertFloatsAlmostEqual(2.0, x[0])
+        self.assertFloatsAlmostEqual(3.0, x[1])
+        self.assertFloatsAlmostEqual(-1.0, x[2])
+
+    def test_solve_with_wrong_length(self):
+        """Assert that solving a linear system requires a right-hand side with
+        as many elements as the matrix has rows.
+        """
+        a = pyray.Matrix.identity(3)
+        with self.assertRaises(ValueError):
+            a.lu().solve([1.0, 2.0])
+
+    def test_inverse_of_5x5_matrix(self):
+        """Test calculating the inverse of a matrix of order 5."""
+        a = pyray.Matrix(5, [2.0, 0.0, 1.0, 0.0, 3.0,
+                             1.0, 4.0, 0.0, 2.0, 0.0,
+                             0.0, 1.0, 3.0, 0.0, 1.0,
+                             5.0, 0.0, 0.0, 1.0, 2.0,
+                             0.0, 2.0, 1.0, 1.0, 4.0])
+        self.assertMatricesAlmostEqual(pyray.Matrix.identity(5),
+                                       a * a.inversed())
+
+
+class TestMatrixSpecialisations(TestPyray):
+    """Test case for the unrolled specialisations of fixed-order matrices."""
+
+    def setUp(self):
+        self._backend = pyray.get_backend()
+        pyray.set_backend("python")
+
+    def tearDown(self):
+        pyray.set_backend(self._backend)
+
+    def test_specialised_construction(self):
+        """Assert that matrices of order 2, 3, and 4 are specialised."""
+        self.assertIsInstance(pyray.matrix2x2([0.0] * 4), pyray.Matrix2)
+        self.assertIsInstance(pyray.matrix3x3([0.0] * 9), pyray.Matrix3)
+        self.assertIsInstance(pyray.matrix4x4([0.0] * 16), pyray.Matrix4)
+        self.assertIsInstance(pyray.Matrix.identity(4), pyray.Matrix4)
+        self.assertIsInstance(pyray.translation(1.0, 2.0, 3.0), pyray.Matrix4)
+        self.assertNotIsInstance(pyray.Matrix(5), pyray.Matrix4)
+
+    @unittest.skipUnless("numpy" in pyray.available_backends(),
+                         "NumPy is not installed")
+    def test_specialised_construction_with_numpy(self):
+        """Assert that matrices of order 2, 3, and 4 are specialised with the
+        NumPy backend too.
+        """
+        pyray.set_backend("numpy")
+        a = pyray.matrix4x4([-5.0, 2.0, 6.0, -8.0,
+                             1.0, -5.0, 1.0, 8.0,
+                             7.0, 7.0, -6.0, -7.0,
+                             1.0, -3.0, 7.0, 4.0])
+        self.assertIs(pyray.Matrix4, type(a))
+        self.assertIs(pyray.Matrix4, type(pyray.Matrix.identity(4)))
+        self.assertIs(pyray.Matrix4, type(a * a))
+        self.assertIs(pyray.Matrix4, type(a.inversed()))
+        self.assertIs(pyray.Matrix3, type(a.submatrix(0, 0)))
+        self.assertIs(pyray.Matrix2, type(pyray.matrix2x2([0.0] * 4)))
+        self.assertNotIsInstance(pyray.Matrix(5), pyray.Matrix4)
+
+    def test_specialised_results(self):
+        """Assert that operations on specialised matrices yield specialised
+        matrices.
+        """
+        a = pyray.rotation_z(0.5)
+        self.assertIsInstance(a * a, pyray.Matrix4)
+        self.assertIsInstance(a.transposed(), pyray.Matrix4)
+        self.assertIsInstance(a.inversed(), pyray.Matrix4)
+        self.assertIsInstance(a.submatrix(0, 0), pyray.Matrix3)
+
+    def test_index_out_of_range(self):
+        """Assert that indexing outside of a 4x4 matrix raises `IndexError`."""
+        a = pyray.Matrix.identity(4)
+        with self.assertRaises(IndexError):
+            _ = a[4, 0]
+        with self.assertRaises(IndexError):
+            _ = a[0, -1]
+
+    def test_inverse_of_2x2_matrix(self):
+        """Test calculating the inverse of a 2x2 matrix."""
+        a = pyray.matrix2x2([4.0, 7.0,
+                             2.0, 6.0])
+        self.assertMatricesAlmostEqual(pyray.matrix2x2([0.6, -0.7,
+                                                        -0.2, 0.4]),
+                                       a.inversed())
+
+    def test_inverse_of_3x3_matrix(self):
+        """Test calculating the inverse of a 3x3 matrix."""
+        a = pyray.matrix3x3([1.0, 2.0, 6.0,
+                             -5.0, 8.0, -4.0,
+                             2.0, 6.0, 4.0])
+        self.assertMatricesAlmostEqual(pyray.Matrix.identity(3),
+                                       a * a.inversed())
+        self.assertMatricesAlmostEqual(a.lu().inversed(), a.inversed())
+
+    def test_noninvertible_3x3_matrix(self):
+        """Assert that inverting a noninvertible 3x3 matrix raises
+        `NotInvertibleError`.
+        """
+        a = pyray.matrix3x3([1.0, 2.0, 3.0,
+                             2.0, 4.0, 6.0,
+                             0.0, 1.0, 1.0])
+        self.assertFalse(a.is_invertible())
+        with self.assertRaises(pyray.NotInvertibleError):
+            a.inversed()
+
+    def test_pickling(self):
+        """Assert that specialised matrices survive pickling."""
+        a = pyray.rotation_y(0.25)
+        b = pickle.loads(pickle.dumps(a))
+        self.assertIsInstance(b, pyray.Matrix4)
+        self.assertEqual(a, b)
@@ -3,6 +3,7 @@
 
 """Unit-test utilities."""
 
+from typing import Iterable, List
 import unittest
 import pyray
 
@@ -45,3 +46,24 @@ class TestPyray(unittest.TestCase):
         self.assertEqual(first.order, second.order)
         for row, col in first:
             self.assertFloatsAlmostEqual(first[row, col], second[row, col])
+
+    def assertHitsAsIntersections(self, index, spheres: List[pyray.Sphere],
+                                  rays: Iterable[pyray.Ray]):
+        # pylint: disable=invalid-name
+        """Assert that a structure over spheres, such as a bounding volume
+        hierarchy, identifies the same hits for some rays as `hit` does for
+        the intersections of the rays with every sphere, and that some of the
+        rays hit.
+        """
+        hits = 0
+        for ray in rays:
+            expected = pyray.hit([i for sphere in spheres
+                                  for i in sphere.intersections(ray)])
+            i = index.hit(ray)
+            if expected is None:
+                self.assertIsNone(i)
+                continue
+            hits += 1
+            self.assertIs(expected.object, i.object)
+            self.assertFloatsAlmostEqual(expected.t, i.t)
+        self.assertGreater(hits, 0)
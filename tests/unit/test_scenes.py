@@ -0,0 +1,327 @@
+# Copyright (c) 2020-2021 Stefan Holdermans.
+# Licensed under the MIT License.
+
+"""Unit tests for scenes and rendering."""
+
+import asyncio
+import math
+import pyray
+from .test_pyray import TestPyray
+
+
+def default_scene() -> pyray.Scene:
+    """Return a scene with two spheres lit by two lights."""
+    s1 = pyray.Sphere()
+    s1.material.color = pyray.Color(1.0, 0.2, 1.0)
+    s2 = pyray.Sphere()
+    s2.scale(0.5, 0.5, 0.5)
+    s2.translate(1.0, 1.0, -1.0)
+    s2.material.color = pyray.Color(0.2, 1.0, 0.3)
+    lights = [
+        pyray.PointLight(pyray.point(-10.0, 10.0, -10.0), pyray.WHITE),
+        pyray.PointLight(pyray.point(10.0, 5.0, -10.0),
+                         pyray.Color(0.3, 0.3, 0.3)),
+    ]
+    return pyray.Scene([s1, s2], lights)
+
+
+class TestScenes(TestPyray):
+    """Test case for scenes."""
+
+    def test_ray_for_pixel(self):
+        """Test constructing the ray through a pixel."""
+        scene = pyray.Scene()
+        r = scene.ray_for_pixel(50, 50, 100, 100)
+        self.assertTuplesAlmostEqual(pyray.point(0.0, 0.0, -5.0), r.origin)
+        self.assertTuplesAlmostEqual(pyray.vector(0.0, 0.0, 1.0), r.direction)
+
+    def test_ray_for_pixel_on_non_square_canvas(self):
+        """Test that the ray through the centre of a non-square canvas passes
+        through the centre of the wall.
+        """
+        scene = pyray.Scene()
+        for width, height in ((200, 100), (100, 200)):
+            r = scene.ray_for_pixel(width // 2, height // 2, width, height)
+            self.assertTuplesAlmostEqual(pyray.vector(0.0, 0.0, 1.0),
+                                         r.direction)
+
+    def test_color_when_ray_misses(self):
+        """Test the color when a ray misses all spheres."""
+        scene = default_scene()
+        r = pyray.Ray(pyray.point(0.0, 0.0, -5.0), pyray.vector(0.0, 1.0, 0.0))
+        self.assertEqual(pyray.BLACK, scene.color_at(r))
+
+    def test_color_when_ray_hits(self):
+        """Test the color when a ray hits a sphere."""
+        light = pyray.PointLight(pyray.point(0.0, 0.0, -10.0), pyray.WHITE)
+        scene = pyray.Scene([pyray.Sphere()], [light])
+        r = pyray.Ray(pyray.point(0.0, 0.0, -5.0), pyray.vector(0.0, 0.0, 1.0))
+        self.assertColorsAlmostEqual(pyray.Color(1.9, 1.9, 1.9),
+                                     scene.color_at(r))
+
+    def test_color_with_several_lights(self):
+        """Test that the colors contributed by all lights are added."""
+        light = pyray.PointLight(pyray.point(0.0, 0.0, -10.0), pyray.WHITE)
+        scene = pyray.Scene([pyray.Sphere()], [light, light])
+        r = pyray.Ray(pyray.point(0.0, 0.0, -5.0), pyray.vector(0.0, 0.0, 1.0))
+        self.assertColorsAlmostEqual(pyray.Color(3.8, 3.8, 3.8),
+                                     scene.color_at(r))
+
+    def test_stopping_tile(self):
+        """Assert that tracing a tile stops at the first row after its stop
+        flag has been set.
+        """
+        scene = default_scene()
+        rows = iter([False, False, True])
+        intensities = scene.render_tile((3, 2, 4, 5), 11, 11,
+                                        lambda: next(rows))
+        self.assertEqual(scene.render_tile((3, 2, 4, 2), 11, 11),
+                         intensities)
+        self.assertEqual(0, len(scene.render_tile((3, 2, 4, 5), 11, 11,
+                                                  lambda: True)))
+
+    def test_color_in_shadow(self):
+        """Test the color when the hit is in the shadow of another sphere."""
+        light = pyray.PointLight(pyray.point(0.0, 0.0, -10.0), pyray.WHITE)
+        s1 = pyray.Sphere()
+        s2 = pyray.Sphere()
+        s2.translate(0.0, 0.0, 10.0)
+        scene = pyray.Scene([s1, s2], [light])
+        r = pyray.Ray(pyray.point(0.0, 0.0, 5.0), pyray.vector(0.0, 0.0, 1.0))
+        self.assertColorsAlmostEqual(pyray.Color(0.1, 0.1, 0.1),
+                                     scene.color_at(r))
+        self.assertColorsAlmostEqual(pyray.Color(0.1, 0.1, 0.1),
+                                     scene.color_at(r, scene.shadow_tester()))
+
+    def test_shadow_tester_is_kept(self):
+        """Assert that the shadow tester of a scene is kept between rays and
+        replaced when the scene changes.
+        """
+        light = pyray.PointLight(pyray.point(0.0, 0.0, -10.0), pyray.WHITE)
+        scene = pyray.Scene([pyray.Sphere()], [light])
+        shadows = scene.shadow_tester()
+        r = pyray.Ray(pyray.point(0.0, 0.0, -5.0), pyray.vector(0.0, 0.0, 1.0))
+        scene.color_at(r)
+        self.assertIs(shadows, scene.shadow_tester())
+
+        blocker = pyray.Sphere()
+        blocker.translate(0.0, 0.0, -3.0)
+        scene.spheres.append(blocker)
+        self.assertIsNot(shadows, scene.shadow_tester())
+        self.assertColorsAlmostEqual(pyray.Color(0.1, 0.1, 0.1),
+                                     scene.color_at(pyray.Ray(
+                                         pyray.point(0.0, 5.0, 0.0),
+                                         pyray.vector(0.0, -1.0, 0.0))))
+
+    def test_color_with_culled_light(self):
+        """Test that lights that do not reach the hit are culled."""
+        near = pyray.PointLight(pyray.point(0.0, 0.0, -10.0), pyray.WHITE)
+        far = pyray.PointLight(pyray.point(0.0, 0.0, -100.0), pyray.WHITE,
+                               10.0)
+        scene = pyray.Scene([pyray.Sphere()], [near, far])
+        r = pyray.Ray(pyray.point(0.0, 0.0, -5.0), pyray.vector(0.0, 0.0, 1.0))
+        self.assertColorsAlmostEqual(pyray.Color(1.9, 1.9, 1.9),
+                                     scene.color_at(r))
+        self.assertEqual(1, scene.culling_statistics.evaluated)
+        self.assertEqual(1, scene.culling_statistics.culled)
+
+    def test_light_index_is_kept(self):
+        """Assert that the light index of a scene is kept between rays and
+        replaced when a light is moved.
+        """
+        light = pyray.PointLight(pyray.point(0.0, 0.0, -10.0), pyray.WHITE)
+        scene = pyray.Scene([pyray.Sphere()], [light])
+        lights = scene.light_index()
+        r = pyray.Ray(pyray.point(0.0, 0.0, -5.0), pyray.vector(0.0, 0.0, 1.0))
+        scene.color_at(r)
+        self.assertIs(lights, scene.light_index())
+        light.position = pyray.point(0.0, 0.0, 10.0)
+        self.assertIsNot(lights, scene.light_index())
+
+    def test_tiles(self):
+        """Test splitting a canvas into tiles."""
+        self.assertEqual([(0, 0, 4, 4), (4, 0, 1, 4), (0, 4, 4, 2),
+                          (4, 4, 1, 2)],
+                         list(pyray.scenes.tiles(5, 6, 4)))
+
+
+class TestRendering(TestPyray):
+    """Test case for rendering scenes."""
+
+    def serial_render(self, scene: pyray.Scene, width: int,
+                      height: int) -> pyray.Canvas:
+        """Render a scene pixel by pixel."""
+        canvas = pyray.Canvas(width, height)
+        for y in range(height):
+            for x in range(width):
+                r = scene.ray_for_pixel(x, y, width, height)
+                canvas[x, y] = scene.color_at(r)
+        return canvas
+
+    def test_render_in_calling_process(self):
+        """Test rendering a scene with a single worker."""
+        scene = default_scene()
+        expected = self.serial_render(scene, 23, 17).ppm()
+        for tile_size in 1, 5, 32:
+            with self.subTest(tile_size=tile_size):
+                canvas = pyray.render(scene, 23, 17, workers=1,
+                                      tile_size=tile_size)
+                self.assertEqual(expected, canvas.ppm())
+
+    def test_render_in_worker_processes(self):
+        """Test that rendering a scene in several worker processes gives the
+        same result as rendering it serially.
+        """
+        scene = default_scene()
+        expected = self.serial_render(scene, 23, 17).ppm()
+        canvas = pyray.render(scene, 23, 17, workers=2, tile_size=6)
+        self.assertEqual(expected, canvas.ppm())
+
+    def test_render_reports_culled_lights(self):
+        """Assert that rendering counts the lights culled in the frame, no
+        matter how many workers trace it.
+        """
+        scene = default_scene()
+        scene.lights.append(pyray.PointLight(pyray.point(0.0, 0.0, -4.0),
+                                             pyray.RED, 3.5))
+        expected = self.serial_render(scene, 23, 17).ppm()
+        counts = []
+        for workers in 1, 2:
+            with self.subTest(workers=workers):
+                canvas = pyray.render(scene, 23, 17, workers=workers,
+                                      tile_size=6)
+                self.assertEqual(expected, canvas.ppm())
+                statistics = scene.culling_statistics
+                self.assertGreater(statistics.culled, 0)
+                counts.append((statistics.evaluated, statistics.culled))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_render_through_camera(self):
+        """Test rendering a scene through a camera, serially and in worker
+        processes, and rendering it again from the cached ray directions.
+        """
+        scene = default_scene()
+        scene.camera = pyray.Camera(21, 13, math.pi / 3.0,
+                                    pyray.view_transform(
+                                        pyray.point(0.0, 1.5, -5.0),
+                                        pyray.point(0.0, 0.0, 0.0),
+                                        pyray.vector(0.0, 1.0, 0.0)))
+        expected = self.serial_render(scene, 21, 13).ppm()
+        self.assertEqual(expected,
+                         pyray.render(scene, 21, 13, workers=1).ppm())
+        self.assertEqual(1, scene.camera.cache_statistics.recomputations)
+        self.assertEqual(
+            expected,
+            pyray.render(scene, 21, 13, workers=2, tile_size=21).ppm())
+        self.assertEqual(1, scene.camera.cache_statistics.recomputations)
+        self.assertEqual(1, scene.camera.cache_statistics.hits)
+
+    def test_render_with_invalid_arguments(self):
+        """Test that rendering requires at least one worker and nonempty
+        tiles.
+        """
+        with self.assertRaises(ValueError):
+            pyray.render(pyray.Scene(), 4, 4, workers=0)
+        with self.assertRaises(ValueError):
+            pyray.render(pyray.Scene(), 4, 4, tile_size=0)
+        scene = pyray.Scene(camera=pyray.Camera(4, 4, math.pi / 2.0))
+        with self.assertRaises(ValueError):
+            pyray.render(scene, 4, 5, workers=1)
+
+
+class TestProgressiveRendering(TestPyray):
+    """Test case for rendering scenes progressively."""
+
+    def test_passes(self):
+        """Test that every pass yields a canvas and that the last one is the
+        complete image.
+        """
+        scene = default_scene()
+        canvases = list(pyray.render_progressive(scene, 23, 17))
+        self.assertEqual(4, len(canvases))
+        self.assertEqual(pyray.render(scene, 23, 17, workers=1).ppm(),
+                         canvases[-1].ppm())
+
+    def test_gaps_are_filled(self):
+        """Test that the pixels between traced pixels repeat the traced pixel
+        at the top-left corner of their block.
+        """
+        scene = default_scene()
+        first = next(pyray.render_progressive(scene, 23, 17, steps=(4, 1)))
+        for x, y in first:
+            self.assertEqual(
+                scene.color_at(scene.ray_for_pixel(x - x % 4, y - y % 4, 23,
+                                                   17)),
+                first[x, y])
+
+    def test_time_budget(self):
+        """Test that rendering stops once the time budget is exhausted, but
+        only after the first pass.
+        """
+        scene = default_scene()
+        canvases = list(pyray.render_progressive(scene, 23, 17,
+                                                 time_budget=0.0))
+        self.assertEqual(1, len(canvases))
+        self.assertEqual(pyray.render(scene, 23, 17, workers=1)[8, 8],
+                         canvases[0][9, 10])
+
+    def test_invalid_steps(self):
+        """Test that steps must be positive."""
+        with self.assertRaises(ValueError):
+            next(pyray.render_progressive(pyray.Scene(), 4, 4, steps=()))
+        with self.assertRaises(ValueError):
+            next(pyray.render_progressive(pyray.Scene(), 4, 4, steps=(2, 0)))
+
+
+class TestAsynchronousRendering(TestPyray):
+    """Test case for rendering scenes asynchronously."""
+
+    def collect(self, workers: int):
+        """Render the default scene asynchronously and return the canvas
+        into which the tiles were pasted and the tiles.
+        """
+        canvas = pyray.Canvas(23, 17)
+
+        async def collect():
+            return [tile async for tile in pyray.render_async(
+                default_scene(), 23, 17, workers=workers, tile_size=8,
+                canvas=canvas)]
+
+        return canvas, asyncio.run(collect())
+
+    def test_render_async(self):
+        """Test rendering a scene asynchronously in a thread."""
+        canvas, tiles = self.collect(1)
+        self.assertEqual(pyray.render(default_scene(), 23, 17,
+                                      workers=1).ppm(), canvas.ppm())
+        self.assertEqual(sorted(pyray.scenes.tiles(23, 17, 8)),
+                         sorted(tile.tile for tile in tiles))
+        self.assertEqual(list(range(1, 10)),
+                         [tile.completed for tile in tiles])
+        self.assertEqual(1.0, tiles[-1].progress)
+
+    def test_render_async_in_worker_processes(self):
+        """Test rendering a scene asynchronously in worker processes."""
+        canvas, tiles = self.collect(2)
+        self.assertEqual(pyray.render(default_scene(), 23, 17,
+                                      workers=1).ppm(), canvas.ppm())
+        self.assertEqual(9, len(tiles))
+
+    def test_cancellation(self):
+        """Test that cancelling an asynchronous render stops it, leaving the
+        remaining tiles untraced.
+        """
+        received = []
+
+        async def consume():
+            async for tile in pyray.render_async(default_scene(), 23, 17,
+                                                 workers=1, tile_size=2):
+                received.append(tile)
+                if len(received) == 3:
+                    asyncio.current_task().cancel()
+
+        with self.assertRaises(asyncio.CancelledError):
+            asyncio.run(consume())
+        # Tiles that finished together with the third may still be yielded.
+        self.assertLessEqual(len(received), 3 + 2)
+        self.assertEqual(108, received[0].total)
@@ -0,0 +1,69 @@
+# Copyright (c) 2020-2021 Stefan Holdermans.
+# Licensed under the MIT License.
+
+"""Unit tests for shadows."""
+
+import pyray
+from .test_pyray import TestPyray
+
+
+class TestShadows(TestPyray):
+    """Test case for testing shadows."""
+
+    def setUp(self):
+        s1 = pyray.Sphere()
+        s2 = pyray.Sphere()
+        s2.scale(0.5, 0.5, 0.5)
+        light = pyray.PointLight(pyray.point(-10.0, 10.0, -10.0), pyray.WHITE)
+        self._shadows = pyray.ShadowTester([s1, s2], [light])
+
+    def test_no_shadow_when_nothing_is_collinear(self):
+        """Test that there is no shadow when nothing is collinear with the
+        point and the light.
+        """
+        p = pyray.point(0.0, 10.0, 0.0)
+        self.assertFalse(self._shadows.is_shadowed(p, 0))
+
+    def test_shadow_when_object_is_between_point_and_light(self):
+        """Test that there is a shadow when an object is between the point and
+        the light.
+        """
+        p = pyray.point(10.0, -10.0, 10.0)
+        self.assertTrue(self._shadows.is_shadowed(p, 0))
+
+    def test_no_shadow_when_object_is_behind_light(self):
+        """Test that there is no shadow when an object is behind the light."""
+        p = pyray.point(-20.0, 20.0, -20.0)
+        self.assertFalse(self._shadows.is_shadowed(p, 0))
+
+    def test_no_shadow_when_object_is_behind_point(self):
+        """Test that there is no shadow when an object is behind the point."""
+        p = pyray.point(-2.0, 2.0, -2.0)
+        self.assertFalse(self._shadows.is_shadowed(p, 0))
+
+    def test_last_occluder_is_tested_first(self):
+        """Assert that the sphere that last cast a shadow is reused."""
+        statistics = self._shadows.cache_statistics
+        self._shadows.is_shadowed(pyray.point(10.0, -10.0, 10.0), 0)
+        self.assertEqual(0, statistics.hits)
+        self.assertEqual(1, statistics.recomputations)
+        self._shadows.is_shadowed(pyray.point(10.0, -10.1, 10.0), 0)
+        self.assertEqual(1, statistics.hits)
+        self.assertEqual(1, statistics.recomputations)
+        self.assertFalse(
+            self._shadows.is_shadowed(pyray.point(0.0, 10.0, 0.0), 0))
+        self.assertEqual(1, statistics.hits)
+        self.assertEqual(2, statistics.recomputations)
+
+    def test_shadows_follow_transformed_spheres(self):
+        """Assert that a tester picks up changed sphere transformations by
+        itself, also for the sphere that last cast a shadow.
+        """
+        s = pyray.Sphere()
+        light = pyray.PointLight(pyray.point(-10.0, 10.0, -10.0), pyray.WHITE)
+        shadows = pyray.ShadowTester([s], [light])
+        p = pyray.point(10.0, -10.0, 10.0)
+        self.assertTrue(shadows.is_shadowed(p, 0))
+        s.translate(0.0, 5.0, 0.0)
+        self.assertFalse(shadows.is_shadowed(p, 0))
+        self.assertTrue(shadows.is_shadowed(pyray.point(10.0, 0.0, 10.0), 0))
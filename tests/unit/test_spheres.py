@@ -162,3 +162,300 @@ class TestSpheres(TestPyray):
         m.ambient = 1.0
         s.material = m
         self.assertEqual(m, s.material)
+
+
+class TestSphereBounds(TestPyray):
+    """Test case for the bounding boxes of spheres."""
+
+    def test_bounds(self):
+        """Test the bounding box of a sphere."""
+        s = pyray.Sphere()
+        lower, upper = s.bounds()
+        self.assertTuplesAlmostEqual(pyray.point(-1.0, -1.0, -1.0), lower)
+        self.assertTuplesAlmostEqual(pyray.point(1.0, 1.0, 1.0), upper)
+
+    def test_bounds_of_transformed_sphere(self):
+        """Test the bounding box of a scaled, rotated, and translated sphere.
+        """
+        s = pyray.Sphere()
+        s.scale(2.0, 1.0, 1.0)
+        s.rotate_z(math.pi / 2.0)
+        s.translate(1.0, 2.0, 3.0)
+        lower, upper = s.bounds()
+        self.assertTuplesAlmostEqual(pyray.point(0.0, 0.0, 2.0), lower)
+        self.assertTuplesAlmostEqual(pyray.point(2.0, 4.0, 4.0), upper)
+
+
+class TestSphereTransformCache(TestPyray):
+    """Test case for caching a sphere's inversed and normal transformation
+    matrices.
+    """
+
+    def test_inverse_transform(self):
+        """Test the inversed transformation matrix of a sphere."""
+        s = pyray.Sphere()
+        s.scale(2.0, 4.0, 8.0)
+        self.assertMatricesAlmostEqual(s.transform.inversed(),
+                                       s.inverse_transform)
+
+    def test_normal_transform(self):
+        """Test the normal transformation matrix of a sphere."""
+        s = pyray.Sphere()
+        s.shear(x=(1.0, 0.0))
+        self.assertMatricesAlmostEqual(s.transform.inversed().transposed(),
+                                       s.normal_transform)
+
+    def test_inverse_transform_is_cached(self):
+        """Assert that the inversed transformation matrix is computed once as
+        long as the sphere's transformation does not change.
+        """
+        s = pyray.Sphere()
+        s.translate(1.0, 2.0, 3.0)
+        first = s.inverse_transform
+        second = s.inverse_transform
+        _ = s.normal_transform
+        self.assertIs(first, second)
+        self.assertEqual(1, s.cache_statistics.recomputations)
+        self.assertEqual(2, s.cache_statistics.hits)
+
+    def test_cache_invalidation(self):
+        """Assert that changing a sphere's transformation invalidates the
+        cached matrices.
+        """
+        s = pyray.Sphere()
+        _ = s.inverse_transform
+        s.rotate_y(math.pi / 2.0)
+        self.assertMatricesAlmostEqual(pyray.rotation_y(-math.pi / 2.0),
+                                       s.inverse_transform)
+        self.assertEqual(2, s.cache_statistics.recomputations)
+
+    def test_changing_transform_copy(self):
+        """Assert that changing a copy of a sphere's transformation matrix
+        neither transforms the sphere nor invalidates the cached matrices.
+        """
+        s = pyray.Sphere()
+        s.translate(1.0, 2.0, 3.0)
+        _ = s.inverse_transform
+        s.transform[0, 3] = 5.0
+        self.assertMatricesAlmostEqual(pyray.translation(1.0, 2.0, 3.0),
+                                       s.transform)
+        self.assertMatricesAlmostEqual(pyray.translation(-1.0, -2.0, -3.0),
+                                       s.inverse_transform)
+        self.assertEqual(1, s.cache_statistics.recomputations)
+
+    def test_intersections_reuse_cache(self):
+        """Assert that intersecting multiple rays with a sphere reuses the
+        cached inversed transformation matrix.
+        """
+        s = pyray.Sphere()
+        s.scale(2.0, 2.0, 2.0)
+        for y in range(3):
+            r = pyray.Ray(pyray.point(0.0, float(y), -5.0),
+                          pyray.vector(0.0, 0.0, 1.0))
+            s.intersections(r)
+        self.assertEqual(1, s.cache_statistics.recomputations)
+        self.assertEqual(2, s.cache_statistics.hits)
+
+
+class TestBatchedSphereIntersections(TestPyray):
+    """Test case for intersecting batches of rays with a sphere."""
+
+    def setUp(self):
+        self._backend = pyray.get_backend()
+
+    def tearDown(self):
+        pyray.set_backend(self._backend)
+
+    def test_intersect_many(self):
+        """Assert that intersecting a batch of rays agrees with intersecting
+        the rays one by one.
+        """
+        s = pyray.Sphere()
+        s.scale(1.0, 0.5, 2.0)
+        s.translate(0.5, 0.0, 0.0)
+        rays = [pyray.Ray(pyray.point(0.0, 0.0, -5.0),
+                          pyray.vector(0.0, 0.0, 1.0)),
+                pyray.Ray(pyray.point(0.0, 2.0, -5.0),
+                          pyray.vector(0.0, 0.0, 1.0)),
+                pyray.Ray(pyray.point(0.5, 0.0, 0.0),
+                          pyray.vector(0.0, 1.0, 0.0)),
+                pyray.Ray(pyray.point(0.0, 0.0, 5.0),
+                          pyray.vector(0.0, 0.0, 1.0)),
+                pyray.Ray(pyray.point(-3.0, 0.1, -3.0),
+                          pyray.vector(1.0, 0.0, 1.0).normalized())]
+        origins = [r.origin for r in rays]
+        directions = [r.direction for r in rays]
+
+        for name in pyray.available_backends():
+            with self.subTest(backend=name):
+                pyray.set_backend(name)
+                ts, hits = s.intersect_many(origins, directions)
+                self.assertEqual(len(rays), len(ts))
+                for r, t, is_hit in zip(rays, ts, hits):
+                    i = pyray.hit(s.intersections(r))
+                    self.assertEqual(i is not None, bool(is_hit))
+                    if i is None:
+                        self.assertEqual(math.inf, t)
+                    else:
+                        self.assertFloatsAlmostEqual(i.t, t)
+
+    def test_intersect_many_from_generators(self):
+        """Assert that a batch of rays may be given by generators."""
+        s = pyray.Sphere()
+        for name in pyray.available_backends():
+            with self.subTest(backend=name):
+                pyray.set_backend(name)
+                ts, hits = s.intersect_many(
+                    (pyray.point(0.0, y, -5.0) for y in (0.0, 2.0)),
+                    (pyray.vector(0.0, 0.0, 1.0) for _ in range(2)))
+                self.assertEqual([4.0, math.inf], list(ts))
+                self.assertEqual([True, False], [bool(hit) for hit in hits])
+
+    def test_intersect_none(self):
+        """Test intersecting an empty batch of rays with a sphere."""
+        ts, hits = pyray.Sphere().intersect_many([], [])
+        self.assertEqual(0, len(ts))
+        self.assertEqual(0, len(hits))
+
+
+class TestSphereTables(TestPyray):
+    """Test case for intersecting rays with tables of spheres."""
+
+    def setUp(self):
+        self._backend = pyray.get_backend()
+
+    def tearDown(self):
+        pyray.set_backend(self._backend)
+
+    @staticmethod
+    def _spheres():
+        spheres = []
+        for i in range(5):
+            s = pyray.Sphere()
+            s.scale(0.5 + 0.1 * i, 0.5, 0.5)
+            s.translate(0.0, 0.0, 2.0 * i - 3.0)
+            spheres.append(s)
+        return spheres
+
+    def test_hit_agrees_with_brute_force(self):
+        """Assert that a sphere table identifies the same hit as `hit` over
+        the intersections with all spheres.
+        """
+        spheres = self._spheres()
+        rays = [pyray.Ray(pyray.point(0.0, 0.0, -10.0),
+                          pyray.vector(0.0, 0.0, 1.0)),
+                pyray.Ray(pyray.point(0.0, 0.0, 0.0),
+                          pyray.vector(0.0, 0.0, 1.0)),
+                pyray.Ray(pyray.point(0.0, 0.0, 10.0),
+                          pyray.vector(0.0, 0.0, 1.0)),
+                pyray.Ray(pyray.point(0.0, 5.0, 0.0),
+                          pyray.vector(0.0, 0.0, 1.0)),
+                pyray.Ray(pyray.point(0.0, 0.0, 3.0),
+                          pyray.vector(0.0, 0.0, -1.0))]
+
+        for name in pyray.available_backends():
+            with self.subTest(backend=name):
+                pyray.set_backend(name)
+                table = pyray.SphereTable(spheres)
+                for r in rays:
+                    xs = [i for s in spheres for i in s.intersections(r)]
+                    expected = pyray.hit(xs)
+                    i = table.hit(r)
+                    if expected is None:
+                        self.assertIsNone(i)
+                    else:
+                        self.assertIs(expected.object, i.object)
+                        self.assertFloatsAlmostEqual(expected.t, i.t)
+
+    def test_nearest_many(self):
+        """Test intersecting a batch of rays with a sphere table."""
+        table = pyray.SphereTable(self._spheres())
+        indices, ts = table.nearest_many(
+            [pyray.point(0.0, 0.0, -10.0), pyray.point(0.0, 5.0, -10.0)],
+            [pyray.vector(0.0, 0.0, 1.0), pyray.vector(0.0, 0.0, 1.0)])
+        self.assertEqual([0, -1], [int(i) for i in indices])
+        self.assertFloatsAlmostEqual(6.5, ts[0])
+        self.assertEqual(math.inf, ts[1])
+
+    def test_nearest_many_from_generators(self):
+        """Assert that a batch of rays may be given by generators."""
+        for name in pyray.available_backends():
+            with self.subTest(backend=name):
+                pyray.set_backend(name)
+                table = pyray.SphereTable(self._spheres())
+                indices, ts = table.nearest_many(
+                    (pyray.point(0.0, y, -10.0) for y in (0.0, 5.0)),
+                    (pyray.vector(0.0, 0.0, 1.0) for _ in range(2)))
+                self.assertEqual([0, -1], [int(i) for i in indices])
+                self.assertFloatsAlmostEqual(6.5, ts[0])
+                self.assertEqual(math.inf, ts[1])
+
+    def test_empty_table(self):
+        """Test intersecting a ray with an empty sphere table."""
+        table = pyray.SphereTable([])
+        self.assertEqual(0, len(table))
+        self.assertEqual((-1, math.inf),
+                         table.nearest(pyray.point(0.0, 0.0, 0.0),
+                                       pyray.vector(0.0, 0.0, 1.0)))
+
+    def test_refresh(self):
+        """Assert that refreshing a sphere table picks up changed sphere
+        transformations.
+        """
+        s = pyray.Sphere()
+        table = pyray.SphereTable([s])
+        s.translate(0.0, 0.0, 5.0)
+        table.refresh()
+        r = pyray.Ray(pyray.point(0.0, 0.0, 0.0), pyray.vector(0.0, 0.0, 1.0))
+        self.assertFloatsAlmostEqual(4.0, table.hit(r).t)
+
+    def test_automatic_refresh(self):
+        """Assert that a sphere table picks up changed sphere transformations
+        by itself.
+        """
+        s = pyray.Sphere()
+        s.translate(0.0, 5.0, 0.0)
+        table = pyray.SphereTable([s])
+        origin = pyray.point(0.0, 0.0, 0.0)
+        direction = pyray.vector(0.0, 0.0, 1.0)
+        self.assertEqual(-1, table.nearest(origin, direction)[0])
+        s.translate(0.0, -5.0, 4.0)
+        self.assertEqual((0, 3.0), table.nearest(origin, direction))
+        s.translate(0.0, 0.0, 6.0)
+        self.assertEqual((0, 9.0), table.nearest(origin, direction))
+
+    def test_occluder(self):
+        """Test finding a sphere between the origin of a ray and a given
+        distance.
+        """
+        table = pyray.SphereTable(self._spheres())
+        origin = pyray.point(0.0, 0.0, -10.0)
+        direction = pyray.vector(0.0, 0.0, 1.0)
+        self.assertEqual(-1, table.occluder(origin, direction, 6.0))
+        self.assertNotEqual(-1, table.occluder(origin, direction, 7.0))
+        self.assertEqual(-1, table.occluder(pyray.point(0.0, 5.0, -10.0),
+                                            direction, math.inf))
+
+    def test_occluder_from_surface(self):
+        """Assert that a ray starting on the surface of a sphere finds the
+        far side of the sphere, and that nearer intersections than a given
+        epsilon are ignored.
+        """
+        table = pyray.SphereTable([pyray.Sphere()])
+        origin = pyray.point(0.0, 0.0, -1.0)
+        direction = pyray.vector(0.0, 0.0, 1.0)
+        self.assertEqual(0, table.occluder(origin, direction, 3.0))
+        self.assertEqual(-1, table.occluder(origin, direction, 2.0))
+        self.assertEqual(-1, table.occluder(origin, -direction, 3.0))
+        self.assertEqual(-1, table.occluder(pyray.point(0.0, 0.0, -1.5),
+                                            direction, 2.0, epsilon=0.5))
+        self.assertEqual(0, table.occluder(pyray.point(0.0, 0.0, -1.5),
+                                           direction, 2.0, epsilon=0.4))
+
+    def test_occluder_tests_first_sphere_first(self):
+        """Assert that the sphere to test first is found if it occludes."""
+        table = pyray.SphereTable(self._spheres())
+        origin = pyray.point(0.0, 0.0, -10.0)
+        direction = pyray.vector(0.0, 0.0, 1.0)
+        self.assertEqual(3, table.occluder(origin, direction, math.inf, 3))
+        self.assertEqual(0, table.occluder(origin, direction, 7.0, 3))
@@ -180,3 +180,74 @@ class TestTransformations(TestPyray):
 
         self.assertTuplesAlmostEqual(pyray.point(15.0, 0.0, 7.0),
                                      transform.apply(p))
+
+
+class TestTransformationVersions(TestPyray):
+    """Test case for keeping track of changes to transformations."""
+
+    def test_transformation_version(self):
+        """Assert that adding a transformation matrix increments the version
+        of a transformation.
+        """
+        transform = pyray.Transformation()
+        self.assertEqual(0, transform.version)
+        transform.add(pyray.translation(1.0, 2.0, 3.0))
+        transform.add(pyray.scaling(2.0, 2.0, 2.0))
+        self.assertEqual(2, transform.version)
+
+    def test_transformation_generation(self):
+        """Assert that adding a transformation matrix to any transformation
+        increments the generation of transformations.
+        """
+        generation = pyray.Transformation.generation()
+        pyray.Transformation().add(pyray.translation(1.0, 2.0, 3.0))
+        pyray.Transformation().add(pyray.scaling(2.0, 2.0, 2.0))
+        self.assertEqual(generation + 2, pyray.Transformation.generation())
+
+    def test_transformation_matrix_is_a_copy(self):
+        """Assert that changing the matrix of a transformation leaves the
+        transformation, and thereby its version, unchanged.
+        """
+        transform = pyray.Transformation()
+        transform.matrix[0, 3] = 5.0
+        self.assertMatricesAlmostEqual(pyray.Matrix.identity(4),
+                                       transform.matrix)
+        self.assertEqual(0, transform.version)
+
+
+class TestViewTransformations(TestPyray):
+    """Test case for view transformations."""
+
+    def test_default_view_transform(self):
+        """Test the transformation matrix for the default orientation."""
+        t = pyray.view_transform(pyray.point(0.0, 0.0, 0.0),
+                                 pyray.point(0.0, 0.0, -1.0),
+                                 pyray.vector(0.0, 1.0, 0.0))
+        self.assertMatricesAlmostEqual(pyray.Matrix.identity(4), t)
+
+    def test_view_transform_looking_in_positive_z_direction(self):
+        """Test a view transformation matrix looking in the positive z
+        direction.
+        """
+        t = pyray.view_transform(pyray.point(0.0, 0.0, 0.0),
+                                 pyray.point(0.0, 0.0, 1.0),
+                                 pyray.vector(0.0, 1.0, 0.0))
+        self.assertMatricesAlmostEqual(pyray.scaling(-1.0, 1.0, -1.0), t)
+
+    def test_view_transform_moving_the_world(self):
+        """Assert that the view transformation moves the world."""
+        t = pyray.view_transform(pyray.point(0.0, 0.0, 8.0),
+                                 pyray.point(0.0, 0.0, 0.0),
+                                 pyray.vector(0.0, 1.0, 0.0))
+        self.assertMatricesAlmostEqual(pyray.translation(0.0, 0.0, -8.0), t)
+
+    def test_arbitrary_view_transform(self):
+        """Test an arbitrary view transformation."""
+        t = pyray.view_transform(pyray.point(1.0, 3.0, 2.0),
+                                 pyray.point(4.0, -2.0, 8.0),
+                                 pyray.vector(1.0, 1.0, 0.0))
+        expected = pyray.matrix4x4([-0.50709, 0.50709, 0.67612, -2.36643,
+                                    0.76772, 0.60609, 0.12122, -2.82843,
+                                    -0.35857, 0.59761, -0.71714, 0.00000,
+                                    0.00000, 0.00000, 0.00000, 1.00000])
+        self.assertMatricesAlmostEqual(expected, t)
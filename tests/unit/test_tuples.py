@@ -4,6 +4,7 @@
 """Unit ests for tuples, points, and vectors."""
 
 import math
+import pickle
 import pyray
 from .test_pyray import TestPyray
 
@@ -41,6 +42,47 @@ class TestTuples(TestPyray):
         v = pyray.vector(4.0, -4.0, 3.0)
         self.assertEqual(pyray.Tuple(4.0, -4.0, 3.0, 0.0), v)
 
+    def test_origin(self):
+        """Test the origin."""
+        self.assertEqual(pyray.point(0.0, 0.0, 0.0), pyray.ORIGIN)
+
+    def test_tuple_immutability(self):
+        """Assert that the components of a tuple cannot be changed."""
+        a = pyray.point(4.0, -4.0, 3.0)
+        with self.assertRaises(AttributeError):
+            a.w = 0.0
+
+    def test_tuple_hashability(self):
+        """Assert that equal tuples have equal hashes."""
+        points = {pyray.point(1.0, 2.0, 3.0), pyray.point(1.0, 2.0, 3.0),
+                  pyray.vector(1.0, 2.0, 3.0)}
+        self.assertEqual(2, len(points))
+
+    def test_tuple_pickling(self):
+        """Assert that tuples survive pickling."""
+        a = pyray.vector(1.0, -2.0, 3.5)
+        b = pickle.loads(pickle.dumps(a))
+        self.assertIsInstance(b, pyray.Tuple)
+        self.assertEqual(a, b)
+
+    def test_tuple_as_built_in_tuple(self):
+        """Assert that tuples equal built-in tuples of their components, but
+        are neither ordered nor concatenated.
+        """
+        a = pyray.point(1.0, 2.0, 3.0)
+        self.assertEqual((1.0, 2.0, 3.0, 1.0), a)
+        self.assertEqual(hash((1.0, 2.0, 3.0, 1.0)), hash(a))
+        with self.assertRaises(TypeError):
+            _ = a < pyray.point(2.0, 2.0, 3.0)
+        with self.assertRaises(TypeError):
+            _ = a >= (2.0, 2.0, 3.0, 1.0)
+        with self.assertRaises(TypeError):
+            _ = a + (0.0, 0.0, 0.0, 0.0)
+        with self.assertRaises(TypeError):
+            _ = (0.0, 0.0, 0.0, 0.0) + a
+        with self.assertRaises(TypeError):
+            _ = a + pyray.Color(0.0, 0.0, 0.0)
+
 
 class TestArithmeticTupleOperations(TestPyray):
     """Test case for arithmetic tuple operations."""